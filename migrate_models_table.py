@@ -0,0 +1,79 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import getenv
+import sentry_sdk
+from sqlalchemy import inspect, text
+from dotenv import load_dotenv
+
+from src.sql.client import create_sql_client
+from src.sql import Models
+from src.utils import log
+
+load_dotenv()
+
+sentry_sdk.init(
+    dsn=getenv("SENTRY_DSN"),
+    traces_sample_rate=1.0,
+    profiles_sample_rate=1.0,
+)
+
+if __name__ == "__main__":
+
+    log.info("Starting migration of the models table.")
+
+    database_client = create_sql_client()
+
+    existing_columns = {
+        column["name"]
+        for column in inspect(database_client.engine).get_columns("models")
+    }
+    existing_indexes = {
+        index["name"] for index in inspect(database_client.engine).get_indexes("models")
+    }
+
+    with database_client.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+
+        for column in Models.__table__.columns:
+            if column.name not in existing_columns:
+                log.info(f"Adding column: {column.name}")
+                connection.execute(
+                    text(
+                        f"ALTER TABLE models ADD COLUMN IF NOT EXISTS {column.name} {column.type.compile(dialect=connection.dialect)}"
+                    )
+                )
+
+        log.info("Backfilling symbol and first_entry_price.")
+        connection.execute(
+            text(
+                "UPDATE models SET symbol = symbols::json->>0 WHERE symbol IS NULL AND json_array_length(symbols::json) = 1"
+            )
+        )  # pooled models have no single symbol
+        connection.execute(
+            text(
+                "UPDATE models SET first_entry_price = cast(serving_set_indicated_entry_prices::json->>0 AS Float) WHERE first_entry_price IS NULL AND symbol IS NOT NULL"
+            )
+        )
+        connection.execute(
+            text(
+                "UPDATE models SET first_entry_price = NULL WHERE symbol IS NULL AND first_entry_price IS NOT NULL"
+            )
+        )  # the serving sets of pooled models mix the prices of many symbols
+
+        for index in Models.__table__.indexes:
+            if index.name not in existing_indexes:
+                log.info(f"Creating index: {index.name}")
+                connection.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON models ({', '.join(column.name for column in index.columns)})"
+                    )
+                )  # models are not locked against inserts by concurrent training jobs
+
+        connection.execute(text("ANALYZE models"))
+
+    log.info("Completed migration of the models table.")
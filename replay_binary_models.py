@@ -0,0 +1,65 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import environ, getenv
+from os.path import join
+from tempfile import mkdtemp
+from time import monotonic
+from dotenv import load_dotenv
+
+from src.backtesting.replay import MarketReplay
+from src.backtesting.replay.replay_broker_client import MARKET_TIMEZONE
+from src.sql import get_data, Transactions
+from src.utils import log
+
+load_dotenv()
+
+if __name__ == "__main__":
+
+    log.info("Starting replay of binary models.")
+
+    recording_path = getenv("REPLAY_RECORDING_PATH", "staging/recordings/latest")
+    speed = float(getenv("REPLAY_SPEED", "3600"))
+
+    staging_path = mkdtemp(prefix="replay_")
+    environ["MODEL_ARTIFACT_CACHE_PATH"] = join(staging_path, "artifacts")
+    environ["TRANSACTION_JOURNAL_PATH"] = join(staging_path, "transactions.wal")
+    environ["DAILY_FEATURE_STORE_PATH"] = join(
+        staging_path, "features"
+    )  # model inputs are calculated from the recorded daily bars
+
+    from run_binary_models import run_binary_models
+
+    replay = MarketReplay(recording_path, speed=speed)
+    replay.start()
+
+    started = monotonic()
+    try:
+        run_binary_models(
+            alpaca_trading_client=replay.trading_client,
+            alpaca_broker_client=replay.broker_client,
+            database_client=replay.database_client,
+            minio_client=replay.minio_client,
+            polygon_client=replay.polygon_client,
+            live_stock_client=replay.live_stock_client,
+            now=replay.clock.now().astimezone(MARKET_TIMEZONE).replace(tzinfo=None),
+            sleep=replay.clock.sleep,
+            current_time=replay.clock.now,
+            time_scale=speed,
+        )
+    finally:
+        replay.stop()
+
+    transactions = get_data(
+        database_client=replay.database_client,
+        models=[Transactions],
+        use_cache=False,
+    )
+
+    log.info(f"Replayed trading day in {round(monotonic() - started, 2)} seconds.")
+    log.info(f"Recorded {len(transactions)} transactions.")
+    log.info(f"Closing cash balance: {replay.trading_client.cash}")
+    log.info("Completed replay of binary models.")
@@ -6,42 +6,62 @@ Copyright 2024
 
 
 import sentry_sdk
+import numpy as np
 import pandas as pd
-from os.path import abspath, join, dirname, isfile
-from os import remove, getenv
-from datetime import datetime, timedelta
-from sqlalchemy import and_, text
+import xgboost as xgb
+from os import getenv
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_
 from time import sleep
+from typing import Callable
 from json import loads
 from asyncio import run
+from alpaca.trading.client import TradingClient
 from alpaca.trading.enums import TimeInForce, OrderSide, OrderType
-from alpaca.trading.models import Asset
+from alpaca.trading.models import Asset, Position
+from alpaca.broker.client import BrokerClient
+from alpaca.data.live.stock import StockDataStream
 from dotenv import load_dotenv
+from minio import Minio
+from polygon import RESTClient
 from uuid import uuid4
 from math import ceil
 
-from src.brokerage.alpaca.client import create_trading_client, create_broker_client
+from src.brokerage.alpaca.client import (
+    create_trading_client,
+    create_broker_client,
+    create_live_stock_data_client,
+)
 from src.brokerage.alpaca.broker import get_clock
 from src.brokerage.alpaca.trading import (
-    submit_order,
+    OrderGateway,
     get_positions,
     close_all_positions,
-    close_position,
     get_assets,
 )
 from src.brokerage.alpaca.utils import get_timestamp_information
-from src.brokerage.polygon import create_polygon_client, get_market_data
-from src.univariate.analysis import calc_macd
-from src.minio import create_minio_client, download_file
+from src.brokerage.polygon import create_polygon_client, get_market_open_bars
+from src.strategies.intraday.common import monitor_positions
+from src.cache import ArtifactCache
+from src.minio import create_minio_client
 from src.sql import (
+    DatabaseClient,
     create_sql_client,
     get_data,
-    insert_data,
     Models,
     PolygonMarketDataDay,
-    Transactions,
+    TransactionJournal,
+)
+from src.ml.models import (
+    compile_binary_daily_trend_models,
+    score_compiled_binary_daily_trend_models,
+)
+from src.ml.utils import (
+    build_latest_daily_features,
+    build_market_open_feature_matrix,
+    set_market_open_prices,
 )
-from src.ml.utils import one_hot_encode
+from src.features import read_daily_feature_store
 from src.utils import log, load_object_from_pickle
 
 load_dotenv()
@@ -52,29 +72,44 @@ sentry_sdk.init(
     profiles_sample_rate=1.0,
 )
 
-if __name__ == "__main__":
-
-    log.error("Preparing to run models.")
-
-    debug_mode = False
-    paper = True
-
-    features = [
-        "daily_open",  # care should be taken here - daily_open and daily_close are first used to calculate the target variable and then shifted
-        "daily_close",
-        "daily_macd_histogram",
-        # "daily_macd_first_derivative",  # PCA indicates that these are not useful
-        # "weekday_monday",
-        # "weekday_tuesday",
-        # "weekday_wednesday",
-        # "weekday_thursday",
-        # "weekday_friday",
-        "target_date_daily_open",  # this is the open price on the market data for which a prediction is required
-    ]
 
-    now = datetime.now()
+def run_binary_models(
+    alpaca_trading_client: TradingClient,
+    alpaca_broker_client: BrokerClient,
+    database_client: DatabaseClient,
+    minio_client: Minio,
+    polygon_client: RESTClient,
+    live_stock_client: StockDataStream,
+    now: datetime,
+    sleep: Callable[[float], None] = sleep,
+    current_time: Callable[[], datetime] = lambda: datetime.now(tz=timezone.utc),
+    time_scale: float = 1.0,
+    start_delay: timedelta = timedelta(minutes=15),
+    debug_mode: bool = False,
+    paper: bool = True,
+):
+    """
+    Trades a day on the predictions of the binary daily trend models.
+
+    The clients and the clock are passed in, so that a day can be replayed against recorded market data with replay_binary_models.py.
+
+    Args:
+        alpaca_trading_client (TradingClient): An Alpaca trading client.
+        alpaca_broker_client (BrokerClient): An Alpaca broker client.
+        database_client (DatabaseClient): A database client.
+        minio_client (Minio): A Minio client from which model artifacts are obtained.
+        polygon_client (RESTClient): A Polygon client from which market open bars are obtained.
+        live_stock_client (StockDataStream): An Alpaca live stock client from which trades are received while positions are monitored. It is stopped once monitoring ends, so each run needs a client of its own.
+        now (datetime): The time at which the run starts, timezone agnostic but in ET.
+        sleep (Callable[[float], None]): Waits for a number of seconds. Defaults to time.sleep.
+        current_time (Callable[[], datetime]): Returns the current time, with which closed positions are recorded. Defaults to the current UTC time.
+        time_scale (float): Simulated seconds per real second of the clock of the broker client. Defaults to 1.0.
+        start_delay (timedelta): Duration after market open at which positions are taken. Defaults to 15 minutes.
+        debug_mode (bool): Whether to run when the market does not open today, without waiting for the open. Defaults to False.
+        paper (bool): Whether the trading client trades on a paper account. Defaults to True.
+    """
 
-    path_to_staging = abspath(join(dirname(__file__), "staging"))
+    log.error("Preparing to run models.")
 
     model_offset_hours = 24 * 3 - 6  # models older than this are not considered valid
 
@@ -82,12 +117,6 @@ if __name__ == "__main__":
     stop_loss_percentage: float = 6.0
     stock_price_threshold: float = 0.01
 
-    alpaca_trading_client = create_trading_client(paper=paper)
-    alpaca_broker_client = create_broker_client()
-    database_client = create_sql_client()
-    minio_client = create_minio_client()
-    polygon_client = create_polygon_client()
-
     timestamp_info = get_timestamp_information(alpaca_broker_client, [now])[0]
 
     alpaca_clock = get_clock(alpaca_broker_client)
@@ -95,13 +124,14 @@ if __name__ == "__main__":
         alpaca_trading_client, asset_class="us_equity"
     )
     alpaca_assets = [a for a in alpaca_assets if a.tradable]
-    shortable_stocks = [e.symbol for e in alpaca_assets if e.shortable]
+    tradable_stocks = {e.symbol for e in alpaca_assets}
+    shortable_stocks = {e.symbol for e in alpaca_assets if e.shortable}
 
     market_open_time = alpaca_clock.next_open
 
     if timestamp_info["open"] is None and not debug_mode:
         log.info("Market does not open today. Exiting process.")
-        exit()
+        return
 
     if alpaca_clock.is_open:
         log.info("Market already open. Adjusting market open time.")
@@ -117,78 +147,157 @@ if __name__ == "__main__":
         database_client=database_client,
         models=[Models],
         where_clause=and_(
-            Models.created_at >= now - timedelta(hours=model_offset_hours),
+            Models.last_modified_at >= now - timedelta(hours=model_offset_hours),
             Models.precision > 0.6,
             Models.training_set_rows > 200,
             Models.threshold_percentage.is_not(None),
-            text(f"cast(serving_set_indicated_entry_prices::json->>0 AS Float) >= {stock_price_threshold}"),
+            or_(
+                Models.symbol.is_(None),
+                Models.first_entry_price >= stock_price_threshold,
+            ),  # pooled models have no single first entry price
         ),
+        use_cache=False,
     )
 
     log.info("Obtaining model files from object storage.")
     models, models_positive_threshold, models_negative_threshold = {}, {}, {}
+    # multi-output models are shared by all three thresholds
+    boosters: dict[str, xgb.Booster] = {}
+    model_files = ArtifactCache(minio_client, bucket_name="models").prefetch(
+        [
+            predictive_model.get("booster_url") or predictive_model["model_url"]
+            for predictive_model in predictive_models
+        ]
+    )  # artifacts cached by previous runs are not downloaded again
     for predictive_model in predictive_models:
-        model_location = join(path_to_staging, predictive_model["model_url"])
-        if not isfile(model_location):
-            download_file(
-                minio_client=minio_client,
-                bucket_name="models",
-                object_name=predictive_model["model_url"],
-                file_path=model_location,
-            )
+        model_url = predictive_model.get("booster_url") or predictive_model["model_url"]
+        if model_url not in model_files:
+            log.warning(f"Model file unavailable: {model_url}")
+            continue
+        model_location = model_files[model_url]
+
+        if model_url not in boosters:
+            boosters[model_url] = (
+                xgb.Booster(model_file=model_location)
+                if predictive_model.get("booster_url")
+                else load_object_from_pickle(model_location).get_booster()
+            )  # models trained before boosters were exported are only pickled
 
         if float(predictive_model["threshold_percentage"]) == 0.0:
-            models[loads(predictive_model["symbols"])[0]] = load_object_from_pickle(
-                model_location
-            )
+            threshold_models = models
         elif float(predictive_model["threshold_percentage"]) > 0.0:
-            models_positive_threshold[loads(predictive_model["symbols"])[0]] = (
-                load_object_from_pickle(model_location)
-            )
+            threshold_models = models_positive_threshold
         elif float(predictive_model["threshold_percentage"]) < 0.0:
-            models_negative_threshold[loads(predictive_model["symbols"])[0]] = (
-                load_object_from_pickle(model_location)
-            )
+            threshold_models = models_negative_threshold
+
+        if (symbol := predictive_model["symbol"]) is not None:
+            threshold_models[symbol] = model_url
+        else:  # pooled models cover many symbols and do not replace per-symbol models
+            for symbol in loads(predictive_model["symbols"]):
+                threshold_models.setdefault(symbol, model_url)
+
+    model_ids: dict[str, str] = {}
+    for predictive_model in predictive_models:
+        if (symbol := predictive_model["symbol"]) is not None:
+            model_ids[symbol] = predictive_model["model_id"]
+        else:
+            for symbol in loads(predictive_model["symbols"]):
+                model_ids.setdefault(symbol, predictive_model["model_id"])
+
+    log.info(f"Compiling {len(boosters)} models for scoring.")
+
+    model_positions = {model_url: i for i, model_url in enumerate(boosters)}
+    compiled_models = compile_binary_daily_trend_models(list(boosters.values()))
 
     log.info("Getting historical model inputs.")
 
-    historical_data = get_data(
-        database_client=database_client,
-        models=[PolygonMarketDataDay],
-        where_clause=and_(
-            PolygonMarketDataDay.timestamp
-            >= (
-                timestamp_info["previous_trading_date"] - timedelta(days=40)
-            ),  # ensures that sufficient historical data is obtained to calculate trends
-            PolygonMarketDataDay.timestamp <= timestamp_info["previous_trading_date"],
-            PolygonMarketDataDay.symbol.in_(list(models.keys())),
-        ),
+    stored_daily_features = read_daily_feature_store(
+        symbols=list(models.keys()),
+        start_timestamp=timestamp_info["previous_trading_date"],
+        end_timestamp=timestamp_info["previous_trading_date"] + timedelta(days=1),
+        columns=[
+            "daily_open",
+            "daily_close",
+            "daily_volume",
+            "daily_vwap",
+            "daily_macd_histogram",
+            "daily_macd_first_derivative",
+        ],
+    )  # features are identical to those used in training
+    daily_features = (
+        stored_daily_features.groupby("symbol").tail(1).set_index("symbol")
+        if not stored_daily_features.empty
+        else build_latest_daily_features(pd.DataFrame())
     )
 
-    historical_data = pd.DataFrame(historical_data)
-    historical_data = historical_data.set_index("timestamp")
-    historical_data = historical_data.sort_index()
+    if missing_symbols := [
+        symbol for symbol in models if symbol not in daily_features.index
+    ]:
+        log.info(
+            f"Calculating model inputs for {len(missing_symbols)} symbols missing from the daily feature store."
+        )
 
-    prediction_inputs: dict[str, pd.DataFrame] = {}
-    for symbol, historical_symbol_data in historical_data.groupby("symbol"):
+        historical_data = get_data(
+            database_client=database_client,
+            models=[PolygonMarketDataDay],
+            where_clause=and_(
+                PolygonMarketDataDay.timestamp
+                >= (
+                    timestamp_info["previous_trading_date"] - timedelta(days=40)
+                ),  # ensures that sufficient historical data is obtained to calculate trends
+                PolygonMarketDataDay.timestamp
+                <= timestamp_info["previous_trading_date"],
+                PolygonMarketDataDay.symbol.in_(missing_symbols),
+            ),
+            use_cache=False,  # replays of other recordings query the same dates
+        )
 
-        _, _, daily_macd_histogram, daily_macd_first_derivative = calc_macd(
-            data=historical_symbol_data["close"].to_list(),
+        missing_daily_features = build_latest_daily_features(
+            pd.DataFrame(historical_data)
+        )
+        daily_features = (
+            pd.concat([daily_features, missing_daily_features])
+            if not daily_features.empty
+            else missing_daily_features
         )
-        prediction_inputs[symbol] = pd.DataFrame(
-            {
-                "daily_open": [historical_symbol_data["open"].to_list()[-1]],
-                "daily_close": [historical_symbol_data["close"].to_list()[-1]],
-                "daily_macd_histogram": [daily_macd_histogram[-1]],
-                "daily_macd_first_derivative": [daily_macd_first_derivative[-1]],
-                "weekday_monday": [None],
-                "weekday_tuesday": [None],
-                "weekday_wednesday": [None],
-                "weekday_thursday": [None],
-                "weekday_friday": [None],
-                "target_date_daily_open": [None],
-            }
+
+    log.info("Precomputing model inputs.")
+
+    feature_names: list[str] = compiled_models["feature_names"]
+    feature_rows = {symbol: i for i, symbol in enumerate(daily_features.index)}
+    feature_matrix = build_market_open_feature_matrix(
+        daily_features,
+        feature_names=feature_names,
+        target_date=market_open_time.date(),
+    )  # only the features that depend on the open price are left to fill in
+    daily_close = daily_features["daily_close"].to_numpy(dtype=np.float32)
+
+    scored_rows = [
+        (target_index, symbol, model_positions[threshold_models[symbol]])
+        for target_index, threshold_models in enumerate(
+            [models, models_positive_threshold, models_negative_threshold]
         )
+        for symbol in models
+        if symbol in feature_rows and symbol in threshold_models
+    ]
+    scored_feature_rows = np.array(
+        [feature_rows[symbol] for _, symbol, _ in scored_rows], dtype=int
+    )
+    scored_model_indices = np.array(
+        [model_index for _, _, model_index in scored_rows], dtype=int
+    )
+    scored_target_columns = np.array(
+        [
+            (
+                # multi-output models have one target per threshold
+                target_index
+                if compiled_models["n_targets"][model_index] > 1
+                else 0
+            )
+            for target_index, _, model_index in scored_rows
+        ],
+        dtype=int,
+    )
 
     log.info("Waiting until market open.")
 
@@ -199,145 +308,116 @@ if __name__ == "__main__":
             f"Market does not open until {alpaca_clock.next_open}. Sleeping until then."
         )
         sleep(
-            (alpaca_clock.next_open - alpaca_clock.timestamp).seconds + 15 * 60
-        )  # Will commence 15 minutes after market open
+            (
+                alpaca_clock.next_open + start_delay - alpaca_clock.timestamp
+            ).total_seconds()
+        )
 
     log.error("Sleep finished. Commencing strategy.")
 
     log.info("Getting market open data.")
 
-    market_open_bars = {}
-    for symbol in models:
-        if open_data := run(
-            get_market_data(
-                client=polygon_client,
-                ticker=symbol,
-                from_=market_open_time,
-                to=market_open_time,
-                timespan="second",
-                multiplier=1,
-                subtract_day=False,
-            )
-        ):
-            market_open_bars[symbol] = pd.DataFrame(open_data)
-
-    for symbol, target_date_data in market_open_bars.items():
-        target_date_data = target_date_data.set_index("timestamp")
-        target_date_data = target_date_data.sort_index()
-        target_date_data["weekday"] = target_date_data.index.dayofweek
-        target_date_data = one_hot_encode(
-            target_date_data,
-            column="weekday",
-            value_mapping={
-                0: "monday",
-                1: "tuesday",
-                2: "wednesday",
-                3: "thursday",
-                4: "friday",
-            },
-        )
-        prediction_inputs[symbol]["target_date_daily_open"] = target_date_data[
-            "open"
-        ].to_list()
-        prediction_inputs[symbol]["weekday_monday"] = (
-            target_date_data["weekday_monday"].to_list()
-            if "weekday_monday" in target_date_data.columns
-            else [False]
-        )
-        prediction_inputs[symbol]["weekday_tuesday"] = (
-            target_date_data["weekday_tuesday"].to_list()
-            if "weekday_tuesday" in target_date_data.columns
-            else [False]
-        )
-        prediction_inputs[symbol]["weekday_wednesday"] = (
-            target_date_data["weekday_wednesday"].to_list()
-            if "weekday_wednesday" in target_date_data.columns
-            else [False]
-        )
-        prediction_inputs[symbol]["weekday_thursday"] = (
-            target_date_data["weekday_thursday"].to_list()
-            if "weekday_thursday" in target_date_data.columns
-            else [False]
-        )
-        prediction_inputs[symbol]["weekday_friday"] = (
-            target_date_data["weekday_friday"].to_list()
-            if "weekday_friday" in target_date_data.columns
-            else [False]
+    market_open_bars = run(
+        get_market_open_bars(
+            client=polygon_client,
+            symbols=list(models),
+            market_open_time=market_open_time,
         )
+    )  # all symbols are requested concurrently in a single event loop
+
+    target_date_daily_open = np.full(len(feature_rows), np.nan, dtype=np.float32)
+    for symbol, open_data in market_open_bars.items():
+        if symbol in feature_rows:
+            target_date_daily_open[feature_rows[symbol]] = min(
+                open_data, key=lambda e: e["timestamp"]
+            )["open"]
 
     log.info("Running models.")
 
-    predictions = {
-        symbol: int(models[symbol].predict(prediction_inputs[symbol][features])[0])
-        for symbol in market_open_bars
-    }
-    predictions_positive_threshold = {
-        symbol: int(
-            models_positive_threshold[symbol].predict(
-                prediction_inputs[symbol][features]
-            )[0]
-        )
-        for symbol in market_open_bars
-    }
-    predictions_negative_threshold = {
-        symbol: int(
-            models_negative_threshold[symbol].predict(
-                prediction_inputs[symbol][features]
-            )[0]
-        )
-        for symbol in market_open_bars
-    }
+    set_market_open_prices(
+        feature_matrix,
+        feature_names=feature_names,
+        daily_close=daily_close,
+        target_date_daily_open=target_date_daily_open,
+    )
+
+    is_open = ~np.isnan(target_date_daily_open[scored_feature_rows])
+    probabilities = score_compiled_binary_daily_trend_models(
+        compiled_models=compiled_models,
+        X=feature_matrix[scored_feature_rows[is_open]],
+        model_indices=scored_model_indices[is_open],
+    )  # all symbols and thresholds are scored in one pass
+    scored_predictions = (
+        probabilities[np.arange(len(probabilities)), scored_target_columns[is_open]]
+        > 0.5
+    ).astype(int)
+
+    predictions: dict[str, int] = {}
+    predictions_positive_threshold: dict[str, int] = {}
+    predictions_negative_threshold: dict[str, int] = {}
+    for (target_index, symbol, _), prediction in zip(
+        (e for e, scored in zip(scored_rows, is_open) if scored),
+        scored_predictions.tolist(),
+    ):
+        threshold_predictions = [
+            predictions,
+            predictions_positive_threshold,
+            predictions_negative_threshold,
+        ][target_index]
+        threshold_predictions[symbol] = prediction
 
     log.info("Taking positions.")
 
     long_positions, short_positions = 0, 0
     for symbol, prediction in predictions.items():
-        if prediction and models_positive_threshold[symbol]:
+        if prediction and models_positive_threshold.get(symbol):
             long_positions += 1
-        if not prediction and models_negative_threshold[symbol]:
+        if not prediction and models_negative_threshold.get(symbol):
             short_positions += 1
 
     long_open_prices, short_open_prices = [], []
     for symbol, prediction in predictions.items():
-        if prediction and models_positive_threshold[symbol]:
-            long_open_prices.append(float(market_open_bars[symbol]["open"][0]))
+        if prediction and models_positive_threshold.get(symbol):
+            long_open_prices.append(float(target_date_daily_open[feature_rows[symbol]]))
         if (
             not prediction
-            and models_negative_threshold[symbol]
+            and models_negative_threshold.get(symbol)
             and symbol in shortable_stocks
         ):
-            short_open_prices.append(float(market_open_bars[symbol]["open"][0]))
+            short_open_prices.append(
+                float(target_date_daily_open[feature_rows[symbol]])
+            )
 
     estimated_total_position = sum(long_open_prices) - sum(short_open_prices)
 
     log.info(
-        f"Estimated total long: {sum(long_open_prices)} (min: {min(long_open_prices)}, max: {max(long_open_prices)})"
+        f"Estimated total long: {sum(long_open_prices)} (min: {min(long_open_prices, default=None)}, max: {max(long_open_prices, default=None)})"
     )
     log.info(
-        f"Estimated total short: {sum(short_open_prices)} (min: {min(short_open_prices)}, max: {max(short_open_prices)})"
+        f"Estimated total short: {sum(short_open_prices)} (min: {min(short_open_prices, default=None)}, max: {max(short_open_prices, default=None)})"
     )
     log.info(f"Estimated total position: {estimated_total_position}")
 
     potential_total_transactions = len(long_open_prices) + len(short_open_prices)
     cash = float(alpaca_trading_client.get_account().cash)
 
+    order_gateway = OrderGateway(alpaca_trading_client)
+
+    submitted_orders = {}
     for symbol, prediction in predictions.items():
-        if (prediction and models_positive_threshold[symbol]) or (
-            not prediction and models_negative_threshold[symbol]
+        if (prediction and models_positive_threshold.get(symbol)) or (
+            not prediction and models_negative_threshold.get(symbol)
         ):
             log.info(f"Preparing to trade symbol: {symbol}")
-            if symbol in [e.symbol for e in alpaca_assets]:
+            if symbol in tradable_stocks:
                 log.info("Stock can be traded.")
                 if not prediction and symbol not in shortable_stocks:
                     log.info("Symbol cannot be shorted.")
                     continue
 
-                limit_price = prediction_inputs[symbol][
-                    "target_date_daily_open"
-                ].to_list()[0]
+                limit_price = float(target_date_daily_open[feature_rows[symbol]])
 
-                submit_order(
-                    client=alpaca_trading_client,
+                submitted_orders[symbol] = order_gateway.submit_order(
                     symbol=symbol,
                     quantity=2
                     * ceil(cash / limit_price / potential_total_transactions),
@@ -347,87 +427,64 @@ if __name__ == "__main__":
                     limit_price=limit_price,
                     stop_price=None,
                     trail_percent=None,
-                )
-
-    log.info("Monitoring performance.")
+                )  # submitted concurrently, so the last do not wait on the first
 
-    alpaca_clock = get_clock(alpaca_broker_client)
+    for symbol, submitted_order in submitted_orders.items():
+        if (order := submitted_order.result()) is None:
+            log.warning(f"Order for symbol: {symbol} was not submitted.")
+        else:
+            log.info(f"Order for symbol: {symbol} has status: {order.status}")
 
-    while alpaca_clock.timestamp < alpaca_clock.next_close - timedelta(seconds=90):
+    log.info("Monitoring performance.")
 
-        positions = get_positions(
-            client=alpaca_trading_client,
+    transaction_journal = TransactionJournal(
+        database_client
+    )  # the trading loop does not wait on database commits
+
+    def record_closed_position(
+        position: Position,
+        movement_percentage: float,
+        price: float,
+        timestamp: datetime | None = None,
+    ):
+        timestamp = timestamp or current_time()
+        # valued at the trade which closed it, as the position may be a minute old
+        exit_value = float(position.qty) * price
+
+        transaction_journal.append(
+            transaction_id=str(uuid4()),
+            description=f"Limit: for {round(float(position.qty), 2)} shares at {round(movement_percentage, 2)} in {position.symbol}",
+            ticker=position.symbol,
+            placed_timestamp=timestamp.date(),
+            accepted_timestamp=timestamp,
+            order_type="Limit",
+            side=("short" if str(position.side) == "PositionSide.SHORT" else "long"),
+            entry_price=position.cost_basis,
+            exit_price=exit_value,
+            currency="USD",
+            quantity=position.qty,
+            exchange=position.exchange,
+            broker="Alpaca",
+            paper=paper,
+            backtest=False,
+            live=not paper,
+            created_at=timestamp,
+            last_modified_at=timestamp,
+            model_id=model_ids.get(position.symbol),
         )
 
-        for position in positions:
-            close_this_position = False
-            gone_short = str(position.side) == "PositionSide.SHORT"
-            log.info(f"Checking position {position.side} for symbol: {position.symbol}")
-            movement_percentage = (
-                100
-                * (float(position.market_value) - float(position.cost_basis))
-                / float(position.cost_basis)
-            )
-            if (movement_percentage >= take_profit_percentage and not gone_short) or (
-                -movement_percentage >= take_profit_percentage and gone_short
-            ):
-                log.info(f"Taking profit of: {round(abs(movement_percentage), 2)}%")
-                close_this_position = True
-            if (movement_percentage >= stop_loss_percentage and gone_short) or (
-                -movement_percentage >= stop_loss_percentage and not gone_short
-            ):
-                log.info(f"Realizing loss of: {round(abs(movement_percentage), 2)}%")
-                close_this_position = True
-
-            if close_this_position:
-                log.error(
-                    f"Closing position on symbol: {symbol} with change: {round(abs(movement_percentage), 2)}%"
-                )
-                close_position(
-                    client=alpaca_trading_client,
-                    symbol=position.symbol,
-                )
-
-                model_id: str | None = None
-                if model_metadata := [
-                    e for e in predictive_models if position.symbol in e["symbols"]
-                ]:
-                    model_id = model_metadata[0]["model_id"]
-
-                insert_data(
-                    database_client=database_client,
-                    documents=[
-                        Transactions(
-                            transaction_id=str(uuid4()),
-                            description=f"Limit: for {round(position.qty, 2)} shares at {round(movement_percentage, 2)} in {position.symbol}",
-                            ticker=position.symbol,
-                            placed_timestamp=alpaca_clock.timestamp.date(),
-                            accepted_timestamp=alpaca_clock.timestamp,
-                            order_type="Limit",
-                            side=(
-                                "short"
-                                if str(position.side) == "PositionSide.SHORT"
-                                else "long"
-                            ),
-                            entry_price=position.cost_basis,
-                            exit_price=position.market_value,
-                            currency="USD",
-                            quantity=position.qty,
-                            exchange=position.exchange,
-                            broker="Alpaca",
-                            paper=paper,
-                            backtest=False,
-                            live=not paper,
-                            created_at=alpaca_clock.timestamp,
-                            last_modified_at=alpaca_clock.timestamp,
-                            model_id=model_id,
-                        )
-                    ],
-                )
-
-        sleep(60)
-        alpaca_clock = get_clock(alpaca_broker_client)
-        log.info(f"Current market time: {alpaca_clock.timestamp}")
+    monitor_positions(
+        trading_client=alpaca_trading_client,
+        broker_client=alpaca_broker_client,
+        live_stock_client=live_stock_client,
+        take_profit_percentage=take_profit_percentage,
+        stop_loss_percentage=stop_loss_percentage,
+        on_close=record_closed_position,
+        within=timedelta(seconds=90),
+        time_scale=time_scale,
+    )  # thresholds are checked on every trade rather than once a minute
+
+    alpaca_clock = get_clock(alpaca_broker_client)
 
     log.info("Reached end of trading. Closing positions.")
 
@@ -435,45 +492,24 @@ if __name__ == "__main__":
         client=alpaca_trading_client,
     )
 
-    for position in positions:
-        close_position(
-            client=alpaca_trading_client,
-            symbol=position.symbol,
+    closed_positions = [
+        order_gateway.close_position(symbol=position.symbol) for position in positions
+    ]
+
+    for position, closed_position in zip(positions, closed_positions):
+        if not closed_position.result():
+            log.error(f"Could not close position on symbol: {position.symbol}")
+            continue
+        movement_percentage = (
+            100
+            * (float(position.market_value) - float(position.cost_basis))
+            / float(position.cost_basis)
         )
-        model_id: str | None = None
-        if model_metadata := [
-            e for e in predictive_models if position.symbol in e["symbols"]
-        ]:
-            model_id = model_metadata[0]["model_id"]
-        insert_data(
-            database_client=database_client,
-            documents=[
-                Transactions(
-                    transaction_id=str(uuid4()),
-                    description=f"Limit: for {round(position.qty, 2)} shares at {round(movement_percentage, 2)} in {position.symbol}",
-                    ticker=position.symbol,
-                    placed_timestamp=alpaca_clock.timestamp.date(),
-                    accepted_timestamp=alpaca_clock.timestamp,
-                    order_type="Limit",
-                    side=(
-                        "short"
-                        if str(position.side) == "PositionSide.SHORT"
-                        else "long"
-                    ),
-                    entry_price=position.cost_basis,
-                    exit_price=position.market_value,
-                    currency="USD",
-                    quantity=position.qty,
-                    exchange=position.exchange,
-                    broker="Alpaca",
-                    paper=paper,
-                    backtest=False,
-                    live=not paper,
-                    created_at=alpaca_clock.timestamp,
-                    last_modified_at=alpaca_clock.timestamp,
-                    model_id=model_id,
-                )
-            ],
+        record_closed_position(
+            position,
+            movement_percentage,
+            float(position.current_price),
+            timestamp=alpaca_clock.timestamp,
         )
 
     close_all_positions(
@@ -481,12 +517,25 @@ if __name__ == "__main__":
         cancel_orders=True,
     )
 
+    order_gateway.shutdown()
+    transaction_journal.close()
+
     log.info("Recording outcomes.")
 
-    log.info("Tidying up.")
+    log.error("Completed running models.")
 
-    for predictive_model in predictive_models:
-        if isfile(join(path_to_staging, predictive_model["model_url"])):
-            remove(join(path_to_staging, predictive_model["model_url"]))
 
-    log.error("Completed running models.")
+if __name__ == "__main__":
+
+    paper = True
+
+    run_binary_models(
+        alpaca_trading_client=create_trading_client(paper=paper),
+        alpaca_broker_client=create_broker_client(),
+        database_client=create_sql_client(),
+        minio_client=create_minio_client(),
+        polygon_client=create_polygon_client(),
+        live_stock_client=create_live_stock_data_client(),
+        now=datetime.now(),
+        paper=paper,
+    )
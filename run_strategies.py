@@ -0,0 +1,83 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import getenv
+from asyncio import run
+from datetime import datetime, timedelta
+import sentry_sdk
+from dotenv import load_dotenv
+
+from src.brokerage.alpaca.broker import CachedBrokerClient
+from src.brokerage.alpaca.client import (
+    create_trading_client,
+    create_broker_client,
+    create_historical_stock_data_client,
+    create_live_stock_data_client,
+)
+from src.brokerage.polygon import create_polygon_client
+from src.minio import create_minio_client
+from src.sql import create_sql_client
+from src.strategies.common import MarketSessionScheduler
+from src.strategies.runner import runner
+from src.utils import log
+from run_binary_models import run_binary_models
+
+load_dotenv()
+
+sentry_sdk.init(
+    dsn=getenv("SENTRY_DSN"),
+    traces_sample_rate=1.0,
+    profiles_sample_rate=1.0,
+)
+
+if __name__ == "__main__":
+
+    paper = True
+
+    log.info("Creating clients shared by all strategies.")
+
+    trading_client = create_trading_client(paper=paper)
+    broker_client = CachedBrokerClient(
+        create_broker_client()
+    )  # one clock and calendar for every strategy
+    historical_stock_client = create_historical_stock_data_client()
+    database_client = create_sql_client()
+    minio_client = create_minio_client()
+    polygon_client = create_polygon_client()
+
+    scheduler = MarketSessionScheduler(broker_client)
+
+    strategies = getenv("STRATEGIES", "binary_models,runner").split(",")
+
+    if "binary_models" in strategies:
+        scheduler.at_pre_open(
+            "binary_models",
+            lambda session: run_binary_models(
+                alpaca_trading_client=trading_client,
+                alpaca_broker_client=broker_client,
+                database_client=database_client,
+                minio_client=minio_client,
+                polygon_client=polygon_client,
+                live_stock_client=create_live_stock_data_client(),
+                now=datetime.now(),
+                paper=paper,
+            ),  # the stream is stopped at the end of each session, so each has its own
+            before=timedelta(minutes=30),
+            dedicated_thread=True,
+        )  # models are loaded before the open and positions monitored until the close
+
+    if "runner" in strategies:
+        runner(
+            trading_client=trading_client,
+            broker_client=broker_client,
+            live_stock_client=create_live_stock_data_client(),
+            historical_stock_client=historical_stock_client,
+            scheduler=scheduler,
+        )
+
+    log.info(f"Running strategies: {', '.join(strategies)}")
+
+    run(scheduler.run(sessions=None))
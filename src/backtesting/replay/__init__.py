@@ -0,0 +1,12 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from .local_object_store import LocalObjectStore
+from .market_replay import MarketReplay
+from .replay_broker_client import ReplayBrokerClient
+from .replay_polygon_client import ReplayPolygonClient
+from .replay_trading_client import ReplayTradingClient
+from .simulated_clock import SimulatedClock
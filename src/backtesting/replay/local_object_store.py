@@ -0,0 +1,52 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os.path import isfile, join
+from hashlib import md5
+from types import SimpleNamespace
+from minio.error import S3Error
+
+from src.utils import log
+
+
+class LocalObjectStore:
+    """
+    Stands in for a Minio client, serving the objects of every bucket from a local directory.
+    """
+
+    def __init__(self, directory: str):
+        log.function_call()
+        self.directory = directory
+
+    def _read(self, bucket_name: str, object_name: str) -> bytes:
+        file_path = join(self.directory, object_name)
+        if not isfile(file_path):
+            raise S3Error(
+                "NoSuchKey",
+                f"Object '{object_name}' not found in '{self.directory}'.",
+                object_name,
+                None,
+                None,
+                None,
+                bucket_name=bucket_name,
+                object_name=object_name,
+            )
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def stat_object(self, bucket_name: str, object_name: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            etag=md5(self._read(bucket_name, object_name)).hexdigest()
+        )
+
+    def get_object(self, bucket_name: str, object_name: str) -> SimpleNamespace:
+        data = self._read(bucket_name, object_name)
+        return SimpleNamespace(
+            read=lambda: data,
+            headers={"ETag": f'"{md5(data).hexdigest()}"'},
+            close=lambda: None,
+            release_conn=lambda: None,
+        )
@@ -0,0 +1,195 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os.path import join
+from datetime import datetime
+from json import load
+from threading import Event, Thread
+from typing import Any
+from uuid import UUID
+from alpaca.data.live.stock import StockDataStream
+from alpaca.trading.enums import AssetClass, AssetExchange, AssetStatus
+from alpaca.trading.models import Asset, Calendar
+from sqlalchemy import DATETIME, TIMESTAMP, Uuid, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.backtesting.replay.local_object_store import LocalObjectStore
+from src.backtesting.replay.replay_broker_client import ReplayBrokerClient
+from src.backtesting.replay.replay_polygon_client import ReplayPolygonClient
+from src.backtesting.replay.replay_trading_client import ReplayTradingClient
+from src.backtesting.replay.simulated_clock import SimulatedClock
+from src.brokerage.alpaca.utils import FakeStockDataStream
+from src.sql import (
+    Base,
+    DatabaseClient,
+    Models,
+    PolygonMarketDataDay,
+    Transactions,
+    insert_data,
+)
+from src.utils import log
+
+
+class MarketReplay:
+    """
+    Replays a recorded trading day on a simulated clock, through local stand-ins for the brokerage, market data, database and object storage clients.
+
+    A recording is a directory containing a recording.json file and an artifacts directory holding the model artifacts referred to by the recorded models. The recording.json file contains:
+
+    - start: The time at which the replay starts, with its UTC offset.
+    - calendar: The trading calendar, as a list of dates with their open and close times in ET, covering at least the previous and the replayed trading days.
+    - cash: The cash balance of the account.
+    - assets: The symbol of each tradable asset and whether it is shortable.
+    - models: Rows of the models table.
+    - daily_bars: Rows of the polygon_market_data_day table, from which the model inputs are calculated.
+    - open_bars: The second bars at market open of each symbol, in the format returned by Polygon.
+    - trades: The timestamp, symbol, price and size of each trade, in any order.
+
+    Recorded trades are fed to the trading client and published on a local market data stream when the simulated clock reaches them, so that orders fill and positions are monitored as they would be live. Transactions are recorded in an in-memory database.
+
+    Examples:
+        >>> replay = MarketReplay("recordings/2024-06-03", speed=3600)
+        >>> replay.start()
+        >>> run_binary_models(alpaca_trading_client=replay.trading_client, ...)
+        >>> replay.stop()
+    """
+
+    def __init__(self, recording_path: str, speed: float = 3600.0):
+        log.function_call()
+
+        with open(join(recording_path, "recording.json"), "r") as f:
+            recording = load(f)
+
+        self.clock = SimulatedClock(
+            start=datetime.fromisoformat(recording["start"]),
+            speed=speed,
+        )
+        self.broker_client = ReplayBrokerClient(
+            clock=self.clock,
+            calendar=[Calendar(**e) for e in recording["calendar"]],
+        )
+        self.trading_client = ReplayTradingClient(
+            clock=self.clock,
+            assets=[
+                Asset(
+                    **{
+                        "id": UUID(int=i),
+                        "class": AssetClass.US_EQUITY,  # the alias of asset_class
+                        "exchange": AssetExchange.NASDAQ,
+                        "symbol": e["symbol"],
+                        "status": AssetStatus.ACTIVE,
+                        "tradable": e.get("tradable", True),
+                        "marginable": True,
+                        "shortable": e.get("shortable", True),
+                        "easy_to_borrow": e.get("shortable", True),
+                        "fractionable": False,
+                    }
+                )
+                for i, e in enumerate(recording["assets"])
+            ],
+            cash=recording["cash"],
+        )
+        self.polygon_client = ReplayPolygonClient(open_bars=recording["open_bars"])
+        self.minio_client = LocalObjectStore(join(recording_path, "artifacts"))
+        self.database_client = self._create_database_client(recording)
+        self.trades = sorted(
+            (
+                {**e, "timestamp": datetime.fromisoformat(e["timestamp"])}
+                for e in recording["trades"]
+            ),
+            key=lambda e: e["timestamp"],
+        )
+
+        self.stream_server = FakeStockDataStream()
+        self.live_stock_client: StockDataStream | None = None
+        self.stopped = Event()
+        self.feed_thread: Thread | None = None
+
+    @staticmethod
+    def _decode(model: type[Base], row: dict[str, Any]) -> dict[str, Any]:
+        columns = model.__table__.columns
+        decoded = {}
+        for key, value in row.items():
+            if value is not None and isinstance(
+                columns[key].type, (DATETIME, TIMESTAMP)
+            ):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(columns[key].type, Uuid):
+                value = UUID(value)
+            decoded[key] = value
+        return decoded
+
+    def _create_database_client(self, recording: dict[str, Any]) -> DatabaseClient:
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )  # a single in-memory database shared by all threads
+        Base.metadata.create_all(
+            engine,
+            tables=[
+                Models.__table__,
+                PolygonMarketDataDay.__table__,
+                Transactions.__table__,
+            ],
+        )
+        database_client = DatabaseClient(
+            engine=engine,
+            SessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        )
+
+        insert_data(
+            database_client=database_client,
+            documents=[Models(**self._decode(Models, e)) for e in recording["models"]]
+            + [
+                PolygonMarketDataDay(**self._decode(PolygonMarketDataDay, e))
+                for e in recording["daily_bars"]
+            ],
+        )
+
+        return database_client
+
+    def start(self):
+        """
+        Starts the simulated clock, the local market data stream and the feed of recorded trades.
+        """
+        log.function_call()
+
+        self.live_stock_client = StockDataStream(
+            "replay",
+            "replay",
+            url_override=self.stream_server.start(),
+        )
+        self.clock.reset()  # the replay starts at the recorded start time
+        self.feed_thread = Thread(target=self._feed, daemon=True)
+        self.feed_thread.start()
+
+    def _feed(self):
+        for trade in self.trades:
+            if self.stopped.wait(
+                max(0.0, (trade["timestamp"] - self.clock.now()).total_seconds())
+                / self.clock.speed
+            ):
+                return
+            self.trading_client.set_price(trade["symbol"], trade["price"])
+            self.stream_server.publish_trade(
+                symbol=trade["symbol"],
+                price=trade["price"],
+                size=trade.get("size", 100),
+                timestamp=trade["timestamp"],
+            )
+
+    def stop(self):
+        """
+        Stops the feed of recorded trades and the local market data stream.
+        """
+        log.function_call()
+
+        self.stopped.set()
+        if self.feed_thread is not None:
+            self.feed_thread.join(timeout=5)
+        self.stream_server.stop()
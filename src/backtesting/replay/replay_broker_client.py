@@ -0,0 +1,51 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from zoneinfo import ZoneInfo
+from alpaca.trading.models import Calendar, Clock
+
+from src.backtesting.replay.simulated_clock import SimulatedClock
+from src.utils import log
+
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+
+class ReplayBrokerClient:
+    """
+    Stands in for an Alpaca broker client, serving the market clock and calendar from a simulated clock and a recorded calendar.
+    """
+
+    def __init__(self, clock: SimulatedClock, calendar: list[Calendar]):
+        log.function_call()
+        self.clock = clock
+        self.calendar = sorted(calendar, key=lambda e: e.date)
+
+    def get_calendar(self) -> list[Calendar]:
+        return self.calendar
+
+    def get_clock(self) -> Clock:
+        timestamp = self.clock.now().astimezone(MARKET_TIMEZONE)
+        naive_timestamp = timestamp.replace(tzinfo=None)  # calendar times are in ET
+
+        is_open = any(e.open <= naive_timestamp < e.close for e in self.calendar)
+        next_open = next(
+            (e.open for e in self.calendar if e.open > naive_timestamp), None
+        )
+        next_close = next(
+            (e.close for e in self.calendar if e.close > naive_timestamp), None
+        )
+        if next_open is None or next_close is None:
+            raise ValueError(
+                f"The recorded calendar does not extend beyond {naive_timestamp}."
+            )
+
+        return Clock(
+            timestamp=timestamp,
+            is_open=is_open,
+            next_open=next_open.replace(tzinfo=MARKET_TIMEZONE),
+            next_close=next_close.replace(tzinfo=MARKET_TIMEZONE),
+        )
@@ -0,0 +1,26 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from polygon.rest.models import Agg, TickerSnapshot
+
+from src.utils import log
+
+
+class ReplayPolygonClient:
+    """
+    Stands in for a Polygon client, serving recorded market open bars.
+    """
+
+    def __init__(self, open_bars: dict[str, list[dict[str, Any]]]):
+        log.function_call()
+        self.open_bars = open_bars
+
+    def get_aggs(self, ticker: str, **kwargs) -> list[Agg]:
+        return [Agg(**bar) for bar in self.open_bars.get(ticker, [])]
+
+    def get_snapshot_all(self, **kwargs) -> list[TickerSnapshot]:
+        return []
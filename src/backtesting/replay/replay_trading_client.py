@@ -0,0 +1,200 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from threading import Lock
+from types import SimpleNamespace
+from uuid import uuid4
+from alpaca.common.exceptions import APIError
+from alpaca.trading.enums import (
+    AssetClass,
+    AssetExchange,
+    OrderClass,
+    OrderSide,
+    OrderStatus,
+    OrderType,
+    PositionSide,
+)
+from alpaca.trading.models import Asset, Order, Position
+from alpaca.trading.requests import OrderRequest
+
+from src.backtesting.replay.simulated_clock import SimulatedClock
+from src.utils import log
+
+
+class ReplayTradingClient:
+    """
+    Stands in for an Alpaca trading client, filling orders against the prices of recorded trades.
+
+    Market orders fill at the last traded price. Limit orders fill at their limit price once a trade reaches it, which may be immediately. Positions are valued at the last traded price, and the profit or loss of closed positions is added to the cash balance.
+    """
+
+    def __init__(
+        self,
+        clock: SimulatedClock,
+        assets: list[Asset],
+        cash: float,
+    ):
+        log.function_call()
+        self.clock = clock
+        self.assets = assets
+        self.cash = cash
+        self.prices: dict[str, float] = {}
+        self.open_orders: dict[str, Order] = {}
+        self.positions: dict[str, dict] = {}  # signed quantity and entry price
+        self.orders: list[Order] = []
+        self.lock = Lock()
+
+    def get_all_assets(self, filter=None) -> list[Asset]:
+        return [
+            e
+            for e in self.assets
+            if filter is None
+            or filter.asset_class is None
+            or e.asset_class == filter.asset_class
+        ]
+
+    def get_account(self) -> SimpleNamespace:
+        with self.lock:
+            return SimpleNamespace(cash=str(self.cash))
+
+    def set_price(self, symbol: str, price: float):
+        """
+        Records a trade, filling any open orders that it reaches.
+
+        Args:
+            symbol (str): The symbol traded.
+            price (float): The price of the trade.
+        """
+        with self.lock:
+            self.prices[symbol] = price
+            for order in [e for e in self.open_orders.values() if e.symbol == symbol]:
+                self._fill_if_reached(order)
+
+    def _fill_if_reached(self, order: Order):  # called with the lock held
+        price = self.prices.get(order.symbol)
+        if price is None:
+            return
+        if order.order_type == OrderType.MARKET:
+            fill_price = price
+        elif (order.side == OrderSide.BUY and price <= float(order.limit_price)) or (
+            order.side == OrderSide.SELL and price >= float(order.limit_price)
+        ):
+            fill_price = float(order.limit_price)
+        else:
+            return
+
+        quantity = float(order.qty) * (1 if order.side == OrderSide.BUY else -1)
+        position = self.positions.setdefault(
+            order.symbol, {"quantity": 0.0, "entry_price": fill_price}
+        )
+        if position["quantity"] * quantity >= 0:  # opening or adding to a position
+            position["entry_price"] = (
+                position["entry_price"] * abs(position["quantity"])
+                + fill_price * abs(quantity)
+            ) / (abs(position["quantity"]) + abs(quantity))
+            position["quantity"] += quantity
+        else:
+            self._reduce(order.symbol, quantity, fill_price)
+
+        order.status = OrderStatus.FILLED
+        order.filled_qty = order.qty
+        order.filled_avg_price = str(fill_price)
+        order.filled_at = self.clock.now()
+        del self.open_orders[str(order.id)]
+
+    def _reduce(
+        self, symbol: str, quantity: float, price: float
+    ):  # called with the lock held
+        position = self.positions[symbol]
+        closed_quantity = min(abs(quantity), abs(position["quantity"]))
+        direction = 1 if position["quantity"] > 0 else -1
+        self.cash += direction * closed_quantity * (price - position["entry_price"])
+        position["quantity"] -= direction * closed_quantity
+        if position["quantity"] == 0:
+            del self.positions[symbol]
+
+    def submit_order(self, order_data: OrderRequest) -> Order:
+        timestamp = self.clock.now()
+        order = Order(
+            id=uuid4(),
+            client_order_id=str(uuid4()),
+            created_at=timestamp,
+            updated_at=timestamp,
+            submitted_at=timestamp,
+            asset_id=uuid4(),
+            symbol=order_data.symbol,
+            asset_class=AssetClass.US_EQUITY,
+            order_class=OrderClass.SIMPLE,
+            order_type=order_data.type,
+            type=order_data.type,
+            side=order_data.side,
+            time_in_force=order_data.time_in_force,
+            status=OrderStatus.ACCEPTED,
+            extended_hours=False,
+            qty=str(order_data.qty),
+            limit_price=(
+                str(order_data.limit_price)
+                if getattr(order_data, "limit_price", None) is not None
+                else None
+            ),
+        )
+        with self.lock:
+            self.orders.append(order)
+            self.open_orders[str(order.id)] = order
+            self._fill_if_reached(order)
+        return order
+
+    def cancel_order_by_id(self, order_id: str):
+        with self.lock:
+            if (order := self.open_orders.pop(str(order_id), None)) is None:
+                raise APIError(f"Order {order_id} is not open.")
+            order.status = OrderStatus.CANCELED
+
+    def _position(self, symbol: str) -> Position:  # called with the lock held
+        position = self.positions[symbol]
+        price = self.prices.get(symbol, position["entry_price"])
+        quantity = position["quantity"]
+        return Position(
+            asset_id=uuid4(),
+            symbol=symbol,
+            exchange=AssetExchange.NASDAQ,
+            asset_class=AssetClass.US_EQUITY,
+            avg_entry_price=str(position["entry_price"]),
+            qty=str(quantity),  # negative for short positions, as reported by Alpaca
+            side=PositionSide.LONG if quantity > 0 else PositionSide.SHORT,
+            cost_basis=str(position["entry_price"] * quantity),
+            market_value=str(price * quantity),
+            current_price=str(price),
+            unrealized_pl=str((price - position["entry_price"]) * quantity),
+        )
+
+    def get_all_positions(self) -> list[Position]:
+        with self.lock:
+            return [self._position(symbol) for symbol in self.positions]
+
+    def close_position(self, symbol_or_asset_id: str):
+        with self.lock:
+            if symbol_or_asset_id not in self.positions:
+                raise APIError(f"No position in {symbol_or_asset_id}.")
+            position = self.positions[symbol_or_asset_id]
+            self._reduce(
+                symbol_or_asset_id,
+                -position["quantity"],
+                self.prices.get(symbol_or_asset_id, position["entry_price"]),
+            )
+
+    def close_all_positions(self, cancel_orders: bool = True):
+        with self.lock:
+            if cancel_orders:
+                for order in self.open_orders.values():
+                    order.status = OrderStatus.CANCELED
+                self.open_orders.clear()
+            for symbol, position in list(self.positions.items()):
+                self._reduce(
+                    symbol,
+                    -position["quantity"],
+                    self.prices.get(symbol, position["entry_price"]),
+                )
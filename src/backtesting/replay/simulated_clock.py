@@ -0,0 +1,50 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import datetime, timedelta
+from time import monotonic, sleep
+
+from src.utils import log
+
+
+class SimulatedClock:
+    """
+    A clock which starts at a given time and runs faster than real time.
+
+    Examples:
+        >>> clock = SimulatedClock(datetime(2024, 6, 3, 9, tzinfo=ZoneInfo("America/New_York")), speed=3600)
+        >>> clock.sleep(3600)  # returns after one second
+    """
+
+    def __init__(self, start: datetime, speed: float = 1.0):
+        log.function_call()
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.start = start
+        self.speed = speed
+        self.started = monotonic()
+
+    def now(self) -> datetime:
+        """
+        Returns:
+            datetime: The simulated time, in the timezone of the start time.
+        """
+        return self.start + timedelta(seconds=(monotonic() - self.started) * self.speed)
+
+    def sleep(self, seconds: float):
+        """
+        Waits for a number of simulated seconds.
+
+        Args:
+            seconds (float): The number of simulated seconds.
+        """
+        sleep(max(0.0, seconds) / self.speed)
+
+    def reset(self):
+        """
+        Restarts the clock from its start time.
+        """
+        self.started = monotonic()
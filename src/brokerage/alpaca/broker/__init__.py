@@ -4,5 +4,6 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .cached_broker_client import CachedBrokerClient
 from .get_calendar import get_calendar
 from .get_clock import get_clock
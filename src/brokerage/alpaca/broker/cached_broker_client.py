@@ -0,0 +1,85 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from typing import Any
+from alpaca.broker.client import BrokerClient
+from alpaca.trading.models import Calendar, Clock
+
+from src.utils import log
+
+
+class CachedBrokerClient:
+    """
+    Wraps an Alpaca broker client so that the market clock and calendar are requested once and shared by every strategy in the process.
+
+    Between requests, the clock is advanced locally from the last response: its timestamp moves on with the elapsed time, and whether the market is open follows from the next open and close times it reported. The clock is requested again once it is older than the time to live or has passed the next open or close time. Every other method is passed through to the wrapped client.
+
+    Examples:
+        >>> broker_client = CachedBrokerClient(create_broker_client())
+        >>> get_clock(broker_client)  # requested from the API
+        >>> get_clock(broker_client)  # advanced locally
+    """
+
+    def __init__(
+        self,
+        client: BrokerClient,
+        clock_ttl: timedelta = timedelta(minutes=5),
+        calendar_ttl: timedelta = timedelta(hours=12),
+        time_scale: float = 1.0,
+    ):
+        log.function_call()
+        self.client = client
+        self.clock_ttl = clock_ttl
+        self.calendar_ttl = calendar_ttl
+        self.time_scale = time_scale
+        self.clock: Clock | None = None
+        self.clock_requested = 0.0
+        self.calendar: list[Calendar] | None = None
+        self.calendar_requested = 0.0
+        self.lock = Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def get_clock(self) -> Clock:
+        with self.lock:
+            if self.clock is not None:
+                elapsed = monotonic() - self.clock_requested
+                timestamp = self.clock.timestamp + timedelta(
+                    seconds=elapsed * self.time_scale
+                )
+                if (
+                    elapsed * self.time_scale < self.clock_ttl.total_seconds()
+                    and timestamp < self.clock.next_open
+                    and timestamp < self.clock.next_close
+                ):  # the market has neither opened nor closed since the request
+                    return Clock(
+                        timestamp=timestamp,
+                        is_open=self.clock.is_open,
+                        next_open=self.clock.next_open,
+                        next_close=self.clock.next_close,
+                    )
+
+            self.clock = self.client.get_clock()
+            self.clock_requested = monotonic()
+            return self.clock
+
+    def get_calendar(self, *args, **kwargs) -> list[Calendar]:
+        if args or kwargs:  # filtered calendars are not cached
+            return self.client.get_calendar(*args, **kwargs)
+
+        with self.lock:
+            if (
+                self.calendar is None
+                or (monotonic() - self.calendar_requested) * self.time_scale
+                >= self.calendar_ttl.total_seconds()
+            ):
+                self.calendar = self.client.get_calendar()
+                self.calendar_requested = monotonic()
+            return self.calendar
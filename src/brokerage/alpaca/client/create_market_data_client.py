@@ -21,12 +21,14 @@ def create_historical_stock_data_client() -> StockHistoricalDataClient:
     )
 
 
-def create_live_stock_data_client() -> StockDataStream:
+def create_live_stock_data_client(url_override: str | None = None) -> StockDataStream:
     log.function_call()
     load_dotenv()
     return StockDataStream(
         api_key=getenv("ALPACA_LIVE_KEY"),
         secret_key=getenv("ALPACA_LIVE_SECRET"),
+        url_override=url_override
+        or getenv("ALPACA_STOCK_STREAM_URL"),  # e.g. a FakeStockDataStream
     )
 
 
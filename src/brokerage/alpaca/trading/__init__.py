@@ -10,4 +10,5 @@ from .get_account import get_account
 from .get_assets import get_assets
 from .get_orders import get_orders
 from .get_positions import get_positions
+from .order_gateway import OrderGateway
 from .submit_order import submit_order
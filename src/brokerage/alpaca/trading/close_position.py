@@ -13,23 +13,31 @@ from src.utils import log
 def close_position(
     client: TradingClient,
     symbol: str,
-):
+) -> bool:
     """Closes all open positions. Can be used at end of day.
 
     Args:
         client (TradingClient): A trading client
         symbol (str): A symbol. All open positions related to this symbol are closed.
+
+    Returns:
+        bool: Whether the request to close the positions was accepted.
     """
     log.function_call()
     try:
         client.close_position(
             symbol_or_asset_id=symbol,
         )
+        return True
     except ConnectionError as e:
         log.warning(f"Connection Error: {e}")
         try:
             client.close_position(
                 symbol_or_asset_id=symbol,
             )
+            return True
         except ConnectionError as e:
             log.error(f"Second Connection Error: {e}")
+    except Exception as e:
+        log.error(f"Could not close position on symbol: {symbol}. Error: {e}")
+    return False
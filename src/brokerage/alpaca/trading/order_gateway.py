@@ -0,0 +1,132 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
+from alpaca.trading.models import Order
+
+from src.brokerage.alpaca.trading.close_position import close_position
+from src.brokerage.alpaca.trading.submit_order import submit_order
+from src.brokerage.alpaca.utils.rate_limiter import RateLimiter
+from src.utils import log
+
+
+class OrderGateway:
+    """
+    Submits, cancels and closes orders concurrently on a pool of threads, subject to the rate limit of the Alpaca trading API.
+
+    Each request returns a future, so that the caller can submit a batch of orders at once and track the status of each order as it completes. Requests are throttled by a token bucket which allows a burst of up to max_requests_per_minute requests and then refills at max_requests_per_minute per minute.
+
+    Examples:
+        >>> with OrderGateway(trading_client) as gateway:
+        >>>     futures = {symbol: gateway.submit_order(symbol=symbol, ...) for symbol in symbols}
+        >>> orders = {symbol: future.result() for symbol, future in futures.items()}
+    """
+
+    def __init__(
+        self,
+        client: TradingClient,
+        max_requests_per_minute: int = 200,
+        max_workers: int = 32,
+    ):
+        log.function_call()
+        self.client = client
+        self.rate_limiter = RateLimiter(
+            rate_per_second=max_requests_per_minute / 60,
+            capacity=max_requests_per_minute,
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="order-gateway",
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops accepting requests.
+
+        Args:
+            wait (bool): Whether to wait for pending requests to complete. Defaults to True.
+        """
+        log.function_call()
+        self.executor.shutdown(wait=wait)
+
+    def _throttled(self, function, **kwargs):
+        self.rate_limiter.acquire()
+        return function(**kwargs)
+
+    def submit_order(
+        self,
+        symbol: str,
+        quantity: float,
+        side: OrderSide,
+        order_type: OrderType,
+        time_in_force: TimeInForce,
+        limit_price: float = None,
+        stop_price: float = None,
+        trail_percent: float = None,
+    ) -> Future[Order | None]:
+        """
+        Submits an order. The arguments are those of submit_order.
+
+        Returns:
+            Future[Order | None]: The submitted order, or None if it could not be submitted.
+        """
+        log.function_call()
+        return self.executor.submit(
+            self._throttled,
+            submit_order,
+            client=self.client,
+            symbol=symbol,
+            quantity=quantity,
+            side=side,
+            order_type=order_type,
+            time_in_force=time_in_force,
+            limit_price=limit_price,
+            stop_price=stop_price,
+            trail_percent=trail_percent,
+        )
+
+    def cancel_order(self, order_id: str) -> Future[None]:
+        """
+        Cancels an open order.
+
+        Args:
+            order_id (str): The ID of the order.
+
+        Returns:
+            Future[None]: Completes when the order has been cancelled.
+        """
+        log.function_call()
+        return self.executor.submit(
+            self._throttled,
+            self.client.cancel_order_by_id,
+            order_id=order_id,
+        )
+
+    def close_position(self, symbol: str) -> Future[bool]:
+        """
+        Closes all open positions in a symbol.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            Future[bool]: Whether the request to close the position was accepted.
+        """
+        log.function_call()
+        return self.executor.submit(
+            self._throttled,
+            close_position,
+            client=self.client,
+            symbol=symbol,
+        )
@@ -4,4 +4,6 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .fake_stock_data_stream import FakeStockDataStream
 from .get_timestamp_information import get_timestamp_information
+from .rate_limiter import RateLimiter
@@ -0,0 +1,148 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe
+from datetime import datetime, timezone
+from threading import Event, Thread
+from typing import Any
+import msgpack
+from websockets.server import serve, WebSocketServer, WebSocketServerProtocol
+
+from src.utils import log
+
+
+class FakeStockDataStream:
+    """
+    A local websocket server that speaks the Alpaca market data stream protocol, so that it can stand in for Alpaca when testing consumers of a StockDataStream.
+
+    The server runs on its own event loop in a background thread. Clients are sent the connected and authenticated messages that Alpaca sends, whatever their credentials, and their trade subscriptions are tracked. Trades are only sent when published with publish_trade.
+
+    Examples:
+        >>> server = FakeStockDataStream()
+        >>> stream = StockDataStream("key", "secret", url_override=server.start())
+        >>> server.publish_trade("AAPL", 190.0)
+        >>> server.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        log.function_call()
+        self.host = host
+        self.port = port
+        self.subscriptions: dict[WebSocketServerProtocol, set[str]] = {}
+        self.loop: AbstractEventLoop | None = None
+        self.server: WebSocketServer | None = None
+        self.thread: Thread | None = None
+        self.subscribed = Event()  # set once a client has subscribed to trades
+
+    def start(self) -> str:
+        """
+        Starts the server.
+
+        Returns:
+            str: The URL of the server, to be passed to StockDataStream as url_override.
+        """
+        log.function_call()
+
+        async def start_server():
+            return await serve(self._handle, self.host, self.port)
+
+        self.loop = new_event_loop()
+        self.server = self.loop.run_until_complete(start_server())
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        return f"ws://{self.host}:{self.port}"
+
+    def stop(self):
+        """
+        Stops the server and closes all connections.
+        """
+        log.function_call()
+
+        async def close():
+            self.server.close()
+            await self.server.wait_closed()
+
+        run_coroutine_threadsafe(close(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    async def _send(
+        self, websocket: WebSocketServerProtocol, messages: list[dict[str, Any]]
+    ):
+        await websocket.send(msgpack.packb(messages))
+
+    async def _handle(self, websocket: WebSocketServerProtocol):
+        self.subscriptions[websocket] = set()
+        try:
+            await self._send(websocket, [{"T": "success", "msg": "connected"}])
+            async for frame in websocket:
+                message = msgpack.unpackb(frame)
+                if message.get("action") == "auth":
+                    await self._send(
+                        websocket, [{"T": "success", "msg": "authenticated"}]
+                    )
+                elif message.get("action") == "subscribe":
+                    self.subscriptions[websocket].update(message.get("trades", []))
+                    self.subscribed.set()
+                elif message.get("action") == "unsubscribe":
+                    self.subscriptions[websocket].difference_update(
+                        message.get("trades", [])
+                    )
+                if message.get("action") in ("subscribe", "unsubscribe"):
+                    await self._send(
+                        websocket,
+                        [
+                            {
+                                "T": "subscription",
+                                "trades": sorted(self.subscriptions[websocket]),
+                                "quotes": [],
+                                "bars": [],
+                            }
+                        ],
+                    )
+        finally:
+            del self.subscriptions[websocket]
+
+    def publish_trade(
+        self,
+        symbol: str,
+        price: float,
+        size: float = 100,
+        timestamp: datetime | None = None,
+    ):
+        """
+        Sends a trade to every client subscribed to the trades of a symbol.
+
+        Args:
+            symbol (str): The symbol traded.
+            price (float): The price of the trade.
+            size (float): The size of the trade. Defaults to 100.
+            timestamp (datetime | None): The time of the trade. Defaults to None, in which case the current time is used.
+        """
+        log.function_call()
+
+        trade = {
+            "T": "t",
+            "S": symbol,
+            "i": 1,
+            "x": "V",
+            "p": price,
+            "s": size,
+            "c": ["@"],
+            "z": "C",
+            "t": msgpack.Timestamp.from_datetime(
+                timestamp or datetime.now(timezone.utc)
+            ),
+        }
+
+        async def publish():
+            for websocket, symbols in list(self.subscriptions.items()):
+                if symbol in symbols or "*" in symbols:
+                    await self._send(websocket, [trade])
+
+        run_coroutine_threadsafe(publish(), self.loop).result(timeout=5)
@@ -0,0 +1,61 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable
+
+from src.utils import log
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket rate limiter.
+
+    The bucket starts full, so that a burst of up to capacity requests is allowed immediately, and refills at a steady rate thereafter.
+
+    The clock and sleep functions default to those of the time module, and may be replaced to run the limiter on simulated time.
+
+    Examples:
+        >>> limiter = RateLimiter(rate_per_second=200 / 60, capacity=200)
+        >>> limiter.acquire()
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: int,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ):
+        log.function_call()
+        if rate_per_second <= 0 or capacity < 1:
+            raise ValueError("rate_per_second must be positive and capacity at least 1")
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request may be made.
+        """
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate_per_second,
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate_per_second
+            self.sleep(wait)
@@ -7,6 +7,7 @@ Copyright 2023
 from .data import (
     get_exchanges,
     get_market_data,
+    get_market_open_bars,
     list_ticker_news,
     list_tickers,
     get_stock_financials,
@@ -5,6 +5,7 @@ Copyright 2024
 """
 
 from .get_market_data import get_market_data
+from .get_market_open_bars import get_market_open_bars
 from .list_tickers import list_tickers
 from .list_ticker_news import list_ticker_news
 from .get_exchanges import get_exchanges
@@ -0,0 +1,124 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import Semaphore, gather, sleep, to_thread
+from typing import Any
+from polygon import RESTClient
+from datetime import datetime
+
+from src.utils import log
+
+
+async def get_market_open_bars(
+    client: RESTClient,
+    symbols: list[str],
+    market_open_time: datetime,
+    max_concurrency: int = 50,
+    retries: int = 3,
+    backoff_seconds: float = 0.5,
+    snapshot_fallback: bool = True,
+) -> dict[str, list[dict[str, Any]]]:
+    """Gets the market open bars of many symbols from Polygon.io concurrently.
+
+    The second bars at market open of all symbols are requested concurrently within the running event loop, with at most max_concurrency requests in flight at a time. Failed requests are retried with exponential backoff. The bars of symbols for which no second bar could be obtained are taken from the day bars of a single snapshot request covering all of them, if snapshot_fallback is set.
+
+    Args:
+        client (RESTClient): A Polygon client.
+        symbols (list[str]): The symbols for which to obtain bars.
+        market_open_time (datetime): The time at which the market opened.
+        max_concurrency (int, optional): Maximum number of concurrent requests. Defaults to 50.
+        retries (int, optional): Number of times a failed request is retried. Defaults to 3.
+        backoff_seconds (float, optional): Delay before the first retry, doubled on each subsequent retry. Defaults to 0.5.
+        snapshot_fallback (bool, optional): Whether to fall back to snapshots for symbols without second bars. Defaults to True.
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: The bars of each symbol for which bars were obtained, in the format returned by get_market_data.
+    """
+    log.function_call()
+
+    semaphore = Semaphore(max_concurrency)
+
+    async def get_symbol_bars(symbol: str) -> list[dict[str, Any]]:
+        for attempt in range(retries + 1):
+            try:
+                async with semaphore:
+                    aggs = await to_thread(
+                        client.get_aggs,
+                        ticker=symbol,
+                        multiplier=1,
+                        timespan="second",
+                        from_=market_open_time,
+                        to=market_open_time,
+                        adjusted=True,
+                        raw=False,
+                        limit=50_000,
+                    )
+                return [
+                    {
+                        "symbol": symbol,
+                        "open": e.open,
+                        "high": e.high,
+                        "low": e.low,
+                        "close": e.close,
+                        "otc": e.otc,
+                        "timestamp": datetime.fromtimestamp(e.timestamp / 1000.0),
+                        "transactions": e.transactions,
+                        "volume": e.volume,
+                        "vwap": e.vwap,
+                    }
+                    for e in aggs or []
+                ]
+            except Exception as e:
+                if attempt == retries:
+                    log.warning(
+                        f"Could not obtain market open bars for {symbol}. Error: {e}"
+                    )
+                    return []
+                await sleep(backoff_seconds * 2**attempt)
+        return []
+
+    results = await gather(*(get_symbol_bars(symbol) for symbol in symbols))
+    market_open_bars = {symbol: bars for symbol, bars in zip(symbols, results) if bars}
+
+    if snapshot_fallback and (
+        missing_symbols := [e for e in symbols if e not in market_open_bars]
+    ):
+        log.info(
+            f"Falling back to snapshots for {len(missing_symbols)} symbols without market open bars."
+        )
+        try:
+            snapshots = await to_thread(
+                client.get_snapshot_all,
+                market_type="stocks",
+                tickers=missing_symbols,
+            )
+        except Exception as e:
+            log.warning(f"Could not obtain snapshots. Error: {e}")
+            snapshots = []
+
+        for snapshot in snapshots or []:
+            if snapshot.day is None or not snapshot.day.open:
+                continue
+            market_open_bars[snapshot.ticker] = [
+                {
+                    "symbol": snapshot.ticker,
+                    "open": snapshot.day.open,
+                    "high": snapshot.day.high,
+                    "low": snapshot.day.low,
+                    "close": snapshot.day.close,
+                    "otc": snapshot.day.otc,
+                    "timestamp": market_open_time,  # the day bar opens at market open
+                    "transactions": snapshot.day.transactions,
+                    "volume": snapshot.day.volume,
+                    "vwap": snapshot.day.vwap,
+                }
+            ]
+
+    log.info(
+        f"Obtained market open bars for {len(market_open_bars)} of {len(symbols)} symbols."
+    )
+
+    return market_open_bars
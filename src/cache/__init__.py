@@ -4,5 +4,6 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .artifact_cache import ArtifactCache
 from .persistent_cache import PersistentCache
 from .persistent_cache import generate_key
@@ -0,0 +1,249 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import getenv, makedirs, remove, replace
+from os.path import abspath, join, dirname, isfile, getsize
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5, sha256
+from json import load, dump
+from re import compile as compile_regex
+from threading import Lock
+from time import time
+from uuid import uuid4
+from minio import Minio
+from minio.error import S3Error
+from portalocker import Lock as FileLock
+
+from src.utils import log
+
+
+CONTENT_ADDRESSED_OBJECT_NAME = compile_regex(r"_([0-9a-f]{64})\.")
+
+
+class ArtifactCache:
+    """
+    A local on-disk cache of objects in a MinIO bucket, such as model artifacts.
+
+    Cached objects are keyed by object name and ETag. Objects whose names contain the SHA-256 hash of their contents, as written by record_binary_daily_trend_models, never change and are served from disk without contacting MinIO; the ETag of any other object is checked with a single metadata request. Downloads are verified against the MD5 ETag and the SHA-256 hash in the object name where these are available, and the contents of cached files are verified against the SHA-256 hash recorded when they were downloaded. Files are written to a temporary path and moved into place, and the index is rewritten atomically once a request is complete, so that a crashed process never leaves a partial file behind. Files are evicted in least recently used order when the cache exceeds its size budget.
+
+    The cache directory may be shared by several processes, such as the runner, the trainer and backtests. The index is rewritten under a file lock, after merging in the entries written by other processes since it was read, so that no process drops the entries of another.
+
+    The cache directory and size budget can be overridden with the MODEL_ARTIFACT_CACHE_PATH and MODEL_ARTIFACT_CACHE_BYTES environment variables.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        bucket_name: str = "models",
+        cache_dir: str | None = None,
+        max_size_bytes: int | None = None,
+    ):
+        log.function_call()
+        self.minio_client = minio_client
+        self.bucket_name = bucket_name
+        self.cache_dir = abspath(
+            cache_dir
+            or getenv(
+                "MODEL_ARTIFACT_CACHE_PATH",
+                join(dirname(__file__), "../../staging/artifacts"),
+            )
+        )
+        self.max_size_bytes = max_size_bytes or int(
+            getenv("MODEL_ARTIFACT_CACHE_BYTES", 10 * 1024**3)
+        )
+        self.index_path = join(self.cache_dir, f"{bucket_name}.json")
+        self.index_lock_path = f"{self.index_path}.lock"
+        self.index: dict[str, dict] = {}
+        self.lock = Lock()
+        self._load_index()
+
+    def _read_index(self) -> dict[str, dict]:
+        if not isfile(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return load(f)
+        except ValueError as e:
+            log.warning(f"Could not read artifact cache index. Error: {e}")
+            return {}
+
+    def _load_index(self):
+        log.function_call()
+        makedirs(self.cache_dir, exist_ok=True)
+        self.index = self._read_index()
+
+    def _merge_index(self):  # called with both locks held
+        for object_name, entry in self._read_index().items():
+            current_entry = self.index.get(object_name)
+            if current_entry is None or entry["last_used"] > current_entry["last_used"]:
+                self.index[object_name] = entry
+        for object_name in [
+            e for e, entry in self.index.items() if not isfile(entry["file_path"])
+        ]:
+            del self.index[object_name]  # evicted by another process
+
+    def _save_index(self):
+        temporary_path = f"{self.index_path}.{uuid4()}.tmp"
+        with open(temporary_path, "w") as f:
+            dump(self.index, f)
+        replace(temporary_path, self.index_path)
+
+    def _file_path(self, object_name: str, etag: str) -> str:
+        return join(self.cache_dir, self.bucket_name, etag, object_name)
+
+    def _is_valid(self, entry: dict) -> bool:
+        if (
+            not isfile(entry["file_path"])
+            or getsize(entry["file_path"]) != entry["size"]
+        ):
+            return False
+        with open(entry["file_path"], "rb") as f:
+            return sha256(f.read()).hexdigest() == entry["sha256"]
+
+    def get(self, object_name: str) -> str:
+        """
+        Returns the local path of an object, downloading it if it is not cached or has changed.
+
+        Args:
+            object_name (str): The name of the object.
+
+        Returns:
+            str: The path of the cached file.
+
+        Raises:
+            S3Error: If the object cannot be downloaded.
+            ValueError: If the downloaded contents do not match their checksum.
+        """
+        log.function_call()
+
+        file_path = self._get(object_name)
+        self._evict(keep={object_name})
+        return file_path
+
+    def _get(self, object_name: str) -> str:
+        with self.lock:
+            entry = self.index.get(object_name)
+
+        if (
+            entry is not None
+            and CONTENT_ADDRESSED_OBJECT_NAME.search(object_name) is None
+        ):
+            etag = self.minio_client.stat_object(self.bucket_name, object_name).etag
+            if etag != entry["etag"]:
+                entry = None  # the object has been replaced
+
+        if entry is not None and self._is_valid(entry):
+            with self.lock:
+                entry["last_used"] = time()
+            return entry["file_path"]
+
+        return self._download(object_name)
+
+    def _download(self, object_name: str) -> str:
+        response = self.minio_client.get_object(self.bucket_name, object_name)
+        try:
+            data = response.read()
+            etag = response.headers.get("ETag", "").strip('"')
+        finally:
+            response.close()
+            response.release_conn()
+
+        content_hash = sha256(data).hexdigest()
+        if (
+            expected_hash := CONTENT_ADDRESSED_OBJECT_NAME.search(object_name)
+        ) is not None and expected_hash.group(1) != content_hash:
+            raise ValueError(f"Checksum mismatch for object '{object_name}'.")
+        if etag and "-" not in etag and md5(data).hexdigest() != etag:
+            raise ValueError(
+                f"ETag mismatch for object '{object_name}'."
+            )  # multipart ETags are not content hashes
+
+        file_path = self._file_path(object_name, etag or content_hash)
+        makedirs(dirname(file_path), exist_ok=True)
+        temporary_path = f"{file_path}.{uuid4()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        replace(temporary_path, file_path)
+
+        with self.lock:
+            previous_entry = self.index.get(object_name)
+            self.index[object_name] = {
+                "etag": etag,
+                "sha256": content_hash,
+                "size": len(data),
+                "file_path": file_path,
+                "last_used": time(),
+            }
+
+        if (
+            previous_entry is not None
+            and previous_entry["file_path"] != file_path
+            and isfile(previous_entry["file_path"])
+        ):
+            remove(previous_entry["file_path"])
+
+        log.info(
+            f"Cached object '{object_name}' from bucket '{self.bucket_name}' ({len(data)} bytes)."
+        )
+
+        return file_path
+
+    def _evict(self, keep: set[str]):
+        with self.lock, FileLock(self.index_lock_path, timeout=60):
+            self._merge_index()
+            size = sum(entry["size"] for entry in self.index.values())
+            for object_name, entry in sorted(
+                self.index.items(), key=lambda e: e[1]["last_used"]
+            ):
+                if size <= self.max_size_bytes:
+                    break
+                if object_name in keep:
+                    continue
+                if isfile(entry["file_path"]):
+                    remove(entry["file_path"])
+                del self.index[object_name]
+                size -= entry["size"]
+                log.info(f"Evicted object '{object_name}' from the artifact cache.")
+            self._save_index()
+
+    def prefetch(
+        self,
+        object_names: list[str],
+        max_workers: int = 8,
+    ) -> dict[str, str]:
+        """
+        Ensures that a number of objects are cached, downloading those that are not concurrently.
+
+        Args:
+            object_names (list[str]): The names of the objects.
+            max_workers (int): The maximum number of concurrent downloads. Defaults to 8.
+
+        Returns:
+            dict[str, str]: The path of each cached file, keyed by object name. Objects that could not be downloaded are omitted.
+        """
+        log.function_call()
+
+        def get(object_name: str) -> str | None:
+            try:
+                return self._get(object_name)
+            except (S3Error, ValueError) as e:
+                log.error(f"Could not cache object '{object_name}'. Error: {e}")
+                return None
+
+        object_names = list(dict.fromkeys(object_names))
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(object_names)))
+        ) as executor:
+            file_paths = dict(zip(object_names, executor.map(get, object_names)))
+
+        file_paths = {
+            object_name: file_path
+            for object_name, file_path in file_paths.items()
+            if file_path is not None
+        }
+        self._evict(keep=set(file_paths))
+
+        return file_paths
@@ -7,6 +7,9 @@ Copyright 2024
 from .backup_collection_to_file import backup_collection_to_file
 from .populate_database_exchanges import populate_database_exchanges
 from .populate_database_latest_market_data import populate_database_latest_market_data
+from .populate_database_latest_market_data_async import (
+    populate_database_latest_market_data_async,
+)
 from .populate_database_market_data import populate_database_market_data
 from .populate_database_related_companies import populate_database_related_companies
 from .populate_database_statistical_data import populate_database_statistical_data
@@ -8,14 +8,16 @@ from typing import Any
 from asyncio import run
 from datetime import datetime, timedelta
 
+from polygon import RESTClient
+
 from src.brokerage.polygon import (
     get_market_data,
     create_polygon_client,
 )
 from src.sql import (
-    insert_data,
+    copy_data,
     create_sql_client,
-    unpack_simple_table,
+    DatabaseClient,
 )
 from src.utils import log
 
@@ -25,6 +27,8 @@ def populate_database_latest_market_data(
     collection: Any,
     ticker: str,
     from_: datetime,
+    polygon_client: RESTClient | None = None,
+    database_client: DatabaseClient | None = None,
 ) -> bool:
     """
     Populates the database with the latest market data for a specific ticker.
@@ -34,14 +38,16 @@ def populate_database_latest_market_data(
         collection: Any type representing the database collection to populate.
         ticker: A string representing the specific ticker symbol.
         from_: A datetime object representing the start date for data retrieval.
+        polygon_client: An optional Polygon client, so that one client can be shared across tickers. Defaults to a new client.
+        database_client: An optional database client. Defaults to the client of this process.
 
     Returns:
         A boolean value indicating the success of data population for the given ticker.
     """
     log.function_call()
 
-    polygon_client = create_polygon_client()
-    database_client = create_sql_client()
+    polygon_client = polygon_client or create_polygon_client()
+    database_client = database_client or create_sql_client()
 
     now = datetime.now()
     if "C:" in ticker or "I:" in ticker or "X:" in ticker:
@@ -61,14 +67,13 @@ def populate_database_latest_market_data(
     ):
         log.info(f"Data obtained for symbol: {ticker}")
         log.info(f"Number of documents obtained: {len(historical_bars)}")
-        documents = unpack_simple_table(
-            collection=collection,
-            data=historical_bars,
-        )
-        result = insert_data(
+        written = copy_data(
             database_client,
-            documents,
-        )
-        log.info(f"Data inserted for symbol: {ticker}")
+            collection,
+            historical_bars,
+            on_conflict="nothing",
+        )  # bars which are already stored are skipped
+        result = written is not None
+        log.info(f"{written} bars inserted for symbol: {ticker}")
 
     return result
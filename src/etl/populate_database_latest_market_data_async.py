@@ -0,0 +1,97 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from asyncio import Semaphore, gather
+from datetime import datetime, timedelta
+
+from polygon import RESTClient
+
+from src.brokerage.polygon import (
+    get_market_data,
+    create_polygon_client,
+)
+from src.sql import (
+    AsyncDatabaseClient,
+    create_async_sql_client,
+    insert_data_async,
+    unpack_simple_table,
+)
+from src.utils import log
+
+
+async def populate_database_latest_market_data_async(
+    timespan: str,
+    collection: Any,
+    latest_market_data_timestamps: list[dict[str, Any]],
+    polygon_client: RESTClient | None = None,
+    database_client: AsyncDatabaseClient | None = None,
+    max_concurrency: int = 8,
+) -> list[bool | None]:
+    """
+    Populates the database with the latest market data for many tickers at once, so that the market data of some tickers is fetched while that of others is written.
+
+    Args:
+        timespan: A string specifying the timespan for market data retrieval.
+        collection: Any type representing the database collection to populate.
+        latest_market_data_timestamps: The 'symbol' of each ticker and the 'timestamp' of its latest stored market data, after which market data is retrieved.
+        polygon_client: An optional Polygon client. Defaults to a new client.
+        database_client: An optional async database client. Defaults to a new client, which is disposed of once the tickers are populated.
+        max_concurrency: The maximum number of tickers populated at a time. Defaults to 8.
+
+    Returns:
+        A list of boolean values indicating the success of data population for each ticker, or None for a ticker without new market data.
+    """
+    log.function_call()
+
+    polygon_client = polygon_client or create_polygon_client()
+    owns_database_client = database_client is None
+    database_client = database_client or create_async_sql_client()
+    semaphore = Semaphore(max_concurrency)
+
+    now = datetime.now()
+
+    async def populate(ticker: str, from_: datetime) -> bool | None:
+        if "C:" in ticker or "I:" in ticker or "X:" in ticker:
+            log.info(
+                "Ticker is a currency conversion (C:) or index (I:) or mutual (X:)"
+            )
+            return False
+
+        async with semaphore:
+            log.info(f"Processing: {ticker}")
+            if not (
+                historical_bars := await get_market_data(
+                    client=polygon_client,
+                    ticker=ticker,
+                    from_=from_,
+                    to=now - timedelta(days=1),
+                    timespan=timespan,
+                )
+            ):
+                return None
+
+            log.info(
+                f"Number of documents obtained for {ticker}: {len(historical_bars)}"
+            )
+            result = await insert_data_async(
+                database_client,
+                unpack_simple_table(collection=collection, data=historical_bars),
+                allow_partial_inserts=True,
+            )  # bars which are already stored are skipped
+            log.info(f"Data inserted for symbol: {ticker}")
+            return result
+
+    try:
+        return await gather(
+            *[
+                populate(e["symbol"], e["timestamp"] + timedelta(days=1))
+                for e in latest_market_data_timestamps
+            ]
+        )
+    finally:
+        if owns_database_client:
+            await database_client.dispose()
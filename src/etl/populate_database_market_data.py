@@ -13,10 +13,9 @@ from src.brokerage.polygon import (
     create_polygon_client,
 )
 from src.sql import (
-    insert_data,
+    copy_data,
     get_data,
     create_sql_client,
-    unpack_simple_table,
     Tickers,
 )
 from src.utils import log
@@ -71,15 +70,14 @@ def populate_database_market_data(
         ):
             log.info(f"Data obtained for symbol: {s['ticker']}")
             log.info(f"Number of documents obtained: {len(historical_bars)}")
-            documents = unpack_simple_table(
-                collection=collection,
-                data=historical_bars,
-            )
-            result = insert_data(
+            written = copy_data(
                 database_client,
-                documents,
-            )
-            log.info(f"Data inserted for symbol: {s['ticker']}")
+                collection,
+                historical_bars,
+                on_conflict="nothing",
+            )  # bars which are already stored are skipped
+            result = written is not None
+            log.info(f"{written} bars inserted for symbol: {s['ticker']}")
 
         results.append(result)
 
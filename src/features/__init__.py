@@ -0,0 +1,10 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from .get_daily_feature_store_path import get_daily_feature_store_path
+from .read_daily_feature_store import read_daily_feature_store
+from .update_daily_feature_store import update_daily_feature_store
+from .write_daily_feature_store import write_daily_feature_store
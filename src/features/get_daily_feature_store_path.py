@@ -0,0 +1,29 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import getenv
+from os.path import abspath, join, dirname
+
+from src.utils import log
+
+
+def get_daily_feature_store_path() -> str:
+    """
+    Returns the root directory of the daily feature store.
+
+    The location can be overridden with the DAILY_FEATURE_STORE_PATH environment variable, for example to share the store between the ETL and the training and trading processes.
+
+    Returns:
+        str: The absolute path of the daily feature store.
+    """
+    log.function_call()
+
+    return abspath(
+        getenv(
+            "DAILY_FEATURE_STORE_PATH",
+            join(dirname(__file__), "../../staging/features/daily"),
+        )
+    )
@@ -0,0 +1,107 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os.path import isdir
+from datetime import datetime
+import pandas as pd
+import pyarrow.dataset as ds
+
+from src.features.get_daily_feature_store_path import get_daily_feature_store_path
+from src.utils import log
+
+
+def read_daily_feature_store(
+    symbols: list[str] | None = None,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    columns: list[str] | None = None,
+    threshold_percentage: float | None = None,
+    store_path: str | None = None,
+) -> pd.DataFrame:
+    """
+    Reads daily features from the daily feature store.
+
+    Only the partitions of the requested symbols are scanned and only the requested columns are read. The result has the same layout as the output of build_daily_trend_features, so that training and inference use exactly the same features.
+
+    Args:
+        symbols (list[str] | None): Symbols to read. Defaults to None, in which case all symbols are read.
+        start_timestamp (datetime | None): Earliest timestamp to read. Defaults to None.
+        end_timestamp (datetime | None): Latest timestamp to read. Defaults to None.
+        columns (list[str] | None): Columns to read in addition to 'symbol'. Defaults to None, in which case all columns are read.
+        threshold_percentage (float | None): Threshold percentage the targets must have been computed with. Defaults to None, in which case it is not checked.
+        store_path (str | None): Root directory of the store. Defaults to None, in which case get_daily_feature_store_path is used.
+
+    Returns:
+        pd.DataFrame: The daily features indexed and sorted by timestamp. Empty if the store does not exist or no rows match.
+
+    Raises:
+        ValueError: If the stored targets were computed with a different threshold percentage.
+    """
+    log.function_call()
+
+    store_path = store_path or get_daily_feature_store_path()
+
+    if (
+        not isdir(store_path)
+        or not (
+            dataset := ds.dataset(store_path, format="parquet", partitioning="hive")
+        ).files
+    ):
+        log.warning(f"Daily feature store not found: {store_path}")
+        return pd.DataFrame()
+
+    filters = []
+    if symbols is not None:
+        filters.append(ds.field("symbol").isin(symbols))
+    if start_timestamp is not None:
+        filters.append(ds.field("timestamp") >= pd.Timestamp(start_timestamp))
+        filters.append(ds.field("year") >= pd.Timestamp(start_timestamp).year)
+    if end_timestamp is not None:
+        filters.append(ds.field("timestamp") <= pd.Timestamp(end_timestamp))
+        filters.append(ds.field("year") <= pd.Timestamp(end_timestamp).year)
+
+    expression = None
+    for e in filters:
+        expression = e if expression is None else expression & e
+
+    table = dataset.to_table(
+        columns=(
+            None
+            if columns is None
+            else list(
+                dict.fromkeys(
+                    ["timestamp", "symbol"]
+                    + columns
+                    + (
+                        ["threshold_percentage"]
+                        if threshold_percentage is not None
+                        else []
+                    )
+                )
+            )
+        ),
+        filter=expression,
+    )
+
+    daily_features = table.to_pandas(split_blocks=True, self_destruct=True)
+    daily_features = daily_features.drop(columns=["year"], errors="ignore")
+    daily_features["symbol"] = daily_features["symbol"].astype(str)
+    daily_features = daily_features.set_index("timestamp").sort_index(kind="stable")
+    if columns is None:
+        daily_features["timestamp"] = daily_features.index.date
+
+    if (
+        threshold_percentage is not None
+        and not daily_features.empty
+        and not (daily_features["threshold_percentage"] == threshold_percentage).all()
+    ):
+        raise ValueError(
+            f"The daily feature store targets were not computed with a threshold percentage of {threshold_percentage}."
+        )
+
+    log.info(f"Read {len(daily_features)} rows from the daily feature store.")
+
+    return daily_features
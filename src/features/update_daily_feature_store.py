@@ -0,0 +1,121 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from sqlalchemy import and_
+import pandas as pd
+
+from src.sql.client import DatabaseClient
+from src.sql import get_dataframe, PolygonMarketDataDay
+from src.ml.utils import build_daily_trend_features, prepare_daily_data
+from src.features.read_daily_feature_store import read_daily_feature_store
+from src.features.write_daily_feature_store import write_daily_feature_store
+from src.utils import log
+
+
+def update_daily_feature_store(
+    database_client: DatabaseClient,
+    symbols: list[str],
+    threshold_percentage: float = 0.50,
+    store_path: str | None = None,
+) -> list[str]:
+    """
+    Brings the daily feature store up to date with the daily market data in the database.
+
+    Only the daily market data newer than the latest stored date of each symbol is queried, except for symbols that are not yet in the store, whose full history is queried. The features of each updated symbol are recomputed from its stored prices, which yields the same values as computing them from the database, and only the partitions from the year of its previously latest date onwards are rewritten, as the targets of that date change.
+
+    Args:
+        database_client (DatabaseClient): A DatabaseClient instance for accessing the database.
+        symbols (list[str]): Symbols to update.
+        threshold_percentage (float): Absolute threshold percentage for the threshold targets. Defaults to 0.50.
+        store_path (str | None): Root directory of the store. Defaults to None, in which case get_daily_feature_store_path is used.
+
+    Returns:
+        list[str]: The symbols that were updated.
+    """
+    log.function_call()
+
+    threshold_percentage = abs(threshold_percentage)
+
+    stored_features = read_daily_feature_store(
+        symbols=symbols,
+        threshold_percentage=threshold_percentage,
+        store_path=store_path,
+    )
+    latest_timestamps: dict[str, pd.Timestamp] = (
+        {}
+        if stored_features.empty
+        else stored_features.index.to_series()
+        .groupby(stored_features["symbol"].to_numpy())
+        .max()
+        .to_dict()
+    )
+
+    daily_data = []
+    if latest_timestamps:
+        daily_data.append(
+            get_dataframe(
+                database_client,
+                models=[PolygonMarketDataDay],
+                where_clause=and_(
+                    PolygonMarketDataDay.symbol.in_(list(latest_timestamps)),
+                    PolygonMarketDataDay.timestamp > min(latest_timestamps.values()),
+                ),
+            )
+        )
+    if new_symbols := [e for e in symbols if e not in latest_timestamps]:
+        daily_data.append(
+            get_dataframe(
+                database_client,
+                models=[PolygonMarketDataDay],
+                where_clause=PolygonMarketDataDay.symbol.in_(new_symbols),
+            )
+        )
+    daily_data = [e for e in daily_data if e is not None and not e.empty]
+
+    if not daily_data:
+        log.info("Daily feature store is up to date.")
+        return []
+
+    daily_data = prepare_daily_data(pd.concat(daily_data, ignore_index=True))
+
+    updated_symbols: list[str] = []
+    for symbol, daily_symbol_data in daily_data.groupby("symbol"):
+        if symbol in latest_timestamps:
+            daily_symbol_data = daily_symbol_data[
+                daily_symbol_data.index > latest_timestamps[symbol]
+            ]
+        if daily_symbol_data.empty:
+            continue
+
+        if symbol in latest_timestamps:
+            daily_symbol_data = pd.concat(
+                [
+                    stored_features[stored_features["symbol"] == symbol],
+                    daily_symbol_data,
+                ]
+            )
+        daily_symbol_features = build_daily_trend_features(
+            daily_symbol_data,
+            threshold_percentage=threshold_percentage,
+        )
+        daily_symbol_features["threshold_percentage"] = threshold_percentage
+
+        first_changed_timestamp = (
+            latest_timestamps[symbol]
+            if symbol in latest_timestamps
+            else daily_symbol_features.index.min()
+        )
+        write_daily_feature_store(
+            daily_symbol_features[
+                daily_symbol_features.index.year >= first_changed_timestamp.year
+            ],
+            store_path=store_path,
+        )
+        updated_symbols.append(symbol)
+
+    log.info(f"Updated the daily feature store for {len(updated_symbols)} symbols.")
+
+    return updated_symbols
@@ -0,0 +1,63 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.features.get_daily_feature_store_path import get_daily_feature_store_path
+from src.utils import log
+
+
+WEEKDAY_COLUMNS = [
+    "weekday_monday",
+    "weekday_tuesday",
+    "weekday_wednesday",
+    "weekday_thursday",
+    "weekday_friday",
+]
+
+
+def write_daily_feature_store(
+    daily_features: pd.DataFrame,
+    store_path: str | None = None,
+) -> None:
+    """
+    Writes daily features to the daily feature store, replacing the partitions they fall into.
+
+    The store is a Parquet dataset partitioned by symbol and year, so the rows of each symbol and year that is written must be complete. Any other partitions are left untouched.
+
+    Args:
+        daily_features (pd.DataFrame): Daily features indexed by timestamp with a 'symbol' column, as returned by build_daily_trend_features.
+        store_path (str | None): Root directory of the store. Defaults to None, in which case get_daily_feature_store_path is used.
+    """
+    log.function_call()
+
+    if daily_features.empty:
+        return
+
+    store_path = store_path or get_daily_feature_store_path()
+
+    daily_features = daily_features.drop(
+        columns=["timestamp"], errors="ignore"
+    )  # the dates are recovered from the index when reading
+    for column in WEEKDAY_COLUMNS:
+        if column not in daily_features.columns:
+            daily_features[column] = False
+    daily_features = daily_features.rename_axis("timestamp").reset_index()
+    daily_features["year"] = daily_features["timestamp"].dt.year
+
+    pq.write_to_dataset(
+        pa.Table.from_pandas(daily_features, preserve_index=False),
+        root_path=store_path,
+        partition_cols=["symbol", "year"],
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+    log.info(
+        f"Wrote {len(daily_features)} rows for {daily_features['symbol'].nunique()} symbols to the daily feature store."
+    )
@@ -7,3 +7,4 @@ Copyright 2024
 from .create_minio_client import create_minio_client
 from .download_file import download_file
 from .upload_file import upload_file
+from .upload_objects import upload_objects
@@ -0,0 +1,81 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from minio import Minio
+from minio.error import S3Error
+
+from src.utils import log
+
+
+def upload_objects(
+    minio_client: Minio,
+    bucket_name: str,
+    objects: dict[str, bytes],
+    max_workers: int = 8,
+) -> list[str]:
+    """
+    Uploads a number of in-memory objects to a specified MinIO bucket concurrently, creating the bucket if it does not exist.
+
+    The objects are streamed from memory, so no local files are written. Uploads are spread over a bounded pool of threads, which share the MinIO client and its connection pool.
+
+    Args:
+        minio_client (Minio): The MinIO client used to interact with the MinIO server.
+        bucket_name (str): The name of the bucket to which the objects will be uploaded.
+        objects (dict[str, bytes]): The contents of each object, keyed by object name.
+        max_workers (int): The maximum number of concurrent uploads. Defaults to 8.
+
+    Returns:
+        list[str]: The names of the objects which were uploaded successfully.
+
+    Examples:
+        upload_objects(client, 'my-bucket', {'my-object.txt': b'Hello, world!'})
+    """
+    log.function_call()
+
+    if not objects:
+        return []
+
+    try:
+        if not minio_client.bucket_exists(bucket_name):
+            log.info(f"Bucket '{bucket_name}' does not exist. Creating it.")
+            minio_client.make_bucket(bucket_name)
+    except S3Error as err:
+        log.error(f"Error occurred: {err}")
+        return []
+
+    def put_object(object_name: str, data: bytes) -> str | None:
+        try:
+            minio_client.put_object(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                data=BytesIO(data),
+                length=len(data),
+            )
+        except S3Error as err:
+            log.error(f"Error occurred uploading '{object_name}': {err}")
+            return None
+        return object_name
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(objects)))
+    ) as executor:
+        uploaded = [
+            object_name
+            for object_name in executor.map(
+                put_object,
+                objects.keys(),
+                objects.values(),
+            )
+            if object_name is not None
+        ]
+
+    log.info(
+        f"Uploaded {len(uploaded)} of {len(objects)} objects to bucket '{bucket_name}'."
+    )
+
+    return uploaded
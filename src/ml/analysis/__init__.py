@@ -4,4 +4,5 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .evaluate_serving_set_profits import evaluate_serving_set_profits
 from .run_pca import run_pca
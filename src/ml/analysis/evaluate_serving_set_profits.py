@@ -0,0 +1,146 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.utils import log
+
+
+def _parse_serving_arrays(
+    values: list[str | None], width: int | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses the JSON encoded serving arrays of many models at once into a matrix with one row per model.
+
+    The lists are split and their numbers parsed by Arrow compute kernels over all models, rather than decoded model by model.
+
+    Args:
+        values (list[str | None]): A JSON encoded list of numbers, or null, for each model.
+        width (int | None): The number of columns of the matrix, beyond which lists are truncated. Defaults to the length of the longest list.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The matrix, padded with NaN beyond the end of each list, the length of each list, and whether each list is not null.
+    """
+    strings = pa.array(values, type=pa.string())
+    strings = pc.if_else(
+        pc.equal(strings, "null"), pa.scalar(None, pa.string()), strings
+    )
+    is_present = pc.is_valid(strings).to_numpy(zero_copy_only=False)
+
+    inner = pc.utf8_trim_whitespace(pc.utf8_trim(strings, characters="[]"))
+    inner = pc.if_else(pc.equal(inner, ""), pa.scalar(None, pa.string()), inner)
+    lists = pc.split_pattern(inner, pattern=",")
+    lengths = pc.fill_null(pc.list_value_length(lists), 0).to_numpy().astype(int)
+    flattened = pc.cast(
+        pc.utf8_trim_whitespace(pc.list_flatten(lists)), pa.float64()
+    ).to_numpy()
+
+    width = int(lengths.max(initial=0)) if width is None else width
+    rows = np.repeat(np.arange(len(values)), lengths)
+    columns = np.arange(len(flattened)) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    is_within = columns < width
+
+    matrix = np.full((len(values), width), np.nan)
+    matrix[rows[is_within], columns[is_within]] = flattened[is_within]
+
+    return matrix, lengths, is_present
+
+
+def evaluate_serving_set_profits(
+    models: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """
+    Evaluates the positions that would have been taken, and their profits, over the serving set of every standard model.
+
+    Each standard model is joined with the first positive and negative threshold models trained on the same symbols. A long position is taken on each serving date for which the standard model predicts a rise and the positive threshold model predicts a rise beyond its threshold, and a short position on each date for which the standard model predicts a fall and the negative threshold model predicts a fall beyond its threshold. The serving arrays of all models are parsed once and the positions of all models are found together with masked array operations.
+
+    Args:
+        models (list[dict[str, Any]]): Rows of the models table, including their 'threshold_percentage', 'symbols', 'y_serve_pred', 'serving_set_indicated_entry_prices' and 'serving_set_indicated_exit_prices'.
+
+    Returns:
+        list[dict[str, Any]]: For each standard model with at least one threshold model, in the order given, its 'symbols', the 'number_long_positions' and 'number_short_positions' taken, and the entry prices and profits of its 'long_positions', 'long_profits', 'short_positions' and 'short_profits'.
+    """
+    log.function_call()
+
+    standard_models, threshold_models = [], {1: {}, -1: {}}
+    for model in models:
+        if model["threshold_percentage"] == 0.0:
+            standard_models.append(model)
+        elif model["threshold_percentage"] > 0.0:
+            threshold_models[1].setdefault(model["symbols"], model)
+        elif model["threshold_percentage"] < 0.0:
+            threshold_models[-1].setdefault(model["symbols"], model)
+
+    standard_models = [
+        e
+        for e in standard_models
+        if e["symbols"] in threshold_models[1] or e["symbols"] in threshold_models[-1]
+    ]  # models without threshold models are not evaluated
+    log.info(f"Evaluating {len(standard_models)} models with threshold models.")
+    if not standard_models:
+        return []
+
+    exit_prices, exit_lengths, has_exit_prices = _parse_serving_arrays(
+        [e["serving_set_indicated_exit_prices"] for e in standard_models]
+    )
+    entry_prices, entry_lengths, has_entry_prices = _parse_serving_arrays(
+        [e["serving_set_indicated_entry_prices"] for e in standard_models],
+        width=exit_prices.shape[1],
+    )
+    predictions, prediction_lengths, _ = _parse_serving_arrays(
+        [e["y_serve_pred"] for e in standard_models],
+        width=exit_prices.shape[1],
+    )
+    lengths = np.where(
+        has_exit_prices & has_entry_prices,
+        np.minimum(np.minimum(exit_lengths, entry_lengths), prediction_lengths),
+        0,
+    )
+    in_serving_set = np.arange(exit_prices.shape[1]) < lengths[:, None]
+
+    threshold_predictions = {}
+    for direction, direction_models in threshold_models.items():
+        joined = [direction_models.get(e["symbols"]) for e in standard_models]
+        threshold_predictions[direction], _, _ = _parse_serving_arrays(
+            [e["y_serve_pred"] if e is not None else None for e in joined],
+            width=exit_prices.shape[1],
+        )  # a missing threshold model predicts no move beyond its threshold
+
+    is_long = in_serving_set & (predictions != 0) & (threshold_predictions[1] == 1)
+    is_short = in_serving_set & (predictions == 0) & (threshold_predictions[-1] == 1)
+    profits = exit_prices - entry_prices
+
+    number_long_positions = is_long.sum(axis=1)
+    number_short_positions = is_short.sum(axis=1)
+    long_offsets = np.concatenate(([0], np.cumsum(number_long_positions))).tolist()
+    short_offsets = np.concatenate(([0], np.cumsum(number_short_positions))).tolist()
+    long_positions = entry_prices[is_long].tolist()  # in row order
+    long_profits = profits[is_long].tolist()
+    short_positions = entry_prices[is_short].tolist()
+    short_profits = (-profits[is_short]).tolist()
+
+    combined_profits: list[dict[str, Any]] = []
+    for i, standard_model in enumerate(standard_models):
+        long_slice = slice(long_offsets[i], long_offsets[i + 1])
+        short_slice = slice(short_offsets[i], short_offsets[i + 1])
+        combined_profits.append(
+            {
+                "symbols": standard_model["symbols"],
+                "number_long_positions": long_offsets[i + 1] - long_offsets[i],
+                "number_short_positions": short_offsets[i + 1] - short_offsets[i],
+                "long_positions": long_positions[long_slice],
+                "long_profits": long_profits[long_slice],
+                "short_positions": short_positions[short_slice],
+                "short_profits": short_profits[short_slice],
+            }
+        )
+
+    return combined_profits
@@ -4,4 +4,15 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .compile_binary_daily_trend_models import compile_binary_daily_trend_models
+from .load_binary_daily_trend_models import load_binary_daily_trend_models
 from .predict_binary_daily_trend import predict_binary_daily_trend
+from .predict_pooled_binary_daily_trend import predict_pooled_binary_daily_trend
+from .record_binary_daily_trend_models import record_binary_daily_trend_models
+from .run_walk_forward_validation import run_walk_forward_validation
+from .score_compiled_binary_daily_trend_models import (
+    score_compiled_binary_daily_trend_models,
+)
+from .train_binary_daily_trend_models import train_binary_daily_trend_models
+from .tune_binary_daily_trend_model import tune_binary_daily_trend_model
+from .update_binary_daily_trend_models import update_binary_daily_trend_models
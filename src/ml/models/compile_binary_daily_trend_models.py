@@ -0,0 +1,158 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from json import loads
+import numpy as np
+import xgboost as xgb
+
+from src.utils import log
+
+
+def _get_base_margins(base_score: str, n_targets: int) -> np.ndarray:
+    """
+    Converts the base score of a model to a base margin per target.
+
+    Args:
+        base_score (str): The base score, as saved by XGBoost. Older versions save a single probability shared by every target, and newer versions a vector such as '[5E-1,4E-1]' with one probability per target.
+        n_targets (int): The number of targets of the model.
+
+    Returns:
+        np.ndarray: The base margin of each target.
+
+    Raises:
+        ValueError: If the number of base scores is neither one nor the number of targets.
+    """
+    base_scores = np.array(
+        [float(e) for e in base_score.strip("[]").split(",")], dtype=np.float64
+    )
+    if len(base_scores) not in (1, n_targets):
+        raise ValueError(
+            f"{len(base_scores)} base scores cannot be assigned to {n_targets} targets."
+        )
+    return np.broadcast_to(
+        np.log(base_scores / (1.0 - base_scores)), (n_targets,)
+    ).astype(np.float32)
+
+
+def compile_binary_daily_trend_models(
+    boosters: list[xgb.Booster],
+) -> dict[str, Any]:
+    """
+    Compiles the trees of a number of binary daily trend models into padded NumPy arrays, so that rows belonging to different models can be scored together by score_compiled_binary_daily_trend_models.
+
+    Arrays are indexed by model, tree and node. Models with fewer trees are padded with trees consisting of a single leaf with a value of zero, and trees with fewer nodes are padded with unused nodes. Split features are indices into the union of the feature names of all models. Both single-output and multi-output models are supported, with each tree of a single-output model contributing to the target of its output group.
+
+    Args:
+        boosters (list[xgb.Booster]): Trained boosters with the 'binary:logistic' objective and named features, such as those loaded from the UBJSON artifacts exported at training time.
+
+    Returns:
+        dict[str, Any]: The compiled models, holding the union of feature names, the split features, split conditions, child nodes, default directions and leaf values of every node, the base margin of every target and the number of targets of every model, and the maximum tree depth.
+    """
+    log.function_call()
+
+    models = [loads(booster.save_raw(raw_format="json")) for booster in boosters]
+
+    feature_names = list(
+        dict.fromkeys(
+            feature_name
+            for model in models
+            for feature_name in model["learner"]["feature_names"]
+        )
+    )
+    feature_positions = {
+        feature_name: i for i, feature_name in enumerate(feature_names)
+    }
+
+    n_targets = np.array(
+        [int(model["learner"]["learner_model_param"]["num_target"]) for model in models]
+    )
+    n_trees = max(
+        (
+            len(model["learner"]["gradient_booster"]["model"]["trees"])
+            for model in models
+        ),
+        default=1,
+    )
+    n_nodes = max(
+        (
+            len(tree["left_children"])
+            for model in models
+            for tree in model["learner"]["gradient_booster"]["model"]["trees"]
+        ),
+        default=1,
+    )
+    shape = (len(models), n_trees, n_nodes)
+
+    split_features = np.zeros(shape, dtype=np.int32)
+    split_conditions = np.zeros(shape, dtype=np.float32)
+    left_children = np.full(shape, -1, dtype=np.int32)
+    right_children = np.full(shape, -1, dtype=np.int32)
+    default_left = np.zeros(shape, dtype=bool)
+    leaf_values = np.zeros(shape + (n_targets.max(initial=1),), dtype=np.float32)
+    base_margins = np.zeros((len(models), n_targets.max(initial=1)), dtype=np.float32)
+    max_depth = 0
+
+    for m, model in enumerate(models):
+        base_margins[m, : n_targets[m]] = _get_base_margins(
+            model["learner"]["learner_model_param"]["base_score"], n_targets[m]
+        )
+
+        model_feature_positions = np.array(
+            [feature_positions[e] for e in model["learner"]["feature_names"]],
+            dtype=np.int32,
+        )
+        gradient_booster = model["learner"]["gradient_booster"]["model"]
+
+        for t, (tree, group) in enumerate(
+            zip(gradient_booster["trees"], gradient_booster["tree_info"])
+        ):
+            nodes = len(tree["left_children"])
+            size_leaf_vector = int(tree["tree_param"]["size_leaf_vector"])
+            is_leaf = np.array(tree["left_children"]) == -1
+
+            split_features[m, t, :nodes] = model_feature_positions[
+                tree["split_indices"]
+            ]
+            split_conditions[m, t, :nodes] = np.nan_to_num(
+                np.array(tree["split_conditions"], dtype=np.float32)
+            )
+            left_children[m, t, :nodes] = tree["left_children"]
+            right_children[m, t, :nodes] = tree["right_children"]
+            default_left[m, t, :nodes] = tree["default_left"]
+
+            if size_leaf_vector > 1:  # multi-output trees hold a vector per node
+                leaf_values[m, t, :nodes, :size_leaf_vector] = np.where(
+                    is_leaf[:, None],
+                    np.array(tree["base_weights"], dtype=np.float32).reshape(
+                        nodes, size_leaf_vector
+                    ),
+                    0.0,
+                )
+            else:
+                leaf_values[m, t, :nodes, group] = np.where(
+                    is_leaf, split_conditions[m, t, :nodes], 0.0
+                )
+
+            depths = np.zeros(nodes, dtype=int)
+            for node in range(nodes):  # children always follow their parents
+                if not is_leaf[node]:
+                    depths[tree["left_children"][node]] = depths[node] + 1
+                    depths[tree["right_children"][node]] = depths[node] + 1
+            max_depth = max(max_depth, int(depths.max()))
+
+    return {
+        "feature_names": feature_names,
+        "split_features": split_features,
+        "split_conditions": split_conditions,
+        "left_children": left_children,
+        "right_children": right_children,
+        "default_left": default_left,
+        "leaf_values": leaf_values,
+        "base_margins": base_margins,
+        "n_targets": n_targets,
+        "max_depth": max_depth,
+    }
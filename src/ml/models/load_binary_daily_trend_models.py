@@ -0,0 +1,92 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from datetime import datetime
+from sqlalchemy import and_
+from minio import Minio
+
+from src.sql.client import DatabaseClient
+from src.sql import get_data, Models
+from src.cache import ArtifactCache
+from src.utils import log, load_object_from_pickle
+
+
+def load_binary_daily_trend_models(
+    minio_client: Minio,
+    database_client: DatabaseClient,
+    symbols: list[str],
+    created_since: datetime,
+) -> dict[str, tuple[tuple[dict[str, Any], Any], ...]]:
+    """
+    Loads the most recent standard, positive threshold and negative threshold daily trend models of each symbol.
+
+    Only per-symbol models created since the given timestamp are considered, so that models are retrained from scratch once they reach a certain age. Models which are updated incrementally keep the creation timestamp of the model they were derived from. Model artifacts are served from the local artifact cache, which downloads any that are missing concurrently, and an artifact shared by several models is loaded only once.
+
+    Args:
+        minio_client (Minio): A Minio client instance for downloading model files.
+        database_client (DatabaseClient): A DatabaseClient instance for accessing the database.
+        symbols (list[str]): Symbols for which models are loaded.
+        created_since (datetime): Earliest creation timestamp of the models to be loaded.
+
+    Returns:
+        dict[str, tuple[tuple[dict[str, Any], Any], ...]]: For each symbol with a complete set of models, the Models row and the model itself of the standard, positive threshold and negative threshold models.
+    """
+    log.function_call()
+
+    rows = get_data(
+        database_client=database_client,
+        models=[Models],
+        where_clause=and_(
+            Models.symbol.in_(symbols),
+            Models.created_at >= created_since,
+            Models.threshold_percentage.is_not(None),
+        ),
+        as_dict=True,
+    )
+
+    latest_rows: dict[tuple[str, int], dict[str, Any]] = {}
+    for row in sorted(rows or [], key=lambda e: e["last_modified_at"]):
+        threshold_sign = (row["threshold_percentage"] > 0.0) - (
+            row["threshold_percentage"] < 0.0
+        )
+        latest_rows[(row["symbol"], threshold_sign)] = row
+
+    symbol_rows = {
+        symbol: [
+            latest_rows.get((symbol, threshold_sign)) for threshold_sign in [0, 1, -1]
+        ]
+        for symbol in symbols
+    }
+    symbol_rows = {
+        symbol: rows
+        for symbol, rows in symbol_rows.items()
+        if all(row is not None for row in rows)
+    }
+
+    model_files = ArtifactCache(minio_client, bucket_name="models").prefetch(
+        [row["model_url"] for rows in symbol_rows.values() for row in rows]
+    )
+
+    loaded_models: dict[str, Any] = {}
+    previous_models: dict[str, tuple[tuple[dict[str, Any], Any], ...]] = {}
+    for symbol, rows in symbol_rows.items():
+        if any(row["model_url"] not in model_files for row in rows):
+            continue
+
+        for row in rows:
+            if row["model_url"] not in loaded_models:
+                loaded_models[row["model_url"]] = load_object_from_pickle(
+                    model_files[row["model_url"]]
+                )
+
+        previous_models[symbol] = tuple(
+            (row, loaded_models[row["model_url"]]) for row in rows
+        )
+
+    log.info(f"Loaded previous models for {len(previous_models)} symbols.")
+
+    return previous_models
@@ -0,0 +1,121 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+from minio import Minio
+
+from src.sql.client import DatabaseClient
+from src.ml.models.train_binary_daily_trend_models import (
+    train_binary_daily_trend_models,
+)
+from src.ml.models.record_binary_daily_trend_models import (
+    record_binary_daily_trend_models,
+)
+from src.ml.utils import (
+    build_daily_trend_features,
+    build_daily_trend_training_data,
+    build_pooled_features,
+    prepare_daily_data,
+)
+from src.utils import log
+
+
+def predict_pooled_binary_daily_trend(
+    minio_client: Minio,
+    database_client: DatabaseClient,
+    daily_data: pd.DataFrame,
+    serving_set_size: int,
+    threshold_percentage: float = 1.50,
+    diagnostic_plots_flag: bool = False,
+    multi_output: bool = False,
+    daily_features: bool = False,
+    tune: bool = False,
+) -> list[str]:
+    """
+    Trains binary predictors on the daily trend of stock prices, pooling the historical data of all symbols.
+
+    Rather than training three models per symbol, as predict_binary_daily_trend does, a single standard, positive threshold and negative threshold model is trained across the whole universe using scale-free features. Each model is registered with the whole universe as its symbols, so that the universe can be scored with a single batched prediction.
+
+    Args:
+        minio_client (Minio): A Minio client instance for uploading model files.
+        database_client (DatabaseClient): A DatabaseClient instance for accessing the database.
+        daily_data (pd.DataFrame): A DataFrame containing stock price data with columns including 'timestamp', 'symbol', 'close', 'open', 'high', 'low', 'volume' and 'vwap'.
+        serving_set_size (int): The number of rows to be included in a serving set.
+        threshold_percentage (float): Percentage added to the entry price. A prediction of 1 indicates that the exit price will have moved by at least this percentage.
+        diagnostic_plots_flag (bool): Whether to produce diagnostic plots. Defaults to False.
+        multi_output (bool): Whether to train one multi-output model that predicts all three targets. Defaults to False.
+        daily_features (bool): Whether daily_data has been read from the daily feature store, in which case its targets and features are used as they are rather than computed. Defaults to False.
+        tune (bool): Whether to choose the hyperparameters of the models by a successive halving search with early stopping. Defaults to False.
+
+    Returns:
+        model_ids: A list of UUID strings of each unique model.
+    """
+    log.function_call()
+
+    threshold_percentage = abs(threshold_percentage)
+
+    if not daily_features:
+        daily_data = prepare_daily_data(daily_data)
+
+    features = [
+        "daily_return",
+        "overnight_gap",
+        "normalised_daily_macd_histogram",
+        "liquidity_bucket",
+    ]
+
+    targets = [
+        "target",
+        "positive_threshold_target",
+        "negative_threshold_target",
+    ]
+
+    prediction_inputs = pd.concat(
+        [
+            build_daily_trend_training_data(
+                daily_symbol_data
+                if daily_features
+                else build_daily_trend_features(
+                    daily_symbol_data,
+                    threshold_percentage=threshold_percentage,
+                )
+            )
+            for _, daily_symbol_data in daily_data.groupby("symbol")
+        ]
+    )
+
+    if prediction_inputs.empty:
+        log.warning("Insufficient data available for pooled model training.")
+        return []
+
+    prediction_inputs = build_pooled_features(prediction_inputs)
+    prediction_inputs = prediction_inputs.dropna(subset=features)
+
+    symbols = sorted(prediction_inputs["symbol"].unique())
+
+    log.info(f"Training pooled models across {len(symbols)} symbols.")
+
+    if (
+        payloads := train_binary_daily_trend_models(
+            symbols=symbols,
+            prediction_inputs=prediction_inputs,
+            features=features,
+            targets=targets,
+            serving_set_size=serving_set_size,
+            threshold_percentage=threshold_percentage,
+            multi_output=multi_output,
+            tune=tune,
+        )
+    ) is None:
+        return []
+
+    return record_binary_daily_trend_models(
+        minio_client=minio_client,
+        database_client=database_client,
+        name="pooled",
+        payloads=payloads,
+        diagnostic_plots_flag=diagnostic_plots_flag,
+    )
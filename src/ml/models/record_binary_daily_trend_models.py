@@ -0,0 +1,177 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from hashlib import sha256
+from json import dumps
+import pickle
+import pandas as pd
+from minio import Minio
+
+from src.sql.client import DatabaseClient
+from src.sql import (
+    insert_data,
+    Models,
+)
+from src.minio import upload_objects
+from src.ml.viz import plot_pca_results
+from src.utils import log
+
+
+def record_binary_daily_trend_models(
+    minio_client: Minio,
+    database_client: DatabaseClient,
+    name: str,
+    payloads: tuple[dict[str, Any], dict[str, Any], dict[str, Any]],
+    diagnostic_plots_flag: bool = False,
+) -> list[str]:
+    """
+    Uploads the artifacts of a set of daily trend models to object storage and inserts their metadata into the database.
+
+    Each artifact is pickled in memory and stored under a key derived from the SHA-256 hash of its contents, so that artifacts shared between the models, such as the training, test and serving data, are uploaded only once. The unique artifacts are then uploaded concurrently. The booster of each model is also exported in the native UBJSON format of XGBoost, which can be loaded for scoring much faster than the pickled classifier. The 'all' artifact of each model holds its payload with the other parts replaced by their keys. Parts that a payload lists under 'urls' have already been stored, as is the case for models that are updated incrementally, and are referenced rather than uploaded again.
+
+    Args:
+        minio_client (Minio): A Minio client instance for uploading model files.
+        database_client (DatabaseClient): A DatabaseClient instance for accessing the database.
+        name (str): Name used when logging. Normally the symbol for which the models were trained.
+        payloads (tuple[dict[str, Any], dict[str, Any], dict[str, Any]]): The standard, positive threshold and negative threshold model payloads.
+        diagnostic_plots_flag (bool): Whether to produce diagnostic plots. Defaults to False.
+
+    Returns:
+        list[str]: The UUID strings of the recorded models, or an empty list if any artifact could not be uploaded, in which case no metadata is inserted.
+    """
+    log.function_call()
+
+    parts = [
+        "model",
+        "training_data",
+        "training_targets",
+        "test_data",
+        "test_targets",
+        "serving_data",
+        "serving_targets",
+    ]
+
+    if diagnostic_plots_flag and "training_data" in payloads[0]:
+        plot_pca_results(
+            pd.concat([payloads[0]["training_data"], payloads[0]["test_data"]])
+        )
+
+    artifacts: dict[str, bytes] = {}
+
+    def add_artifact(obj: object) -> str:
+        return add_raw_artifact(
+            pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), extension="pkl.gz"
+        )
+
+    def add_raw_artifact(data: bytes, extension: str) -> str:
+        object_name = f"binary_daily_trend_{sha256(data).hexdigest()}.{extension}"
+        artifacts.setdefault(object_name, data)
+        return object_name
+
+    urls: list[dict[str, str]] = []
+    for payload in payloads:
+        payload_urls = {
+            part: payload.get("urls", {}).get(part) or add_artifact(payload[part])
+            for part in parts
+        }  # parts carried over from previous models are already stored
+        payload_urls["booster"] = add_raw_artifact(
+            bytes(payload["model"].get_booster().save_raw(raw_format="ubj")),
+            extension="ubj",
+        )  # loaded for scoring without unpickling the classifier
+        payload_urls["all"] = add_artifact(
+            payload | payload_urls
+        )  # the parts are referenced by key rather than stored a second time
+        urls.append(payload_urls)
+
+    log.info(
+        f"Uploading {len(artifacts)} unique artifacts for {name} ({len(parts) + 2} parts across {len(payloads)} models)."
+    )
+
+    uploaded = upload_objects(
+        minio_client=minio_client,
+        bucket_name="models",
+        objects=artifacts,
+    )
+
+    if missing := {e: artifacts[e] for e in artifacts.keys() - set(uploaded)}:
+        log.warning(f"Retrying {len(missing)} artifacts which were not uploaded.")
+        uploaded += upload_objects(
+            minio_client=minio_client,
+            bucket_name="models",
+            objects=missing,
+        )
+
+    if missing := artifacts.keys() - set(uploaded):
+        log.error(
+            f"{len(missing)} of {len(artifacts)} artifacts could not be uploaded for {name}. The models are not recorded."
+        )  # rows referring to missing artifacts would be selected and fail to load
+        return []
+
+    models = [
+        Models(
+            model_id=payload["model_id"],
+            model_url=payload_urls["model"],
+            booster_url=payload_urls["booster"],
+            symbols=dumps(payload["symbols"]),
+            symbol=(payload["symbols"][0] if len(payload["symbols"]) == 1 else None),
+            features=dumps(payload["features"]),
+            confusion_matrix=str(payload["confusion_matrix"]),
+            classification_report=str(payload["classification_report"]),
+            training_set_rows=payload["training_set_rows"],
+            training_data_url=payload_urls["training_data"],
+            training_targets_url=payload_urls["training_targets"],
+            test_set_rows=payload["test_set_rows"],
+            test_data_url=payload_urls["test_data"],
+            test_targets_url=payload_urls["test_targets"],
+            serving_set_rows=payload["serving_set_rows"],
+            serving_data_url=payload_urls["serving_data"],
+            serving_targets_url=payload_urls["serving_targets"],
+            accuracy=payload["accuracy"],
+            f1=payload["f1"],
+            balanced_accuracy=payload["balanced_accuracy"],
+            precision=payload["precision"],
+            y_serve=dumps(payload["y_serve"]),
+            y_serve_pred=dumps(payload["y_serve_pred"]),
+            serving_set_indicated_entry_prices=dumps(
+                payload["serving_set_indicated_entry_prices"]
+            ),
+            serving_set_indicated_exit_prices=dumps(
+                payload["serving_set_indicated_exit_prices"]
+            ),
+            first_entry_price=(
+                float(payload["serving_set_indicated_entry_prices"][0])
+                if len(payload["symbols"]) == 1
+                and len(payload["serving_set_indicated_entry_prices"])
+                else None
+            ),  # the serving sets of pooled models mix the prices of many symbols
+            last_modified_at=payload["timestamp"],
+            created_at=payload.get("created_at", payload["timestamp"]),
+            threshold_percentage=payload["threshold_percentage"],
+            hyperparameters=(
+                dumps(payload["hyperparameters"])
+                if payload.get("hyperparameters") is not None
+                else None
+            ),
+            fold_metrics=(
+                dumps(payload["fold_metrics"], default=str)
+                if payload.get("fold_metrics") is not None
+                else None
+            ),  # fold boundaries are timestamps
+        )
+        for payload, payload_urls in zip(payloads, urls)
+    ]
+
+    log.info("Inserting model metadata into the database.")
+
+    success = insert_data(
+        database_client=database_client,
+        documents=models,
+    )
+
+    log.info(f"Metadata database insertion success: {success}")
+
+    return [payload["model_id"] for payload in payloads]
@@ -0,0 +1,112 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from os import cpu_count
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import (
+    accuracy_score,
+    balanced_accuracy_score,
+    precision_score,
+    f1_score,
+)
+
+from src.utils import log
+
+
+def run_walk_forward_validation(
+    X: pd.DataFrame,
+    y: pd.DataFrame,
+    folds: list[tuple[np.ndarray, np.ndarray]],
+    classifiers: list[tuple[list[str], xgb.XGBClassifier]],
+    n_jobs: int | None = None,
+) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+    """
+    Trains and evaluates classifiers on each fold of a walk-forward validation.
+
+    The features are converted to a single DMatrix, from which the training and test matrices of each fold are sliced, and each training matrix is shared by all of the classifiers of the fold. Folds are evaluated concurrently, with the available threads divided between them.
+
+    Args:
+        X (pd.DataFrame): Features, sorted in time order.
+        y (pd.DataFrame): Targets, aligned with the features.
+        folds (list[tuple[np.ndarray, np.ndarray]]): The training and test row positions of each fold, as returned by build_walk_forward_folds.
+        classifiers (list[tuple[list[str], xgb.XGBClassifier]]): The unfitted classifiers to evaluate, each with the target columns it predicts. A classifier with several target columns is a multi-output classifier.
+        n_jobs (int | None): Total number of threads to use. Defaults to None, in which case all CPUs are used.
+
+    Returns:
+        tuple[pd.DataFrame, list[dict[str, Any]]]: The out-of-sample predictions of every target for the test rows of all folds, in fold order and indexed by row position, and the metrics of every target on each fold.
+    """
+    log.function_call()
+
+    data = xgb.DMatrix(X)
+    fold_jobs = max(1, (n_jobs or cpu_count() or 1) // max(1, len(folds)))
+
+    fold_data = [
+        (data.slice(train_index), data.slice(test_index))
+        for train_index, test_index in folds
+    ]
+
+    def evaluate_fold(fold: int) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+        train_index, test_index = folds[fold]
+        train_data, test_data = fold_data[fold]
+
+        predictions = pd.DataFrame(index=test_index)
+        for target_columns, classifier in classifiers:
+            train_data.set_label(y.iloc[train_index][target_columns].to_numpy())
+            booster = xgb.train(
+                classifier.get_xgb_params() | {"n_jobs": fold_jobs},
+                train_data,
+                num_boost_round=classifier.get_num_boosting_rounds(),
+            )
+            probabilities = booster.predict(test_data).reshape(
+                len(test_index), len(target_columns)
+            )
+            predictions[target_columns] = (probabilities > 0.5).astype(int)
+
+        fold_metrics = [
+            {
+                "fold": fold,
+                "target": target,
+                "training_start": X.index[train_index[0]],
+                "training_end": X.index[train_index[-1]],
+                "test_start": X.index[test_index[0]],
+                "test_end": X.index[test_index[-1]],
+                "training_rows": len(train_index),
+                "test_rows": len(test_index),
+                "accuracy": float(
+                    accuracy_score(y[target].iloc[test_index], predictions[target])
+                ),
+                "balanced_accuracy": float(
+                    balanced_accuracy_score(
+                        y[target].iloc[test_index], predictions[target]
+                    )
+                ),
+                "precision": float(
+                    precision_score(
+                        y[target].iloc[test_index], predictions[target], zero_division=0
+                    )
+                ),
+                "f1": float(
+                    f1_score(
+                        y[target].iloc[test_index], predictions[target], zero_division=0
+                    )
+                ),
+            }
+            for target in y.columns
+        ]
+
+        return predictions, fold_metrics
+
+    with ThreadPoolExecutor(max_workers=max(1, len(folds))) as executor:
+        results = list(executor.map(evaluate_fold, range(len(folds))))
+
+    return (
+        pd.concat([predictions for predictions, _ in results]),
+        [e for _, fold_metrics in results for e in fold_metrics],
+    )
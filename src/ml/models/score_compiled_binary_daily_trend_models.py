@@ -0,0 +1,70 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+import numpy as np
+import pandas as pd
+
+from src.utils import log
+
+
+def score_compiled_binary_daily_trend_models(
+    compiled_models: dict[str, Any],
+    X: pd.DataFrame | np.ndarray,
+    model_indices: np.ndarray,
+) -> np.ndarray:
+    """
+    Scores rows against compiled binary daily trend models in a single vectorized pass, with each row scored by its own model.
+
+    Every row descends all of the trees of its model simultaneously, one level per iteration, so that the number of iterations is bounded by the maximum tree depth rather than by the number of rows, models or trees. Missing feature values follow the default direction of each split.
+
+    Args:
+        compiled_models (dict[str, Any]): Compiled models, as returned by compile_binary_daily_trend_models.
+        X (pd.DataFrame | np.ndarray): The rows to be scored, with a column for every feature used by their models. Arrays must have the columns of the compiled feature names, in order.
+        model_indices (np.ndarray): The position of the model of each row in the list of boosters that was compiled.
+
+    Returns:
+        np.ndarray: The predicted probability of each target for every row, with one column per target of the model with the most targets. Columns beyond the number of targets of a row's model are undefined.
+    """
+    log.function_call()
+
+    features = (
+        np.asarray(X, dtype=np.float32)
+        if isinstance(X, np.ndarray)
+        else X.reindex(columns=compiled_models["feature_names"])
+        .astype(np.float32)
+        .to_numpy()
+    )
+    model_indices = np.asarray(model_indices, dtype=int)
+    n_trees = compiled_models["split_features"].shape[1]
+
+    rows = np.arange(len(features))[:, None]
+    models = model_indices[:, None]
+    trees = np.arange(n_trees)[None, :]
+    nodes = np.zeros((len(features), n_trees), dtype=np.int32)
+
+    for _ in range(compiled_models["max_depth"]):
+        left = compiled_models["left_children"][models, trees, nodes]
+        values = features[rows, compiled_models["split_features"][models, trees, nodes]]
+        go_left = np.where(
+            np.isnan(values),
+            compiled_models["default_left"][models, trees, nodes],
+            values < compiled_models["split_conditions"][models, trees, nodes],
+        )
+        nodes = np.where(
+            left == -1,
+            nodes,
+            np.where(
+                go_left, left, compiled_models["right_children"][models, trees, nodes]
+            ),
+        )
+
+    margins = (
+        compiled_models["leaf_values"][models, trees, nodes].sum(axis=1)
+        + compiled_models["base_margins"][model_indices]
+    )
+
+    return 1.0 / (1.0 + np.exp(-margins))
@@ -0,0 +1,485 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from uuid import uuid4
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import (
+    accuracy_score,
+    balanced_accuracy_score,
+    precision_score,
+    f1_score,
+    confusion_matrix,
+    classification_report,
+)
+from datetime import datetime
+
+from src.ml.models.run_walk_forward_validation import run_walk_forward_validation
+from src.ml.models.tune_binary_daily_trend_model import tune_binary_daily_trend_model
+from src.ml.utils import build_walk_forward_folds
+from src.utils import log
+
+
+def _fit_on_shared_matrix(
+    X: pd.DataFrame,
+    y: pd.DataFrame,
+    classifiers: list[tuple[str, xgb.XGBClassifier]],
+):
+    """
+    Fits the classifiers of several targets on one QuantileDMatrix, so that the features are quantised once rather than once per target.
+
+    Args:
+        X (pd.DataFrame): Features.
+        y (pd.DataFrame): Targets, aligned with the features.
+        classifiers (list[tuple[str, xgb.XGBClassifier]]): The unfitted classifiers, each with the target column it predicts. Each classifier is fitted in place.
+    """
+    data = xgb.QuantileDMatrix(X)
+    for target, classifier in classifiers:
+        data.set_label(y[target].to_numpy())
+        booster = xgb.train(
+            classifier.get_xgb_params(),
+            data,
+            num_boost_round=classifier.get_num_boosting_rounds(),
+        )
+        classifier.load_model(bytearray(booster.save_raw(raw_format="ubj")))
+
+
+def train_binary_daily_trend_models(
+    symbols: list[str],
+    prediction_inputs: pd.DataFrame,
+    features: list[str],
+    targets: list[str],
+    serving_set_size: int,
+    threshold_percentage: float,
+    multi_output: bool = False,
+    n_jobs: int | None = None,
+    tune: bool = False,
+    n_splits: int = 5,
+    embargo: int = 2,
+    window_size: int | None = None,
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]] | None:
+    """
+    Trains the standard, positive threshold and negative threshold models on a set of prediction inputs.
+
+    This function does not touch object storage or the database so that it can be run in a worker process.
+
+    Args:
+        symbols (list[str]): The symbols covered by the prediction inputs.
+        prediction_inputs (pd.DataFrame): Prediction inputs and targets, as returned by build_daily_trend_training_data.
+        features (list[str]): The feature columns.
+        targets (list[str]): The target columns.
+        serving_set_size (int): The number of rows to be included in a serving set.
+        threshold_percentage (float): Absolute threshold percentage for the threshold models.
+        multi_output (bool): Whether to train a single multi-output model per split, shared by all three targets. Defaults to False.
+        n_jobs (int | None): Number of threads used by each XGBoost model. Defaults to None, the XGBoost default.
+        tune (bool): Whether to choose the hyperparameters of each model by a successive halving search, as performed by tune_binary_daily_trend_model. The search only sees the training rows of the first walk-forward fold, which precede the test rows of every fold, so that the walk-forward metrics are not inflated by the choice. Defaults to False, in which case the library defaults are used.
+        n_splits (int): Number of walk-forward validation folds. Defaults to 5.
+        embargo (int): Number of dates left out before each test period and before the serving set. Defaults to 2.
+        window_size (int | None): Number of dates in each walk-forward training window. Defaults to None, in which case training windows expand.
+
+    Returns:
+        tuple[dict[str, Any], dict[str, Any], dict[str, Any]] | None: The standard, positive threshold and negative threshold model payloads, or None if there is insufficient data.
+    """
+    log.function_call()
+
+    if len(prediction_inputs) < 20:
+        log.warning(
+            f"Insufficient data available for model training for symbols: {symbols}"
+        )
+        return None
+
+    prediction_inputs = prediction_inputs.sort_index(kind="stable")
+
+    serving_set_start = prediction_inputs.index[
+        len(prediction_inputs)
+        - max(1, min(len(prediction_inputs) // 10, serving_set_size))
+    ]  # the serving set holds the most recent dates
+    serving_set = prediction_inputs[prediction_inputs.index >= serving_set_start]
+    development_dates = prediction_inputs.index[
+        prediction_inputs.index < serving_set_start
+    ].unique()
+    development_set = (
+        prediction_inputs[
+            prediction_inputs.index
+            < development_dates[max(0, len(development_dates) - embargo)]
+        ]
+        if len(development_dates) > embargo
+        else prediction_inputs.iloc[:0]
+    )
+
+    X = prediction_inputs[features]
+    y = prediction_inputs[targets]
+
+    X_train = development_set[features]
+    y_train = development_set[targets]
+
+    folds = build_walk_forward_folds(
+        X_train.index,
+        n_splits=n_splits,
+        embargo=embargo,
+        window_size=window_size,
+    )
+
+    if not folds:
+        log.warning(
+            f"Insufficient data available for walk-forward validation for symbols: {symbols}"
+        )
+        return None
+
+    X_tune = X_train.iloc[folds[0][0]]
+    y_tune = y_train.iloc[folds[0][0]]  # precedes the test rows of every fold
+
+    hyperparameters: dict[str, dict[str, Any]] = {target: {} for target in targets}
+    if tune and multi_output:
+        hyperparameters = dict.fromkeys(
+            targets,
+            tune_binary_daily_trend_model(
+                X_tune,
+                y_tune[targets],
+                multi_output=True,
+                embargo=embargo,
+                n_jobs=n_jobs,
+            ),
+        )
+    elif tune:
+        hyperparameters = {
+            target: tune_binary_daily_trend_model(
+                X_tune,
+                y_tune[target],
+                embargo=embargo,
+                n_jobs=n_jobs,
+            )
+            for target in targets
+        }
+
+    if multi_output:
+        model = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            tree_method="hist",
+            multi_strategy="multi_output_tree",
+            n_jobs=n_jobs,
+            **hyperparameters["target"],
+        )
+        model_positive_threshold = model_negative_threshold = model
+        classifiers = [(targets, model)]
+    else:
+        model = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["target"],
+        )
+        model_positive_threshold = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["positive_threshold_target"],
+        )
+        model_negative_threshold = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["negative_threshold_target"],
+        )
+        classifiers = [
+            (["target"], model),
+            (["positive_threshold_target"], model_positive_threshold),
+            (["negative_threshold_target"], model_negative_threshold),
+        ]
+
+    log.info(f"Running walk-forward validation over {len(folds)} folds.")
+
+    out_of_sample_predictions, fold_metrics = run_walk_forward_validation(
+        X_train,
+        y_train,
+        folds=folds,
+        classifiers=classifiers,
+        n_jobs=n_jobs,
+    )
+
+    X_test = X_train.iloc[out_of_sample_predictions.index]
+    y_test = y_train.iloc[out_of_sample_predictions.index]
+    y_pred, y_pred_positive_threshold, y_pred_negative_threshold = (
+        out_of_sample_predictions[target].to_numpy() for target in targets
+    )
+
+    log.info("Training model on development data.")
+
+    if multi_output:
+        model.fit(X_train, y_train[targets])
+    else:
+        _fit_on_shared_matrix(
+            X_train,
+            y_train,
+            [
+                ("target", model),
+                ("positive_threshold_target", model_positive_threshold),
+                ("negative_threshold_target", model_negative_threshold),
+            ],
+        )
+
+    accuracy = accuracy_score(y_test["target"], y_pred)
+    balanced_accuracy = balanced_accuracy_score(y_test["target"], y_pred)
+    precision = precision_score(y_test["target"], y_pred)
+    f1 = f1_score(y_test["target"], y_pred)
+    conf_matrix = confusion_matrix(y_test["target"], y_pred)
+    class_report = classification_report(y_test["target"], y_pred, output_dict=False)
+
+    accuracy_positive_threshold = accuracy_score(
+        y_test["positive_threshold_target"], y_pred_positive_threshold
+    )
+    balanced_accuracy_positive_threshold = balanced_accuracy_score(
+        y_test["positive_threshold_target"], y_pred_positive_threshold
+    )
+    precision_positive_threshold = precision_score(
+        y_test["positive_threshold_target"], y_pred_positive_threshold
+    )
+    f1_positive_threshold = f1_score(
+        y_test["positive_threshold_target"], y_pred_positive_threshold
+    )
+    conf_matrix_positive_threshold = confusion_matrix(
+        y_test["positive_threshold_target"], y_pred_positive_threshold
+    )
+    class_report_positive_threshold = classification_report(
+        y_test["positive_threshold_target"],
+        y_pred_positive_threshold,
+        output_dict=False,
+    )
+
+    accuracy_negative_threshold = accuracy_score(
+        y_test["negative_threshold_target"], y_pred_negative_threshold
+    )
+    balanced_accuracy_negative_threshold = balanced_accuracy_score(
+        y_test["negative_threshold_target"], y_pred_negative_threshold
+    )
+    precision_negative_threshold = precision_score(
+        y_test["negative_threshold_target"], y_pred_negative_threshold
+    )
+    f1_negative_threshold = f1_score(
+        y_test["negative_threshold_target"], y_pred_negative_threshold
+    )
+    conf_matrix_negative_threshold = confusion_matrix(
+        y_test["negative_threshold_target"], y_pred_negative_threshold
+    )
+    class_report_negative_threshold = classification_report(
+        y_test["negative_threshold_target"],
+        y_pred_negative_threshold,
+        output_dict=False,
+    )
+
+    X_serve, y_serve, y_serve_pred = None, None, None
+    if serving_set is not None:
+        X_serve = serving_set[features]
+        y_serve = serving_set["target"]
+        y_serve_positive_threshold = serving_set["positive_threshold_target"]
+        y_serve_negative_threshold = serving_set["negative_threshold_target"]
+        if multi_output:
+            (
+                y_serve_pred,
+                y_serve_pred_positive_threshold,
+                y_serve_pred_negative_threshold,
+            ) = (
+                model.predict(X_serve).astype(int).T
+            )
+        else:
+            y_serve_pred = model.predict(X_serve)
+            y_serve_pred_positive_threshold = model_positive_threshold.predict(X_serve)
+            y_serve_pred_negative_threshold = model_negative_threshold.predict(X_serve)
+
+    log.info("Training model on all data.")
+
+    if multi_output:
+        full_model = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            tree_method="hist",
+            multi_strategy="multi_output_tree",
+            n_jobs=n_jobs,
+            **hyperparameters["target"],
+        )
+        full_model.fit(X, y[targets])
+        full_model_positive_threshold = full_model_negative_threshold = full_model
+    else:
+        full_model = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["target"],
+        )
+        full_model_positive_threshold = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["positive_threshold_target"],
+        )
+        full_model_negative_threshold = xgb.XGBClassifier(
+            objective="binary:logistic",
+            eval_metric="logloss",
+            n_jobs=n_jobs,
+            **hyperparameters["negative_threshold_target"],
+        )
+        _fit_on_shared_matrix(
+            X,
+            y,
+            [
+                ("target", full_model),
+                ("positive_threshold_target", full_model_positive_threshold),
+                ("negative_threshold_target", full_model_negative_threshold),
+            ],
+        )
+
+    log.info("Recording performance information.")
+
+    model_id = str(uuid4())
+    model_positive_id = str(uuid4())
+    model_negative_id = str(uuid4())
+
+    model_payload = {
+        "model_id": model_id,
+        "hyperparameters": hyperparameters["target"],
+        "fold_metrics": [e for e in fold_metrics if e["target"] == "target"],
+        "threshold_percentage": 0.0,
+        "timestamp": datetime.now(),
+        "symbols": symbols,
+        "accuracy": float(accuracy),
+        "balanced_accuracy": float(balanced_accuracy),
+        "precision": float(precision),
+        "f1": float(f1),
+        "confusion_matrix": conf_matrix,
+        "features": features,
+        "classification_report": class_report,
+        "validated_model": model,
+        "model": full_model,
+        "model_positive_threshold": full_model_positive_threshold,
+        "model_negative_threshold": full_model_negative_threshold,
+        "training_set_rows": len(y_train),
+        "training_data": X_train,
+        "training_targets": y_train["target"],
+        "test_set_rows": len(y_test),
+        "test_data": X_test,
+        "test_targets": y_test["target"],
+        "serving_set_rows": len(serving_set),
+        "serving_data": X_serve,
+        "serving_targets": y_serve,
+        "y_serve": (y_serve.tolist() if y_serve is not None else None),
+        "y_serve_pred": (y_serve_pred.tolist() if y_serve_pred is not None else None),
+        "serving_set_indicated_entry_prices": (
+            serving_set["target_date_daily_open"].tolist()
+            if serving_set is not None
+            else None
+        ),
+        "serving_set_indicated_exit_prices": (
+            serving_set["target_date_daily_close"].tolist()
+            if serving_set is not None
+            else None
+        ),
+    }
+
+    model_payload_positive_threshold = {
+        "model_id": model_positive_id,
+        "hyperparameters": hyperparameters["positive_threshold_target"],
+        "fold_metrics": [
+            e for e in fold_metrics if e["target"] == "positive_threshold_target"
+        ],
+        "threshold_percentage": threshold_percentage,
+        "timestamp": datetime.now(),
+        "symbols": symbols,
+        "accuracy": float(accuracy_positive_threshold),
+        "balanced_accuracy": float(balanced_accuracy_positive_threshold),
+        "precision": float(precision_positive_threshold),
+        "f1": float(f1_positive_threshold),
+        "confusion_matrix": conf_matrix_positive_threshold,
+        "features": features,
+        "classification_report": class_report_positive_threshold,
+        "validated_model": model_positive_threshold,
+        "model": full_model_positive_threshold,
+        "training_set_rows": len(y_train),
+        "training_data": X_train,
+        "training_targets": y_train["positive_threshold_target"],
+        "test_set_rows": len(y_test),
+        "test_data": X_test,
+        "test_targets": y_test["positive_threshold_target"],
+        "serving_set_rows": len(serving_set),
+        "serving_data": X_serve,
+        "serving_targets": y_serve_positive_threshold,
+        "y_serve": (
+            y_serve_positive_threshold.tolist()
+            if y_serve_positive_threshold is not None
+            else None
+        ),
+        "y_serve_pred": (
+            y_serve_pred_positive_threshold.tolist()
+            if y_serve_pred_positive_threshold is not None
+            else None
+        ),
+        "serving_set_indicated_entry_prices": (
+            serving_set["target_date_daily_open"].tolist()
+            if serving_set is not None
+            else None
+        ),
+        "serving_set_indicated_exit_prices": (
+            serving_set["target_date_daily_close"].tolist()
+            if serving_set is not None
+            else None
+        ),
+    }
+
+    model_payload_negative_threshold = {
+        "model_id": model_negative_id,
+        "hyperparameters": hyperparameters["negative_threshold_target"],
+        "fold_metrics": [
+            e for e in fold_metrics if e["target"] == "negative_threshold_target"
+        ],
+        "threshold_percentage": -threshold_percentage,
+        "timestamp": datetime.now(),
+        "symbols": symbols,
+        "accuracy": float(accuracy_negative_threshold),
+        "balanced_accuracy": float(balanced_accuracy_negative_threshold),
+        "precision": float(precision_negative_threshold),
+        "f1": float(f1_negative_threshold),
+        "confusion_matrix": conf_matrix_negative_threshold,
+        "features": features,
+        "classification_report": class_report_negative_threshold,
+        "validated_model": model_negative_threshold,
+        "model": full_model_negative_threshold,
+        "training_set_rows": len(y_train),
+        "training_data": X_train,
+        "training_targets": y_train["negative_threshold_target"],
+        "test_set_rows": len(y_test),
+        "test_data": X_test,
+        "test_targets": y_test["negative_threshold_target"],
+        "serving_set_rows": len(serving_set),
+        "serving_data": X_serve,
+        "serving_targets": y_serve_negative_threshold,
+        "y_serve": (
+            y_serve_negative_threshold.tolist()
+            if y_serve_negative_threshold is not None
+            else None
+        ),
+        "y_serve_pred": (
+            y_serve_pred_negative_threshold.tolist()
+            if y_serve_pred_negative_threshold is not None
+            else None
+        ),
+        "serving_set_indicated_entry_prices": (
+            serving_set["target_date_daily_open"].tolist()
+            if serving_set is not None
+            else None
+        ),
+        "serving_set_indicated_exit_prices": (
+            serving_set["target_date_daily_close"].tolist()
+            if serving_set is not None
+            else None
+        ),
+    }
+
+    return (
+        model_payload,
+        model_payload_positive_threshold,
+        model_payload_negative_threshold,
+    )
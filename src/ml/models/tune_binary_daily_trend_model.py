@@ -0,0 +1,127 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.ml.utils import build_walk_forward_folds
+from src.utils import log
+
+
+def tune_binary_daily_trend_model(
+    X: pd.DataFrame,
+    y: pd.Series | pd.DataFrame,
+    multi_output: bool = False,
+    max_depths: list[int] | None = None,
+    learning_rates: list[float] | None = None,
+    min_boosting_rounds: int = 25,
+    max_boosting_rounds: int = 400,
+    halving_factor: int = 3,
+    n_splits: int = 3,
+    embargo: int = 0,
+    early_stopping_rounds: int = 10,
+    n_jobs: int | None = None,
+) -> dict[str, Any]:
+    """
+    Chooses the tree depth, learning rate and number of estimators of a daily trend model by successive halving.
+
+    Every candidate combination of tree depth and learning rate is evaluated on walk-forward validation folds with a small budget of boosting rounds. The folds are built on distinct timestamps, so that the rows of many symbols on one date, as in the training data of a pooled model, never fall on both sides of a split. Only the best candidates by mean validation log loss are kept for the next rung, whose budget is larger by the halving factor, until a single candidate remains. Early stopping on each validation fold means that the number of estimators is chosen as part of the search, and that few rounds are spent on short histories.
+
+    Args:
+        X (pd.DataFrame): Training features indexed by timestamp.
+        y (pd.Series | pd.DataFrame): Training targets. A DataFrame with one column per target for multi-output models.
+        multi_output (bool): Whether the model is a multi-output model. Defaults to False.
+        max_depths (list[int] | None): Candidate tree depths. Defaults to None, in which case [2, 3, 4, 6] is used.
+        learning_rates (list[float] | None): Candidate learning rates. Defaults to None, in which case [0.03, 0.1, 0.3] is used.
+        min_boosting_rounds (int): Budget of boosting rounds of the first rung. Defaults to 25.
+        max_boosting_rounds (int): Maximum budget of boosting rounds. Defaults to 400.
+        halving_factor (int): Factor by which the candidates are reduced and the budget is increased at each rung. Defaults to 3.
+        n_splits (int): Number of time-ordered validation folds. Defaults to 3.
+        embargo (int): Number of distinct timestamps left out between the training and validation timestamps of each fold. Defaults to 0.
+        early_stopping_rounds (int): Number of rounds without improvement in validation log loss after which boosting stops. Defaults to 10.
+        n_jobs (int | None): Number of threads used by each XGBoost model. Defaults to None, the XGBoost default.
+
+    Returns:
+        dict[str, Any]: The 'max_depth', 'learning_rate' and 'n_estimators' parameters of the best candidate. Empty if there are no validation folds in which both classes of every target are present, in which case the library defaults should be used.
+    """
+    log.function_call()
+
+    order = np.argsort(X.index.to_numpy(), kind="stable")
+    X, y = X.iloc[order], y.iloc[order]
+
+    def has_both_classes(targets: pd.Series | pd.DataFrame) -> bool:
+        return bool((pd.DataFrame(targets).nunique() == 2).all())
+
+    folds = [
+        (train_index, validation_index)
+        for train_index, validation_index in build_walk_forward_folds(
+            X.index, n_splits=n_splits, embargo=embargo
+        )
+        if has_both_classes(y.iloc[train_index])
+        and has_both_classes(y.iloc[validation_index])
+    ]
+
+    if not folds:
+        log.warning("Insufficient data for hyperparameter search. Using defaults.")
+        return {}
+
+    candidates = [
+        {"max_depth": max_depth, "learning_rate": learning_rate}
+        for max_depth in max_depths or [2, 3, 4, 6]
+        for learning_rate in learning_rates or [0.03, 0.1, 0.3]
+    ]
+
+    boosting_rounds = min_boosting_rounds
+    while True:
+        results: list[tuple[float, int, dict[str, Any]]] = []
+        for candidate in candidates:
+            losses, estimators = [], []
+            for train_index, validation_index in folds:
+                model = xgb.XGBClassifier(
+                    objective="binary:logistic",
+                    eval_metric="logloss",
+                    n_estimators=boosting_rounds,
+                    early_stopping_rounds=early_stopping_rounds,
+                    n_jobs=n_jobs,
+                    **(
+                        {"tree_method": "hist", "multi_strategy": "multi_output_tree"}
+                        if multi_output
+                        else {}
+                    ),
+                    **candidate,
+                )
+                model.fit(
+                    X.iloc[train_index],
+                    y.iloc[train_index],
+                    eval_set=[(X.iloc[validation_index], y.iloc[validation_index])],
+                    verbose=False,
+                )
+                losses.append(model.best_score)
+                estimators.append(model.best_iteration + 1)
+            results.append(
+                (float(np.mean(losses)), int(np.ceil(np.mean(estimators))), candidate)
+            )
+
+        results.sort(key=lambda e: e[0])
+
+        log.info(
+            f"Evaluated {len(candidates)} candidates with {boosting_rounds} boosting rounds. Best validation log loss: {results[0][0]}"
+        )
+
+        if len(candidates) == 1 or boosting_rounds >= max_boosting_rounds:
+            break
+
+        candidates = [
+            candidate
+            for _, _, candidate in results[: max(1, len(candidates) // halving_factor)]
+        ]
+        boosting_rounds = min(boosting_rounds * halving_factor, max_boosting_rounds)
+
+    _, n_estimators, best_candidate = results[0]
+
+    return best_candidate | {"n_estimators": n_estimators}
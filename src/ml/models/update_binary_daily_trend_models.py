@@ -0,0 +1,128 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from uuid import uuid4
+from json import loads
+from datetime import datetime
+import pandas as pd
+import xgboost as xgb
+
+from src.utils import log
+
+
+def update_binary_daily_trend_models(
+    previous_models: tuple[tuple[dict[str, Any], Any], ...],
+    prediction_inputs: pd.DataFrame,
+    targets: list[str],
+    trained_until: datetime,
+    boosting_rounds: int = 10,
+    n_jobs: int | None = None,
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]] | None:
+    """
+    Continues training the standard, positive threshold and negative threshold models of a symbol on the prediction inputs that have arrived since they were last trained.
+
+    Each distinct model is boosted for a small number of additional rounds starting from its existing trees, so that the cost of an update scales with the amount of new data rather than with the length of the history. A multi-output model shared by all three targets is updated once. The validation metrics, data and serving set of the previous models are carried over, as they are only recomputed by a full retrain.
+
+    This function does not touch object storage or the database so that it can be run in a worker process.
+
+    Args:
+        previous_models (tuple[tuple[dict[str, Any], Any], ...]): The Models row and the model itself of the standard, positive threshold and negative threshold models, as returned by load_binary_daily_trend_models.
+        prediction_inputs (pd.DataFrame): Prediction inputs and targets, as returned by build_daily_trend_training_data.
+        targets (list[str]): The target columns, in the same order as the previous models.
+        trained_until (datetime): Index of the latest prediction input used to train the previous models. Prediction inputs after it are new. This is earlier than the latest daily data, as the latest dates do not yet have targets.
+        boosting_rounds (int): Number of boosting rounds added to each model. Defaults to 10.
+        n_jobs (int | None): Number of threads used by each XGBoost model. Defaults to None, the XGBoost default.
+
+    Returns:
+        tuple[dict[str, Any], dict[str, Any], dict[str, Any]] | None: The standard, positive threshold and negative threshold model payloads, or None if there are no new prediction inputs.
+    """
+    log.function_call()
+
+    new_inputs = prediction_inputs[prediction_inputs.index > trained_until]
+
+    if new_inputs.empty:
+        return None
+
+    features = loads(previous_models[0][0]["features"])
+
+    updated_models: dict[int, Any] = {}
+    for (_, model), target in zip(previous_models, targets):
+        if id(model) in updated_models:
+            continue
+
+        label = (
+            new_inputs[targets]
+            if model.get_params().get("multi_strategy") == "multi_output_tree"
+            else new_inputs[target]
+        )
+        booster = xgb.train(
+            model.get_xgb_params() | {"n_jobs": n_jobs},
+            xgb.DMatrix(new_inputs[features], label=label),
+            num_boost_round=boosting_rounds,
+            xgb_model=model.get_booster(),
+        )
+
+        updated_model = xgb.XGBClassifier(**model.get_params())
+        updated_model.load_model(booster.save_raw())
+        updated_models[id(model)] = updated_model
+
+    log.info(
+        f"Updated {len(updated_models)} models with {len(new_inputs)} new rows for symbols: {loads(previous_models[0][0]['symbols'])}"
+    )
+
+    now = datetime.now()
+
+    return tuple(
+        {
+            "model_id": str(uuid4()),
+            "threshold_percentage": row["threshold_percentage"],
+            "timestamp": now,
+            "created_at": row["created_at"],
+            "symbols": loads(row["symbols"]),
+            "accuracy": row["accuracy"],
+            "balanced_accuracy": row["balanced_accuracy"],
+            "precision": row["precision"],
+            "f1": row["f1"],
+            "confusion_matrix": row["confusion_matrix"],
+            "features": features,
+            "classification_report": row["classification_report"],
+            "hyperparameters": (
+                loads(row["hyperparameters"])
+                if row.get("hyperparameters") is not None
+                else None
+            ),
+            "fold_metrics": (
+                loads(row["fold_metrics"])
+                if row.get("fold_metrics") is not None
+                else None
+            ),
+            "model": updated_models[id(model)],
+            "previous_model_id": str(row["model_id"]),
+            "update_data": new_inputs[features],
+            "update_targets": new_inputs[target],
+            "training_set_rows": row["training_set_rows"],
+            "test_set_rows": row["test_set_rows"],
+            "serving_set_rows": row["serving_set_rows"],
+            "urls": {
+                "training_data": row["training_data_url"],
+                "training_targets": row["training_targets_url"],
+                "test_data": row["test_data_url"],
+                "test_targets": row["test_targets_url"],
+                "serving_data": row["serving_data_url"],
+                "serving_targets": row["serving_targets_url"],
+            },
+            "y_serve": loads(row["y_serve"]),
+            "y_serve_pred": loads(row["y_serve_pred"]),
+            "serving_set_indicated_entry_prices": loads(
+                row["serving_set_indicated_entry_prices"]
+            ),
+            "serving_set_indicated_exit_prices": loads(
+                row["serving_set_indicated_exit_prices"]
+            ),
+        }
+        for (row, model), target in zip(previous_models, targets)
+    )
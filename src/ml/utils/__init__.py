@@ -4,4 +4,13 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .build_daily_prediction_inputs import build_daily_prediction_inputs
+from .build_daily_trend_features import build_daily_trend_features
+from .build_daily_trend_training_data import build_daily_trend_training_data
+from .build_latest_daily_features import build_latest_daily_features
+from .build_market_open_feature_matrix import build_market_open_feature_matrix
+from .build_pooled_features import build_pooled_features
+from .build_walk_forward_folds import build_walk_forward_folds
 from .one_hot_encode import one_hot_encode
+from .prepare_daily_data import prepare_daily_data
+from .set_market_open_prices import set_market_open_prices
@@ -0,0 +1,60 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils import log
+
+
+def build_daily_prediction_inputs(
+    daily_symbol_data: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Builds the prediction inputs for a single symbol by joining each trading day's data with the open and close prices of the following target date.
+
+    The previous trading date of a target date is taken to be the previous calendar day, or the previous Friday if the target date is a Monday. Target dates on a weekend are ignored, as are target dates for which either the previous trading date or the target date itself has incomplete data. The lookup is performed as a single positional join rather than by scanning the data for every row.
+
+    Args:
+        daily_symbol_data (pd.DataFrame): Daily data for a single symbol, indexed and sorted by timestamp, with one row per date and columns including 'daily_open' and 'daily_close'.
+
+    Returns:
+        pd.DataFrame: The rows of the previous trading dates, indexed by their own timestamps, with the 'target_date_daily_open' and 'target_date_daily_close' columns appended. Empty if no target date could be matched.
+    """
+    log.function_call()
+
+    complete_data = daily_symbol_data.dropna()
+    dates = complete_data.index.normalize()
+
+    is_weekday = dates.dayofweek < 5
+    target_data = complete_data[is_weekday]
+    target_dates = dates[is_weekday]
+
+    lookup_dates = target_dates - pd.to_timedelta(
+        np.where(target_dates.dayofweek == 0, 3, 1),  # Monday uses previous Friday
+        unit="D",
+    )
+
+    positions_by_date = pd.Series(
+        np.arange(len(complete_data)),
+        index=dates,
+    )
+    positions_by_date = positions_by_date[~positions_by_date.index.duplicated()]
+    positions = positions_by_date.reindex(lookup_dates).to_numpy()
+    matched = ~np.isnan(positions)
+
+    target_date_daily_open = target_data["daily_open"].to_numpy()[matched]
+    target_date_daily_close = target_data["daily_close"].to_numpy()[matched]
+
+    prediction_inputs = complete_data.iloc[positions[matched].astype(int)].copy()
+    prediction_inputs["target_date_daily_open"] = (
+        target_date_daily_open  # the model will be ran after market open so this will be known
+    )
+    prediction_inputs["target_date_daily_close"] = (
+        target_date_daily_close  # this will not be known at the time the model is ran and should not be used in the training set
+    )
+
+    return prediction_inputs
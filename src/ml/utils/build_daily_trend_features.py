@@ -0,0 +1,61 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+
+from src.univariate.analysis import calc_macd
+from src.utils import log
+
+
+def build_daily_trend_features(
+    daily_symbol_data: pd.DataFrame,
+    threshold_percentage: float,
+) -> pd.DataFrame:
+    """
+    Adds the standard, positive threshold and negative threshold targets and the MACD features to the daily data of a single symbol.
+
+    The targets of a date describe the price change on the following date, so they are missing for the latest date. The MACD features only depend on the current and previous dates, so the features of existing dates do not change as new dates are added.
+
+    Args:
+        daily_symbol_data (pd.DataFrame): Daily data for a single symbol, as returned by prepare_daily_data.
+        threshold_percentage (float): Absolute threshold percentage for the threshold targets.
+
+    Returns:
+        pd.DataFrame: The daily data with the targets and MACD features added.
+    """
+    log.function_call()
+
+    daily_symbol_data = daily_symbol_data.copy()
+
+    daily_symbol_data["price_change"] = (
+        daily_symbol_data["daily_close"] > daily_symbol_data["daily_open"]
+    ).astype(int)
+
+    daily_symbol_data["positive_threshold_price_change"] = (
+        daily_symbol_data["daily_close"]
+        > daily_symbol_data["daily_open"] * (1 + (threshold_percentage / 100))
+    ).astype(int)
+
+    daily_symbol_data["negative_threshold_price_change"] = (
+        daily_symbol_data["daily_close"]
+        < daily_symbol_data["daily_open"] * (1 + (-threshold_percentage / 100))
+    ).astype(int)
+
+    daily_symbol_data["target"] = daily_symbol_data["price_change"].shift(-1)
+    daily_symbol_data["positive_threshold_target"] = daily_symbol_data[
+        "positive_threshold_price_change"
+    ].shift(-1)
+    daily_symbol_data["negative_threshold_target"] = daily_symbol_data[
+        "negative_threshold_price_change"
+    ].shift(-1)
+
+    _, _, daily_macd_histogram, daily_macd_first_derivative = calc_macd(
+        data=daily_symbol_data["daily_close"].to_list(),
+    )
+    daily_symbol_data["daily_macd_histogram"] = daily_macd_histogram
+    daily_symbol_data["daily_macd_first_derivative"] = daily_macd_first_derivative
+
+    return daily_symbol_data
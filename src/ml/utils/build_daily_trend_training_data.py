@@ -0,0 +1,40 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+
+from src.ml.utils.build_daily_prediction_inputs import build_daily_prediction_inputs
+from src.utils import log
+
+
+def build_daily_trend_training_data(
+    daily_trend_features: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Builds the training data for the daily trend models of a single symbol.
+
+    Dates without targets are dropped, and the data is joined with the open and close prices of each following target date.
+
+    Args:
+        daily_trend_features (pd.DataFrame): Daily data for a single symbol with targets and MACD features, as returned by build_daily_trend_features or read from the daily feature store.
+
+    Returns:
+        pd.DataFrame: The prediction inputs and targets for the symbol. Empty if no target date could be matched.
+    """
+    log.function_call()
+
+    daily_trend_features = daily_trend_features.dropna(
+        subset=["target", "positive_threshold_target", "negative_threshold_target"],
+    )
+    daily_trend_features = daily_trend_features.astype(
+        {
+            "target": int,
+            "positive_threshold_target": int,
+            "negative_threshold_target": int,
+        }
+    )
+
+    return build_daily_prediction_inputs(daily_trend_features)
@@ -0,0 +1,105 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils import log
+
+
+def _ewm(values: np.ndarray, lengths: np.ndarray, span: int) -> np.ndarray:
+    """
+    Calculates the exponentially weighted mean, without adjustment, along each row of a matrix whose rows hold series of different lengths.
+
+    Args:
+        values (np.ndarray): One series per row, left aligned, with the columns beyond the length of the series ignored.
+        lengths (np.ndarray): The length of the series in each row.
+        span (int): The span of the exponentially weighted mean.
+
+    Returns:
+        np.ndarray: The exponentially weighted mean of each series, in the same layout.
+    """
+    alpha = 2 / (span + 1)
+    means = np.empty_like(values)
+    means[:, 0] = values[:, 0]
+    for i in range(1, values.shape[1]):
+        means[:, i] = np.where(
+            i < lengths,
+            (1 - alpha) * means[:, i - 1] + alpha * values[:, i],
+            means[:, i - 1],
+        )
+    return means
+
+
+def build_latest_daily_features(
+    historical_data: pd.DataFrame,
+    short_window: int = 12,
+    long_window: int = 26,
+    signal_window: int = 9,
+) -> pd.DataFrame:
+    """
+    Builds the daily features of the latest date of every symbol from their recent daily data.
+
+    The MACD histogram and its first derivative are calculated as calc_macd would for each symbol, but for all symbols at once, by stepping the exponentially weighted means through the dates of every symbol together rather than symbol by symbol.
+
+    Args:
+        historical_data (pd.DataFrame): Rows of the polygon_market_data_day table, with columns including 'symbol', 'timestamp', 'open', 'close', 'volume' and 'vwap', in any order.
+        short_window (int): The short EMA window (default is 12).
+        long_window (int): The long EMA window (default is 26).
+        signal_window (int): The signal line window (default is 9).
+
+    Returns:
+        pd.DataFrame: The 'daily_open', 'daily_close', 'daily_volume', 'daily_vwap', 'daily_macd_histogram' and 'daily_macd_first_derivative' of the latest date of each symbol, indexed by symbol.
+    """
+    log.function_call()
+
+    columns = [
+        "daily_open",
+        "daily_close",
+        "daily_volume",
+        "daily_vwap",
+        "daily_macd_histogram",
+        "daily_macd_first_derivative",
+    ]
+    if historical_data.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name="symbol"))
+
+    rows, symbols = pd.factorize(historical_data["symbol"], sort=True)
+    order = np.lexsort(
+        (historical_data["timestamp"].to_numpy(), rows)
+    )  # by symbol, then by timestamp
+    rows = rows[order]
+    lengths = np.bincount(rows)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    positions = np.arange(len(rows)) - starts[rows]
+
+    close = np.zeros((len(symbols), lengths.max()))
+    close[rows, positions] = historical_data["close"].to_numpy(dtype=float)[order]
+
+    macd = _ewm(close, lengths, short_window) - _ewm(close, lengths, long_window)
+    macd_histogram = macd - _ewm(macd, lengths, signal_window)
+
+    last = np.arange(len(symbols)), lengths - 1
+    previous_macd_histogram = np.where(
+        lengths > 1,
+        macd_histogram[last[0], np.maximum(lengths - 2, 0)],
+        np.nan,
+    )  # the derivative of a single date is undefined
+
+    latest = order[starts + lengths - 1]
+
+    return pd.DataFrame(
+        {
+            "daily_open": historical_data["open"].to_numpy()[latest],
+            "daily_close": historical_data["close"].to_numpy()[latest],
+            "daily_volume": historical_data["volume"].to_numpy()[latest],
+            "daily_vwap": historical_data["vwap"].to_numpy()[latest],
+            "daily_macd_histogram": macd_histogram[last],
+            "daily_macd_first_derivative": macd_histogram[last]
+            - previous_macd_histogram,
+        },
+        index=pd.Index(np.asarray(symbols), name="symbol"),
+    )
@@ -0,0 +1,46 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import date
+import numpy as np
+import pandas as pd
+
+from src.ml.utils.build_pooled_features import build_pooled_features
+from src.utils import log
+
+
+def build_market_open_feature_matrix(
+    daily_features: pd.DataFrame,
+    feature_names: list[str],
+    target_date: date,
+) -> np.ndarray:
+    """
+    Builds the feature matrix used to score many symbols at market open, ahead of the open.
+
+    Every feature that is known before the open is filled in, including the weekday of the target date and the pooled features. The 'target_date_daily_open' and 'overnight_gap' columns are left missing, to be filled in place by set_market_open_prices once the market has opened.
+
+    Args:
+        daily_features (pd.DataFrame): The latest daily features of each symbol, indexed by symbol, with columns including 'daily_open', 'daily_close', 'daily_volume', 'daily_vwap' and 'daily_macd_histogram'.
+        feature_names (list[str]): The columns of the feature matrix, such as the feature names of compiled models.
+        target_date (date): The date on which the market opens.
+
+    Returns:
+        np.ndarray: A float32 feature matrix with one row per symbol, in the order of daily_features, and one column per feature name. Features that cannot be computed are missing.
+    """
+    log.function_call()
+
+    prediction_inputs = daily_features.copy()
+    for weekday, weekday_name in enumerate(
+        ["monday", "tuesday", "wednesday", "thursday", "friday"]
+    ):
+        prediction_inputs[f"weekday_{weekday_name}"] = target_date.weekday() == weekday
+    prediction_inputs["target_date_daily_open"] = np.nan  # known at market open
+
+    prediction_inputs = build_pooled_features(prediction_inputs)
+
+    return np.ascontiguousarray(
+        prediction_inputs.reindex(columns=feature_names).to_numpy(dtype=np.float32)
+    )
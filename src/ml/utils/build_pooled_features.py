@@ -0,0 +1,58 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils import log
+
+
+def build_pooled_features(
+    prediction_inputs: pd.DataFrame,
+    liquidity_buckets: int = 10,
+) -> pd.DataFrame:
+    """
+    Adds scale-free features to prediction inputs so that a single model can be trained and scored across many symbols.
+
+    Prices are expressed relative to the previous close so that they are comparable between symbols, and each row is assigned a liquidity bucket according to the rank of its dollar volume within its cross-section. If the prediction inputs are indexed by timestamp, each date forms a cross-section; otherwise all rows are treated as a single cross-section, as is the case when scoring at market open.
+
+    Args:
+        prediction_inputs (pd.DataFrame): Prediction inputs with columns including 'daily_open', 'daily_close', 'daily_volume', 'daily_vwap', 'daily_macd_histogram' and 'target_date_daily_open'.
+        liquidity_buckets (int): Number of liquidity buckets. Defaults to 10.
+
+    Returns:
+        pd.DataFrame: The prediction inputs with the 'daily_return', 'overnight_gap', 'normalised_daily_macd_histogram' and 'liquidity_bucket' columns added.
+    """
+    log.function_call()
+
+    prediction_inputs = prediction_inputs.copy()
+
+    prediction_inputs["daily_return"] = (
+        prediction_inputs["daily_close"] / prediction_inputs["daily_open"] - 1
+    )
+    prediction_inputs["overnight_gap"] = (
+        prediction_inputs["target_date_daily_open"] / prediction_inputs["daily_close"]
+        - 1
+    )
+    prediction_inputs["normalised_daily_macd_histogram"] = (
+        prediction_inputs["daily_macd_histogram"] / prediction_inputs["daily_close"]
+    )
+
+    dollar_volume = (
+        prediction_inputs["daily_volume"].astype(float)
+        * prediction_inputs["daily_vwap"]
+    )
+    cross_sections = (
+        prediction_inputs.index.normalize()
+        if isinstance(prediction_inputs.index, pd.DatetimeIndex)
+        else np.zeros(len(prediction_inputs))
+    )
+    liquidity_rank = dollar_volume.groupby(cross_sections).rank(pct=True)
+    prediction_inputs["liquidity_bucket"] = (
+        np.ceil(liquidity_rank * liquidity_buckets).clip(lower=1) - 1
+    )
+
+    return prediction_inputs
@@ -0,0 +1,54 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils import log
+
+
+def build_walk_forward_folds(
+    timestamps: pd.Index,
+    n_splits: int = 5,
+    embargo: int = 2,
+    window_size: int | None = None,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Builds walk-forward validation folds over time-ordered data.
+
+    The distinct timestamps are divided into n_splits + 1 consecutive blocks. Each fold tests on one block, from the second onwards, and trains on the timestamps preceding it, leaving out the embargo timestamps immediately before the test block so that targets which look ahead do not leak into training. Training windows expand from the first timestamp unless a window size is given, in which case they roll. Folds are defined on timestamps rather than rows, so that the rows of many symbols on the same date always fall on the same side of a split.
+
+    Args:
+        timestamps (pd.Index): Timestamps of the rows, sorted in ascending order.
+        n_splits (int): Number of folds. Defaults to 5.
+        embargo (int): Number of distinct timestamps left out between the training and test timestamps of each fold. Defaults to 2.
+        window_size (int | None): Number of distinct timestamps in each training window. Defaults to None, in which case training windows expand.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: The training and test row positions of each fold. Folds without training or test rows are omitted.
+    """
+    log.function_call()
+
+    unique_timestamps = timestamps.unique()
+    block_starts = np.linspace(0, len(unique_timestamps), n_splits + 2).astype(int)
+
+    row_starts = timestamps.searchsorted(unique_timestamps, side="left")
+    row_starts = np.append(row_starts, len(timestamps))
+
+    folds: list[tuple[np.ndarray, np.ndarray]] = []
+    for test_start, test_end in zip(block_starts[1:-1], block_starts[2:]):
+        train_end = test_start - embargo
+        train_start = 0 if window_size is None else max(0, train_end - window_size)
+        if train_end <= train_start or test_end <= test_start:
+            continue
+        folds.append(
+            (
+                np.arange(row_starts[train_start], row_starts[train_end]),
+                np.arange(row_starts[test_start], row_starts[test_end]),
+            )
+        )
+
+    return folds
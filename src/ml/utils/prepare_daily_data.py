@@ -0,0 +1,58 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+
+from src.ml.utils.one_hot_encode import one_hot_encode
+from src.utils import log
+
+
+def prepare_daily_data(
+    daily_data: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Prepares raw daily market data for daily trend model training.
+
+    The data is indexed and sorted by timestamp, weekday indicators are added and the price and volume columns are renamed with a 'daily_' prefix.
+
+    Args:
+        daily_data (pd.DataFrame): A DataFrame containing stock price data with columns including 'timestamp', 'symbol', 'close', 'open', 'high', 'low', and 'volume'.
+
+    Returns:
+        pd.DataFrame: The prepared daily data.
+    """
+    log.function_call()
+
+    daily_data = daily_data.set_index("timestamp")
+    daily_data = daily_data.sort_index()
+
+    daily_data["date"] = daily_data.index.date
+    daily_data["timestamp"] = daily_data.index.date
+    daily_data["daily_hour"] = daily_data.index.hour
+    daily_data["weekday"] = daily_data.index.dayofweek
+    daily_data = one_hot_encode(
+        daily_data,
+        column="weekday",
+        value_mapping={
+            0: "monday",
+            1: "tuesday",
+            2: "wednesday",
+            3: "thursday",
+            4: "friday",
+        },
+    )
+    daily_data = daily_data.drop(labels=["data_id", "otc", "high", "low"], axis=1)
+    daily_data = daily_data.rename(
+        columns={
+            "open": "daily_open",
+            "close": "daily_close",
+            "volume": "daily_volume",
+            "transactions": "daily_transactions",
+            "vwap": "daily_vwap",
+        }
+    )
+
+    return daily_data
@@ -0,0 +1,36 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+
+from src.utils import log
+
+
+def set_market_open_prices(
+    feature_matrix: np.ndarray,
+    feature_names: list[str],
+    daily_close: np.ndarray,
+    target_date_daily_open: np.ndarray,
+) -> None:
+    """
+    Fills in the features of a market open feature matrix that depend on the opening price, in place.
+
+    Args:
+        feature_matrix (np.ndarray): A feature matrix, as returned by build_market_open_feature_matrix.
+        feature_names (list[str]): The columns of the feature matrix.
+        daily_close (np.ndarray): The previous close of each row.
+        target_date_daily_open (np.ndarray): The opening price of each row. Missing for rows without an opening price.
+    """
+    log.function_call()
+
+    if "target_date_daily_open" in feature_names:
+        feature_matrix[:, feature_names.index("target_date_daily_open")] = (
+            target_date_daily_open
+        )
+    if "overnight_gap" in feature_names:
+        feature_matrix[:, feature_names.index("overnight_gap")] = (
+            target_date_daily_open / daily_close - 1
+        )
@@ -6,7 +6,9 @@ Copyright 2024
 
 from .client import (
     Base,
+    AsyncDatabaseClient,
     DatabaseClient,
+    create_async_sql_client,
     create_sql_client,
 )
 from .dto import (
@@ -34,9 +36,15 @@ from .dto import (
 )
 from .func import (
     get_data,
+    get_data_async,
+    get_dataframe,
+    stream_data,
+    copy_data,
     delete_data,
     insert_data,
+    insert_data_async,
     update_data,
+    TransactionJournal,
     unpack_related_companies,
     unpack_simple_table,
     unpack_stock_financials,
@@ -7,3 +7,5 @@ Copyright 2024
 from .create_sql_client import Base
 from .create_sql_client import DatabaseClient
 from .create_sql_client import create_sql_client
+from .create_async_sql_client import AsyncDatabaseClient
+from .create_async_sql_client import create_async_sql_client
@@ -0,0 +1,103 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import getenv
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from dotenv import load_dotenv
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.utils import log
+
+
+class AsyncDatabaseClient:
+    """
+    An asynchronous counterpart of DatabaseClient, so that database writes can be awaited alongside network requests rather than blocking the event loop.
+
+    The engine and its connections belong to the event loop on which they are first used, so a client should be created and disposed within one call of asyncio.run.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        SessionLocal: async_sessionmaker[AsyncSession],
+    ):
+        self.engine = engine
+        self.SessionLocal = SessionLocal
+
+    @asynccontextmanager
+    async def get_db(self) -> AsyncIterator[AsyncSession]:
+        async with self.SessionLocal() as db:
+            yield db
+
+    async def dispose(self):
+        """
+        Closes the connections of the pool.
+        """
+        await self.engine.dispose()
+
+
+def create_async_sql_client(
+    log_queries: bool = False,
+    database_url: str | None = None,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+) -> AsyncDatabaseClient:
+    """
+    Creates an AsyncDatabaseClient instance, connected with asyncpg.
+
+    Args:
+        log_queries: bool - Whether to log SQL queries as they are executed.
+        database_url: str | None - The database URL, with an async driver. Defaults to the PostgreSQL database given by the POSTGRES_* environment variables, through asyncpg.
+        pool_size: int - The number of connections kept open in the pool. Defaults to 10.
+        max_overflow: int - The number of connections opened beyond pool_size when the pool is exhausted. Defaults to 20.
+        pool_timeout: float - Seconds to wait for a connection before raising an error. Defaults to 30.
+        pool_recycle: int - Seconds after which a connection is replaced. Defaults to 1800.
+        pool_pre_ping: bool - Whether to test connections as they are checked out. Defaults to True.
+
+    Returns:
+        AsyncDatabaseClient - The configured AsyncDatabaseClient instance.
+    """
+    log.function_call()
+
+    if database_url is None:
+        load_dotenv()
+
+        host = getenv("POSTGRES_HOST")
+        port = getenv("POSTGRES_PORT")
+        database = getenv("POSTGRES_DATABASE")
+        username = getenv("POSTGRES_USERNAME")
+        password = getenv("POSTGRES_PASSWORD")
+
+        database_url = (
+            f"postgresql+asyncpg://{username}:{password}@{host}:{port}/{database}"
+        )
+
+    engine = create_async_engine(
+        database_url,
+        echo=log_queries,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+    SessionLocal = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+
+    return AsyncDatabaseClient(engine=engine, SessionLocal=SessionLocal)
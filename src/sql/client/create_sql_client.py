@@ -5,11 +5,15 @@ Copyright 2024
 """
 
 from os import getenv
+from threading import Lock
+from time import perf_counter
+from typing import Any
 from dotenv import load_dotenv
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 
 from src.utils import log
@@ -17,6 +21,32 @@ from src.utils import log
 Base = declarative_base()
 
 
+class _TimedQueuePool(QueuePool):
+    """
+    A QueuePool which records how long checkouts wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+
+_clients: dict[tuple[str, bool], "DatabaseClient"] = {}
+_clients_lock = Lock()
+
+
 class DatabaseClient:
     def __init__(
         self,
@@ -43,6 +73,31 @@ class DatabaseClient:
             log.info(f"Executing query: {statement}")
             log.info(f"With parameters: {parameters}")
 
+    def get_pool_status(self) -> dict[str, Any]:
+        """
+        Gets statistics of the connection pool of the engine, and logs them.
+
+        Returns:
+            dict[str, Any]: The 'size' of the pool, the number of connections 'checked_out', 'checked_in' and in 'overflow', and, for pools created by create_sql_client, the number of 'checkouts' and the 'total_wait_seconds' and 'max_wait_seconds' spent waiting for a connection.
+        """
+        pool = self.engine.pool
+        status = {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        }
+        if isinstance(pool, _TimedQueuePool):
+            status["checkouts"] = pool.checkouts
+            status["total_wait_seconds"] = pool.wait_seconds
+            status["max_wait_seconds"] = pool.max_wait_seconds
+
+        log.info(
+            "Connection pool status: "
+            + ", ".join(f"{key}: {value}" for key, value in status.items())
+        )
+        return status
+
     @contextmanager
     def get_db(self):
         db = self.SessionLocal()
@@ -52,31 +107,63 @@ class DatabaseClient:
             db.close()
 
 
-def create_sql_client(log_queries: bool = False) -> DatabaseClient:
+def create_sql_client(
+    log_queries: bool = False,
+    database_url: str | None = None,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+) -> DatabaseClient:
     """
-    Creates a DatabaseClient instance.
+    Creates a DatabaseClient instance, or returns the one already created in this process for the same database.
+
+    Clients are memoized by database URL, so that calling this function in a loop reuses one engine and its connection pool rather than opening new connections each time. The pool settings of the first call for a database apply to every later call.
 
     Args:
         log_queries: bool - Whether to log SQL queries as they are executed.
+        database_url: str | None - The database URL. Defaults to the PostgreSQL database given by the POSTGRES_* environment variables.
+        pool_size: int - The number of connections kept open in the pool. Defaults to 10.
+        max_overflow: int - The number of connections opened beyond pool_size when the pool is exhausted. Defaults to 20.
+        pool_timeout: float - Seconds to wait for a connection before raising an error. Defaults to 30.
+        pool_recycle: int - Seconds after which a connection is replaced, before the server or a proxy closes it. Defaults to 1800.
+        pool_pre_ping: bool - Whether to test connections as they are checked out, replacing any which have been closed. Defaults to True.
 
     Returns:
         DatabaseClient - The configured DatabaseClient instance.
     """
     log.function_call()
 
-    load_dotenv()
-
-    host = getenv("POSTGRES_HOST")
-    port = getenv("POSTGRES_PORT")
-    database = getenv("POSTGRES_DATABASE")
-    username = getenv("POSTGRES_USERNAME")
-    password = getenv("POSTGRES_PASSWORD")
-
-    database_url = f"postgresql://{username}:{password}@{host}:{port}/{database}"
-
-    engine = create_engine(database_url, echo=log_queries)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-    return DatabaseClient(
-        engine=engine, SessionLocal=SessionLocal, log_queries=log_queries
-    )
+    if database_url is None:
+        load_dotenv()
+
+        host = getenv("POSTGRES_HOST")
+        port = getenv("POSTGRES_PORT")
+        database = getenv("POSTGRES_DATABASE")
+        username = getenv("POSTGRES_USERNAME")
+        password = getenv("POSTGRES_PASSWORD")
+
+        database_url = f"postgresql://{username}:{password}@{host}:{port}/{database}"
+
+    with _clients_lock:
+        if (client := _clients.get((database_url, log_queries))) is not None:
+            return client
+
+        engine = create_engine(
+            database_url,
+            echo=log_queries,
+            poolclass=_TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        client = DatabaseClient(
+            engine=engine, SessionLocal=SessionLocal, log_queries=log_queries
+        )
+        _clients[(database_url, log_queries)] = client
+        return client
@@ -4,13 +4,28 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
-from sqlalchemy import Column, UUID, String, TIMESTAMP, Float, Integer
+from sqlalchemy import Column, UUID, String, TIMESTAMP, Float, Integer, Index
 from ..client import Base
 
 
 class Models(Base):
 
     __tablename__ = "models"
+    __table_args__ = (
+        Index(
+            "ix_models_created_at_precision_threshold_percentage",
+            "created_at",
+            "precision",
+            "threshold_percentage",
+        ),
+        Index(
+            "ix_models_last_modified_at_precision_threshold_percentage",
+            "last_modified_at",
+            "precision",
+            "threshold_percentage",
+        ),
+        Index("ix_models_symbol_created_at", "symbol", "created_at"),
+    )  # created by migrate_models_table.py on existing databases
 
     model_id = Column(UUID, nullable=False, primary_key=True)
     model_url = Column(String, nullable=False)
@@ -38,3 +53,8 @@ class Models(Base):
     created_at = Column(TIMESTAMP, nullable=False)
     threshold_percentage = Column(Float, nullable=True)
     f1 = Column(Float, nullable=True)
+    booster_url = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)  # null for pooled models
+    first_entry_price = Column(Float, nullable=True)
+    hyperparameters = Column(String, nullable=True)
+    fold_metrics = Column(String, nullable=True)
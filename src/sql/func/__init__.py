@@ -4,9 +4,15 @@ Author: Edmund Bennett
 Copyright 2024
 """
 
+from .copy_data import copy_data
 from .delete_data import delete_data
 from .get_data import get_data
+from .get_data_async import get_data_async
+from .get_dataframe import get_dataframe
 from .insert_data import insert_data
+from .insert_data_async import insert_data_async
+from .stream_data import stream_data
+from .transaction_journal import TransactionJournal
 from .update_data import update_data
 from .unpackers import (
     unpack_related_companies,
@@ -0,0 +1,238 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from io import BytesIO
+from typing import Any
+from uuid import uuid4
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as csv
+from sqlalchemy import Column, Table, Uuid, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..client import DatabaseClient
+from .get_arrow_type import get_arrow_type
+from src.utils import log
+
+
+def _get_columns(
+    table: Table,
+    data: list[dict[str, Any]] | pd.DataFrame,
+) -> list[Column]:
+    names = (
+        set(data.columns)
+        if isinstance(data, pd.DataFrame)
+        else {key for row in data for key in row}
+    )
+    return [column for column in table.columns if column.name in names]
+
+
+def _to_arrow(
+    data: list[dict[str, Any]] | pd.DataFrame,
+    columns: list[Column],
+) -> pa.Table:
+    """
+    Converts rows to an Arrow table with one column per column of the database table, typed by its SQLAlchemy type.
+
+    Args:
+        data (list[dict[str, Any]] | pd.DataFrame): The rows.
+        columns (list[Column]): The columns of the database table present in the rows.
+
+    Returns:
+        pa.Table: The rows. Values are cast where their type differs from that of the column, so that for instance a fractional volume is truncated to an integer.
+    """
+    arrays = []
+    for column in columns:
+        values = (
+            data[column.name]
+            if isinstance(data, pd.DataFrame)
+            else [row.get(column.name) for row in data]
+        )
+        if isinstance(column.type, Uuid):
+            values = [None if pd.isna(e) else str(e) for e in values]
+        array = pa.array(values, from_pandas=True)
+        field_type = get_arrow_type(column)
+        arrays.append(
+            array if array.type == field_type else array.cast(field_type, safe=False)
+        )
+
+    return pa.Table.from_arrays(arrays, names=[column.name for column in columns])
+
+
+def _write_copy_csv(batch: pa.RecordBatch) -> BytesIO:
+    """
+    Writes rows in the CSV format read by PostgreSQL COPY ... FROM STDIN WITH (FORMAT csv).
+
+    Args:
+        batch (pa.RecordBatch): The rows.
+
+    Returns:
+        BytesIO: The CSV, without a header. Strings are quoted, so that NULL is unquoted and an empty string quoted.
+    """
+    buffer = BytesIO()
+    csv.write_csv(
+        batch,
+        buffer,
+        write_options=csv.WriteOptions(include_header=False, quoting_style="needed"),
+    )
+    buffer.seek(0)
+    return buffer
+
+
+def _copy(
+    database_client: DatabaseClient,
+    table: Table,
+    data: list[dict[str, Any]] | pd.DataFrame,
+    columns: list[Column],
+    on_conflict: str | None,
+    conflict_columns: list[Column],
+    batch_size: int,
+) -> int:
+    preparer = database_client.engine.dialect.identifier_preparer
+    target = preparer.format_table(table)
+    staging = preparer.quote(f"{table.name}_copy_{uuid4().hex[:8]}")
+    ordinal = preparer.quote("copy_ordinal")
+    names = ", ".join(preparer.quote(column.name) for column in columns)
+    conflict_names = ", ".join(
+        preparer.quote(column.name) for column in conflict_columns
+    )
+    update_names = [
+        preparer.quote(column.name)
+        for column in columns
+        if column not in conflict_columns
+    ]
+
+    query = f"INSERT INTO {target} ({names}) SELECT {names} FROM {staging}"
+    if on_conflict == "update" and update_names:
+        query = (
+            f"INSERT INTO {target} ({names}) "
+            f"SELECT DISTINCT ON ({conflict_names}) {names} FROM {staging} "
+            f"ORDER BY {conflict_names}, {ordinal} DESC "
+            f"ON CONFLICT ({conflict_names}) DO UPDATE SET "
+            + ", ".join(f"{e} = EXCLUDED.{e}" for e in update_names)
+        )  # a row may only be updated once by a statement, so the last duplicate wins
+    elif on_conflict is not None:
+        query += f" ON CONFLICT ({conflict_names}) DO NOTHING"
+
+    connection = database_client.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {names} FROM {target} WITH NO DATA"
+        )  # without the constraints of the table, so that every row can be copied
+        cursor.execute(
+            f"ALTER TABLE {staging} ADD COLUMN {ordinal} BIGSERIAL"
+        )  # numbers the rows in the order they are copied
+        for batch in _to_arrow(data, columns).to_batches(max_chunksize=batch_size):
+            cursor.copy_expert(
+                f"COPY {staging} ({names}) FROM STDIN WITH (FORMAT csv)",
+                _write_copy_csv(batch),
+            )
+        cursor.execute(query)
+        written = cursor.rowcount
+        connection.commit()
+        return written
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def _insert(
+    database_client: DatabaseClient,
+    table: Table,
+    data: list[dict[str, Any]] | pd.DataFrame,
+    columns: list[Column],
+    on_conflict: str | None,
+    conflict_columns: list[Column],
+) -> int:
+    if isinstance(data, pd.DataFrame):
+        data = data.astype(object).where(data.notna(), None).to_dict("records")
+    rows = [{column.name: row.get(column.name) for column in columns} for row in data]
+
+    if on_conflict is None:
+        statement = insert(table)
+    elif database_client.engine.dialect.name == "sqlite":
+        statement = sqlite_insert(table)
+        update_columns = [e for e in columns if e not in conflict_columns]
+        statement = (
+            statement.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={e.name: statement.excluded[e.name] for e in update_columns},
+            )
+            if on_conflict == "update" and update_columns
+            else statement.on_conflict_do_nothing(index_elements=conflict_columns)
+        )
+    else:
+        raise NotImplementedError(
+            f"Conflicts are not handled on {database_client.engine.dialect.name}."
+        )
+
+    with database_client.engine.begin() as connection:
+        return connection.execute(statement, rows).rowcount
+
+
+def copy_data(
+    database_client: DatabaseClient,
+    model: Any,
+    data: list[dict[str, Any]] | pd.DataFrame,
+    on_conflict: str | None = None,
+    conflict_columns: list[Column] | None = None,
+    batch_size: int = 100_000,
+) -> int | None:
+    """
+    Bulk loads rows into a table, without creating an ORM object per row.
+
+    On PostgreSQL the rows are converted to Arrow, streamed with COPY ... FROM STDIN into a temporary table, and then inserted into the table with a single INSERT ... SELECT. Rows which conflict with existing rows are either skipped or update them, the last of several rows with the same key taking precedence, so that a partial insert or an upsert runs at the speed of COPY rather than committing a transaction per row. On other databases the rows are inserted with a core insert.
+
+    Columns absent from every row are left to their defaults. A column present in some rows but not others is null in the rows without it.
+
+    Args:
+        database_client (DatabaseClient): A database client.
+        model (Any): The model object representing the database table.
+        data (list[dict[str, Any]] | pd.DataFrame): The rows to load, keyed by column name. Keys which are not columns of the table are ignored.
+        on_conflict (str | None): 'nothing' to skip rows which conflict with existing rows, 'update' to update the existing rows with them, or None for a conflict to fail the load. Defaults to None.
+        conflict_columns (list[Column] | None): The columns of the unique constraint on which rows conflict. Defaults to the primary key of the table.
+        batch_size (int): The number of rows written to COPY at a time. Defaults to 100,000.
+
+    Returns:
+        int | None: The number of rows inserted or updated, or None if an error occurs, in which case no rows are loaded.
+    """
+    log.function_call()
+
+    if on_conflict not in (None, "nothing", "update"):
+        log.error(f"Invalid on_conflict: {on_conflict}")
+        return None
+
+    table = model.__table__
+    columns = _get_columns(table, data)
+    conflict_columns = conflict_columns or list(table.primary_key.columns)
+    if not len(data) or not columns:
+        return 0
+
+    try:
+        if database_client.engine.dialect.name == "postgresql":
+            written = _copy(
+                database_client,
+                table,
+                data,
+                columns,
+                on_conflict,
+                conflict_columns,
+                batch_size,
+            )
+        else:
+            written = _insert(
+                database_client, table, data, columns, on_conflict, conflict_columns
+            )
+        log.info(f"{written} of {len(data)} rows written to {table.name}.")
+        return written
+
+    except Exception as e:
+        log.error(f"Error copying data. Error: {e}")
+        return None
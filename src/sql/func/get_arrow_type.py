@@ -0,0 +1,31 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pyarrow as pa
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, Numeric
+
+
+def get_arrow_type(column: Column) -> pa.DataType:
+    """
+    Maps the type of a column to the Arrow type in which its values are held.
+
+    Args:
+        column (Column): A column of a table.
+
+    Returns:
+        pa.DataType: The Arrow type. UUIDs and other types without an Arrow equivalent are held as strings.
+    """
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.float64()
+    return pa.string()
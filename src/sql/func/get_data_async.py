@@ -0,0 +1,84 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from sqlalchemy import select
+from sqlalchemy.sql.elements import BooleanClauseList
+
+from ..client import AsyncDatabaseClient
+from src.utils import log
+
+
+async def get_data_async(
+    database_client: AsyncDatabaseClient,
+    models: list[Any] | None,
+    joins: list[tuple[Any, ...]] = None,
+    where_clause: BooleanClauseList | None = None,
+    entities: list = None,
+    group_by: list = None,
+    having_clause: BooleanClauseList | None = None,
+    as_dict: bool = True,
+):
+    """
+    Retrieves data from the database based on specified models, joins, and conditions, as get_data does, without blocking the event loop.
+
+    Args:
+        database_client: An AsyncDatabaseClient instance for database connection.
+        models: An optional list of model objects representing database tables.
+        joins: An optional list of tuples specifying table joins.
+        where_clause: An optional BooleanClauseList representing query conditions.
+        entities: An optional list of entities to query.
+        group_by: An optional list of columns to group results by.
+        having_clause: An optional BooleanClauseList representing conditions on groups.
+        as_dict: A boolean indicating whether to return results as dictionaries (default is True).
+
+    Returns:
+        A list of dictionaries or model objects based on the query results, or None if an error occurs.
+    """
+    log.function_call()
+
+    statement = select(*entities) if entities else select(*models)
+
+    if where_clause is not None:
+        statement = statement.where(where_clause)
+
+    if joins:
+        for join in joins:
+            statement = statement.join(*join)
+
+    if group_by is not None:
+        statement = statement.group_by(*group_by)
+
+    if having_clause is not None:
+        statement = statement.having(having_clause)
+
+    async with database_client.get_db() as db:
+        try:
+            result = await db.execute(statement)
+
+            if not entities:
+                results = result.scalars().all()
+                if not as_dict:
+                    return results
+                return [
+                    {
+                        column.name: getattr(e, column.name)
+                        for column in e.__table__.columns
+                    }
+                    for e in results
+                ]
+
+            results = result.all()
+            if not as_dict:
+                return results
+            names = [
+                entity.name if hasattr(entity, "name") else str(entity)
+                for entity in entities
+            ]
+            return [dict(zip(names, tuple(e))) for e in results]
+
+        except Exception as e:
+            log.error(f"Error getting data. Error: {e}")
@@ -0,0 +1,139 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from io import BytesIO
+from typing import Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as csv
+from sqlalchemy import Column, Uuid, select
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import BooleanClauseList
+
+from ..client import DatabaseClient
+from .get_arrow_type import get_arrow_type
+from src.utils import log
+
+
+def _read_copy_csv(buffer: BytesIO, columns: list[Column]) -> pa.Table:
+    """
+    Reads the output of a PostgreSQL COPY ... TO STDOUT WITH (FORMAT csv, HEADER true) into an Arrow table typed by the columns copied.
+
+    Args:
+        buffer (BytesIO): The CSV output.
+        columns (list[Column]): The columns copied, in order.
+
+    Returns:
+        pa.Table: The rows copied.
+    """
+    return csv.read_csv(
+        buffer,
+        convert_options=csv.ConvertOptions(
+            column_types={column.name: get_arrow_type(column) for column in columns},
+            true_values=["t"],
+            false_values=["f"],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,  # NULL is unquoted and an empty string quoted
+        ),
+    )
+
+
+def _copy(
+    database_client: DatabaseClient,
+    statement: Select,
+    columns: list[Column],
+) -> pa.Table:
+    compiled = statement.compile(
+        dialect=database_client.engine.dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    buffer = BytesIO()
+    connection = database_client.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        query = cursor.mogrify(str(compiled), compiled.params).decode()
+        cursor.copy_expert(
+            f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", buffer
+        )
+    finally:
+        connection.close()
+    buffer.seek(0)
+
+    return _read_copy_csv(buffer, columns)
+
+
+def _select(
+    database_client: DatabaseClient,
+    statement: Select,
+    columns: list[Column],
+    batch_size: int,
+) -> pa.Table:
+    schema = pa.schema([(column.name, get_arrow_type(column)) for column in columns])
+    is_uuid = [isinstance(column.type, Uuid) for column in columns]
+
+    batches = []
+    with database_client.engine.connect() as connection:
+        result = connection.execution_options(yield_per=batch_size).execute(statement)
+        for partition in result.partitions():
+            batches.append(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(
+                            (
+                                [None if e is None else str(e) for e in values]
+                                if uuid
+                                else values
+                            ),
+                            type=field.type,
+                        )
+                        for values, field, uuid in zip(zip(*partition), schema, is_uuid)
+                    ],
+                    schema=schema,
+                )
+            )  # each batch is held as typed columns rather than rows
+
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def get_dataframe(
+    database_client: DatabaseClient,
+    models: list[Any],
+    where_clause: BooleanClauseList | None = None,
+    columns: list[Column] | None = None,
+    batch_size: int = 100_000,
+) -> pd.DataFrame | None:
+    """
+    Retrieves the rows of a table straight into a DataFrame, without creating an ORM object or dictionary per row.
+
+    On PostgreSQL the rows are copied out with COPY ... TO STDOUT and parsed by Arrow. On other databases they are streamed from a core select in batches of typed columns. Columns are typed by their SQLAlchemy types, except that UUIDs are read as strings.
+
+    Args:
+        database_client (DatabaseClient): A DatabaseClient instance for database connection.
+        models (list[Any]): A list containing the model object representing the database table.
+        where_clause (BooleanClauseList | None): An optional BooleanClauseList representing query conditions.
+        columns (list[Column] | None): The columns to retrieve. Defaults to all columns of the table.
+        batch_size (int): The number of rows fetched at a time when streaming from a select. Defaults to 100,000.
+
+    Returns:
+        pd.DataFrame | None: The rows retrieved, or None if an error occurs.
+    """
+    log.function_call()
+
+    columns = columns or list(models[0].__table__.columns)
+    statement = select(*columns)
+    if where_clause is not None:
+        statement = statement.where(where_clause)
+
+    try:
+        table = (
+            _copy(database_client, statement, columns)
+            if database_client.engine.dialect.name == "postgresql"
+            else _select(database_client, statement, columns, batch_size)
+        )
+        return table.to_pandas()
+
+    except Exception as e:
+        log.error(f"Error getting data. Error: {e}")
@@ -5,13 +5,89 @@ Copyright 2024
 """
 
 from typing import Any
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from ..client import DatabaseClient
+from .copy_data import copy_data
 from src.utils import log
 
 
+def _group_documents(documents: list[Any]) -> dict[Any, list[dict[str, Any]]]:
+    """
+    Converts documents to rows of their assigned column attributes, grouped by model and by the attributes assigned.
+
+    Args:
+        documents (list[Any]): A list of Data Transfer Objects (DTOs).
+
+    Returns:
+        dict[Any, list[dict[str, Any]]]: The rows, keyed by model and attribute names. Attributes which were never set are left out, so that they take their defaults.
+    """
+    groups: dict[tuple[Any, tuple[str, ...]], list[dict[str, Any]]] = {}
+    for document in documents:
+        state = inspect(document)
+        row = {
+            attribute.key: state.dict[attribute.key]
+            for attribute in state.mapper.column_attrs
+            if attribute.key in state.dict
+        }
+        groups.setdefault((type(document), tuple(row)), []).append(row)
+    return groups
+
+
+def _insert_documents(
+    database_client: DatabaseClient,
+    documents: list[Any],
+    upsert: bool,
+) -> bool:
+    success = True
+    with database_client.get_db() as db:
+        for document in documents:
+            try:
+                if upsert:
+                    # Assuming the document is a SQLAlchemy model instance
+                    # Use the `merge` method for upsert
+                    db.merge(document)
+                else:
+                    db.add(document)
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()  # Rollback only this document's transaction
+                log.warning(f"Error processing document {document}. Error: {e}")
+                success = False
+    return success
+
+
+def _copy_documents(
+    database_client: DatabaseClient,
+    documents: list[Any],
+    upsert: bool,
+) -> bool:
+    success = True
+    for (model, _), rows in _group_documents(documents).items():
+        written = copy_data(
+            database_client,
+            model,
+            rows,
+            on_conflict="update" if upsert else "nothing",
+        )
+        if written is None:
+            log.warning(
+                f"Could not copy {len(rows)} documents. Writing them one at a time."
+            )  # a violation other than a key conflict fails the whole load
+            success = (
+                _insert_documents(
+                    database_client, [model(**row) for row in rows], upsert
+                )
+                and success
+            )
+        elif written < len(rows):
+            log.warning(f"{len(rows) - written} documents were not written.")
+            success = False
+    return success
+
+
 def insert_data(
     database_client: DatabaseClient,
     documents: list[Any],
@@ -26,32 +102,26 @@ def insert_data(
         documents (list): A list of Data Transfer Objects (DTOs) to be inserted.
         allow_partial_inserts (bool): If True, allows for partial insertion of documents that do not violate constraints.
         upsert (bool): If True, performs an upsert operation (insert or update).
+
+    Returns:
+        bool: True if every document was written. On PostgreSQL, partial inserts and upserts are loaded with copy_data in a single statement per model, rather than committed one document at a time. That statement only skips or updates documents whose primary key conflicts with an existing row, so any other violation fails the load of the model, whose documents are then committed one at a time and skipped where they violate a constraint.
     """
     log.function_call()
 
+    if (allow_partial_inserts or upsert) and (
+        database_client.engine.dialect.name == "postgresql"
+    ):
+        return _copy_documents(database_client, documents, upsert)
+
+    if allow_partial_inserts or upsert:
+        return _insert_documents(database_client, documents, upsert)
+
     with database_client.get_db() as db:
-        if allow_partial_inserts or upsert:
-            success = True
-            for document in documents:
-                try:
-                    if upsert:
-                        # Assuming the document is a SQLAlchemy model instance
-                        # Use the `merge` method for upsert
-                        db.merge(document)
-                    else:
-                        db.add(document)
-                    db.commit()
-                except IntegrityError as e:
-                    db.rollback()  # Rollback only this document's transaction
-                    log.warning(f"Error processing document {document}. Error: {e}")
-                    success = False
-            return success
-        else:
-            try:
-                db.bulk_save_objects(documents)
-                db.commit()
-                return True
-            except Exception as e:
-                db.rollback()
-                log.error(f"Error inserting data. Error: {e}")
-                return False
+        try:
+            db.bulk_save_objects(documents)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            log.error(f"Error inserting data. Error: {e}")
+            return False
@@ -0,0 +1,109 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..client import AsyncDatabaseClient
+from .insert_data import _group_documents
+from src.utils import log
+
+
+async def _insert_rows(
+    database_client: AsyncDatabaseClient,
+    model: Any,
+    rows: list[dict[str, Any]],
+    upsert: bool,
+) -> int:
+    table = model.__table__
+    conflict_columns = list(table.primary_key.columns)
+
+    dialect = database_client.engine.dialect.name
+    if dialect == "postgresql":
+        statement = pg_insert(table)
+    elif dialect == "sqlite":
+        statement = sqlite_insert(table)
+    else:
+        raise NotImplementedError(f"Conflicts are not handled on {dialect}.")
+
+    update_columns = [
+        e.name for e in table.columns if e.name in rows[0] and e not in conflict_columns
+    ]
+    statement = (
+        statement.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={e: statement.excluded[e] for e in update_columns},
+        )
+        if upsert and update_columns
+        else statement.on_conflict_do_nothing(index_elements=conflict_columns)
+    ).returning(*conflict_columns)
+
+    async with database_client.get_db() as db:
+        try:
+            result = await db.execute(statement, rows)
+            written = len(result.all())  # only rows inserted or updated are returned
+            await db.commit()
+            return written
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def insert_data_async(
+    database_client: AsyncDatabaseClient,
+    documents: list[Any],
+    allow_partial_inserts: bool = False,
+    upsert: bool = False,
+) -> bool:
+    """
+    Bulk inserts data into the database, as insert_data does, without blocking the event loop.
+
+    Args:
+        database_client (AsyncDatabaseClient): An async database client.
+        documents (list): A list of Data Transfer Objects (DTOs) to be inserted.
+        allow_partial_inserts (bool): If True, skips documents which conflict with existing rows rather than failing the insert.
+        upsert (bool): If True, performs an upsert operation (insert or update).
+
+    Returns:
+        bool: True if every document was written. Partial inserts and upserts are written with a single INSERT ... ON CONFLICT statement per model, rather than one transaction per document. As a row may only be updated once by a statement, an upsert writes only the last of several documents with the same primary key, as merging them one at a time would leave it, and the others are counted as written.
+    """
+    log.function_call()
+
+    if allow_partial_inserts or upsert:
+        success = True
+        for (model, _), rows in _group_documents(documents).items():
+            if upsert:
+                primary_key = list(model.__table__.primary_key.columns)
+                unique_rows = list(
+                    {
+                        tuple(row.get(e.name) for e in primary_key): row for row in rows
+                    }.values()
+                )  # a row may only be updated once by a statement
+                if len(unique_rows) < len(rows):
+                    log.warning(
+                        f"{len(rows) - len(unique_rows)} documents were superseded by later documents with the same primary key."
+                    )
+                rows = unique_rows
+            try:
+                written = await _insert_rows(database_client, model, rows, upsert)
+            except Exception as e:
+                log.error(f"Error inserting data. Error: {e}")
+                written = 0
+            if written < len(rows):
+                log.warning(f"{len(rows) - written} documents were not written.")
+                success = False
+        return success
+
+    async with database_client.get_db() as db:
+        try:
+            db.add_all(documents)
+            await db.commit()
+            return True
+        except Exception as e:
+            await db.rollback()
+            log.error(f"Error inserting data. Error: {e}")
+            return False
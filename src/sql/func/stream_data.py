@@ -0,0 +1,91 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from typing import Any, Iterator
+from sqlalchemy import select
+from sqlalchemy.sql.elements import BooleanClauseList
+
+from ..client import DatabaseClient
+from src.utils import log
+
+
+def stream_data(
+    database_client: DatabaseClient,
+    models: list[Any] | None,
+    joins: list[tuple[Any, ...]] = None,
+    where_clause: BooleanClauseList | None = None,
+    entities: list = None,
+    group_by: list = None,
+    having_clause: BooleanClauseList | None = None,
+    as_dict: bool = True,
+    batch_size: int = 10_000,
+) -> Iterator[list[Any]]:
+    """
+    Retrieves data from the database in batches, as get_data does, but through a server-side cursor so that only one batch of rows is held in memory at a time.
+
+    Args:
+        database_client: A DatabaseClient instance for database connection.
+        models: An optional list containing the model object representing the database table.
+        joins: An optional list of tuples specifying table joins.
+        where_clause: An optional BooleanClauseList representing query conditions.
+        entities: An optional list of entities to query.
+        group_by: An optional list of columns to group results by.
+        having_clause: An optional BooleanClauseList representing conditions on groups.
+        as_dict: A boolean indicating whether to yield results as dictionaries (default is True).
+        batch_size: The number of rows fetched from the cursor and yielded at a time (default is 10,000).
+
+    Yields:
+        Lists of up to batch_size dictionaries or model objects.
+
+    Raises:
+        Exception: If an error occurs during data retrieval. The error is raised rather than logged and swallowed, so that a partially read result is not mistaken for a complete one.
+    """
+    log.function_call()
+
+    statement = select(*entities) if entities else select(*models)
+
+    if where_clause is not None:
+        statement = statement.where(where_clause)
+
+    if joins:
+        for join in joins:
+            statement = statement.join(*join)
+
+    if group_by is not None:
+        statement = statement.group_by(*group_by)
+
+    if having_clause is not None:
+        statement = statement.having(having_clause)
+
+    with database_client.get_db() as db:
+        try:
+            result = db.execute(
+                statement,
+                execution_options={"yield_per": batch_size},
+            )  # rows are fetched from a server-side cursor in batches
+            if not entities:
+                result = result.scalars()
+                column_names = [column.name for column in models[0].__table__.columns]
+            else:
+                column_names = [
+                    entity.name if hasattr(entity, "name") else str(entity)
+                    for entity in entities
+                ]
+
+            for partition in result.partitions():
+                if not as_dict:
+                    yield list(partition)
+                elif not entities:
+                    yield [
+                        {name: getattr(e, name) for name in column_names}
+                        for e in partition
+                    ]
+                else:
+                    yield [dict(zip(column_names, tuple(e))) for e in partition]
+
+        except Exception as e:
+            log.error(f"Error streaming data. Error: {e}")
+            raise
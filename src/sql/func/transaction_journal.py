@@ -0,0 +1,242 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os import fsync, getenv, makedirs, replace
+from os.path import abspath, dirname, isfile, join
+from datetime import date, datetime, timedelta
+from json import dumps, loads
+from threading import Event, Lock, Thread
+from typing import Any
+from uuid import UUID, uuid4
+from sqlalchemy import DATETIME, TIMESTAMP, Uuid, text
+
+from ..client import DatabaseClient
+from ..dto import Transactions
+from .insert_data import insert_data
+from src.utils import log
+
+
+class TransactionJournal:
+    """
+    Buffers Transactions records in memory and inserts them into the database in batches on a background thread, so that the trading loop never waits on a database commit.
+
+    Every record is appended to a write-ahead file before it is buffered, and the file is rewritten with the records that remain once a batch has been committed. Records left in the file by a process that died before they were committed are recovered when the journal is next opened. Batches are inserted with an upsert, so that a record committed before its batch failed, or before the process died, is not inserted twice.
+
+    A batch which fails while the database is reachable is split in halves until the records that fail on their own are isolated. Those are moved to a dead-letter file next to the write-ahead file, so that one record which can never be inserted does not hold back the records after it.
+
+    The write-ahead file can be overridden with the TRANSACTION_JOURNAL_PATH environment variable.
+
+    Examples:
+        >>> with TransactionJournal(database_client) as journal:
+        >>>     journal.append(transaction_id=str(uuid4()), ...)
+    """
+
+    def __init__(
+        self,
+        database_client: DatabaseClient,
+        wal_path: str | None = None,
+        flush_interval: timedelta = timedelta(seconds=30),
+        max_batch_size: int = 1000,
+    ):
+        log.function_call()
+        self.database_client = database_client
+        self.wal_path = abspath(
+            wal_path
+            or getenv(
+                "TRANSACTION_JOURNAL_PATH",
+                join(dirname(__file__), "../../../staging/transactions.wal"),
+            )
+        )
+        self.dead_letter_path = f"{self.wal_path}.dead"
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.records: list[dict[str, Any]] = []
+        self.lock = Lock()  # guards records and the write-ahead file
+        self.flush_lock = Lock()  # one batch is inserted at a time
+        self.stopped = Event()
+
+        makedirs(dirname(self.wal_path), exist_ok=True)
+        self._recover()
+        self.wal = open(self.wal_path, "a")
+
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _decode(record: dict[str, Any]) -> dict[str, Any]:
+        columns = Transactions.__table__.columns
+        decoded = {}
+        for key, value in record.items():
+            if value is not None and isinstance(
+                columns[key].type, (DATETIME, TIMESTAMP)
+            ):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(columns[key].type, Uuid):
+                value = UUID(value)
+            decoded[key] = value
+        return decoded
+
+    def _recover(self):
+        if not isfile(self.wal_path):
+            return
+        with open(self.wal_path, "r") as f:
+            records = [loads(line) for line in f if line.strip()]
+        if not records:
+            return
+
+        log.warning(
+            f"Recovering {len(records)} transactions from write-ahead file: {self.wal_path}"
+        )
+        if not self._insert(records):
+            log.error("Could not recover all transactions from write-ahead file.")
+            self.records.extend(records)
+            return
+        self._rewrite([])
+
+    def _rewrite(self, records: list[dict[str, Any]]):
+        temporary_path = f"{self.wal_path}.{uuid4()}.tmp"
+        with open(temporary_path, "w") as f:
+            f.writelines(f"{dumps(record)}\n" for record in records)
+            f.flush()
+            fsync(f.fileno())
+        replace(temporary_path, self.wal_path)
+
+    def _insert(self, records: list[dict[str, Any]]) -> bool:
+        try:
+            return insert_data(
+                database_client=self.database_client,
+                documents=[Transactions(**self._decode(record)) for record in records],
+                upsert=True,
+            )
+        except Exception as e:
+            log.error(f"Error inserting transactions. Error: {e}")
+            return False
+
+    def _is_database_available(self) -> bool:
+        try:
+            with self.database_client.get_db() as db:
+                db.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            log.error(f"Database unavailable. Error: {e}")
+            return False
+
+    def _insert_isolating(
+        self, records: list[dict[str, Any]]
+    ) -> list[dict[str, Any]] | None:
+        """
+        Inserts records, splitting them in halves on failure to isolate those which cannot be inserted.
+
+        Args:
+            records (list[dict[str, Any]]): The records.
+
+        Returns:
+            list[dict[str, Any]] | None: The records which failed on their own, or None if the database is unavailable, in which case any of the records may not have been inserted.
+        """
+        if self._insert(records):
+            return []
+        if not self._is_database_available():
+            return None
+        if len(records) == 1:
+            return records
+
+        middle = len(records) // 2
+        if (failed := self._insert_isolating(records[:middle])) is None:
+            return None
+        if (later_failed := self._insert_isolating(records[middle:])) is None:
+            return None
+        return failed + later_failed
+
+    def _dead_letter(self, records: list[dict[str, Any]]):
+        with open(self.dead_letter_path, "a") as f:
+            f.writelines(f"{dumps(record)}\n" for record in records)
+            f.flush()
+            fsync(f.fileno())
+        log.error(
+            f"Moved {len(records)} transactions which could not be inserted to dead-letter file: {self.dead_letter_path}"
+        )
+
+    def append(self, **kwargs):
+        """
+        Records a transaction. The keyword arguments are the columns of Transactions.
+
+        The transaction is written to the write-ahead file before returning, and inserted into the database by the next flush.
+        """
+        log.function_call()
+
+        record = {key: self._encode(value) for key, value in kwargs.items()}
+        with self.lock:
+            self.wal.write(f"{dumps(record)}\n")
+            self.wal.flush()
+            fsync(self.wal.fileno())
+            self.records.append(record)
+
+    def flush(self) -> bool:
+        """
+        Inserts the buffered transactions into the database.
+
+        Returns:
+            bool: Whether all buffered transactions were inserted. Transactions which were not because the database is unavailable are kept and retried by the next flush, and those which failed on their own are moved to the dead-letter file.
+        """
+        log.function_call()
+
+        flushed = True
+        with self.flush_lock:
+            while True:
+                with self.lock:
+                    batch = self.records[: self.max_batch_size]
+                if not batch:
+                    return flushed
+
+                if (failed := self._insert_isolating(batch)) is None:
+                    log.error(f"Could not insert {len(batch)} transactions.")
+                    return False
+                if failed:
+                    self._dead_letter(failed)
+                    flushed = False
+
+                with self.lock:
+                    del self.records[: len(batch)]
+                    self.wal.close()
+                    self._rewrite(self.records)
+                    self.wal = open(self.wal_path, "a")
+
+                log.info(f"Inserted {len(batch) - len(failed)} transactions.")
+
+    def _run(self):
+        while not self.stopped.wait(self.flush_interval.total_seconds()):
+            self.flush()
+
+    def close(self) -> bool:
+        """
+        Stops the background flush and inserts any remaining transactions.
+
+        Returns:
+            bool: Whether all transactions were inserted. Those which were not remain in the write-ahead file.
+        """
+        log.function_call()
+
+        self.stopped.set()
+        self.thread.join()
+        flushed = self.flush()
+        with self.lock:
+            self.wal.close()
+
+        return flushed
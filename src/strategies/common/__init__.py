@@ -8,3 +8,4 @@ from .calc_cagr import calc_cagr
 from .calc_kelly_bet import calc_kelly_bet
 from .calc_sharpe_ratio import calc_sharpe_ratio
 from .get_strategies import get_strategies
+from .market_session_scheduler import MarketSessionScheduler
@@ -0,0 +1,289 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import Task, create_task, gather, sleep, to_thread, wrap_future
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from inspect import iscoroutinefunction
+from threading import Thread
+from typing import Any, Awaitable, Callable
+from zoneinfo import ZoneInfo
+from alpaca.broker.client import BrokerClient
+
+from src.brokerage.alpaca.broker import get_calendar, get_clock
+from src.utils import log
+
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+Hook = Callable[[dict[str, datetime]], None | Awaitable[None]]
+
+
+class MarketSessionScheduler:
+    """
+    Runs the hooks of several strategies in one process, at fixed times relative to each market session.
+
+    Hooks are called with the open and close times of the session. Coroutine functions are awaited on the event loop, and other functions are called on a worker thread, so that a strategy making blocking requests does not delay the hooks of other strategies. A hook which runs for much of the session, such as one which monitors positions until the close, can be given a dedicated thread so that it does not hold one of the worker threads shared with the clock and other hooks. An interval hook which is still running when it is next due is skipped rather than run twice at once. A hook which raises is logged and does not stop the scheduler.
+
+    When the scheduler starts during a session, hooks at the open and before the open or close which are already due are called straight away, while interval hooks resume at their next due time.
+
+    The market clock is read from the broker client, which should be a CachedBrokerClient shared with the strategies so that they do not each poll the API.
+
+    Examples:
+        >>> scheduler = MarketSessionScheduler(CachedBrokerClient(create_broker_client()))
+        >>> scheduler.at_pre_open("binary_models", prepare_models, before=timedelta(minutes=30))
+        >>> scheduler.every("runner", trade_period, interval=timedelta(minutes=15))
+        >>> scheduler.at_pre_close("runner", close_positions, before=timedelta(minutes=15))
+        >>> run(scheduler.run(sessions=None))
+    """
+
+    def __init__(
+        self,
+        broker_client: BrokerClient,
+        max_sleep: timedelta = timedelta(minutes=5),
+        time_scale: float = 1.0,
+    ):
+        log.function_call()
+        self.broker_client = broker_client
+        self.max_sleep = max_sleep
+        self.time_scale = time_scale
+        self.hooks: list[dict[str, Any]] = []
+        self.running: dict[int, Task] = {}
+
+    def _add_hook(
+        self,
+        strategy: str,
+        callback: Hook,
+        offset: timedelta,
+        anchor: str,
+        interval: timedelta | None = None,
+        until: timedelta = timedelta(0),
+        dedicated_thread: bool = False,
+    ):
+        self.hooks.append(
+            {
+                "strategy": strategy,
+                "callback": callback,
+                "anchor": anchor,
+                "offset": offset,
+                "interval": interval,
+                "until": until,
+                "dedicated_thread": dedicated_thread,
+            }
+        )
+
+    def at_pre_open(
+        self,
+        strategy: str,
+        callback: Hook,
+        before: timedelta = timedelta(minutes=30),
+        dedicated_thread: bool = False,
+    ):
+        """
+        Calls a hook before the market opens.
+
+        Args:
+            strategy (str): The name of the strategy, with which the hook is logged.
+            callback (Hook): Called with the open and close times of the session.
+            before (timedelta): Duration before the open at which the hook is called. Defaults to 30 minutes.
+            dedicated_thread (bool): Whether to call the hook on a thread of its own rather than a worker thread, for a hook which runs until the close. Defaults to False.
+        """
+        log.function_call()
+        self._add_hook(
+            strategy,
+            callback,
+            offset=-before,
+            anchor="open",
+            dedicated_thread=dedicated_thread,
+        )
+
+    def at_open(
+        self,
+        strategy: str,
+        callback: Hook,
+        after: timedelta = timedelta(0),
+        dedicated_thread: bool = False,
+    ):
+        """
+        Calls a hook once the market has opened.
+
+        Args:
+            strategy (str): The name of the strategy, with which the hook is logged.
+            callback (Hook): Called with the open and close times of the session.
+            after (timedelta): Duration after the open at which the hook is called. Defaults to zero.
+            dedicated_thread (bool): Whether to call the hook on a thread of its own rather than a worker thread, for a hook which runs until the close. Defaults to False.
+        """
+        log.function_call()
+        self._add_hook(
+            strategy,
+            callback,
+            offset=after,
+            anchor="open",
+            dedicated_thread=dedicated_thread,
+        )
+
+    def every(
+        self,
+        strategy: str,
+        callback: Hook,
+        interval: timedelta,
+        after_open: timedelta = timedelta(0),
+        before_close: timedelta = timedelta(0),
+    ):
+        """
+        Calls a hook at a fixed interval while the market is open.
+
+        Args:
+            strategy (str): The name of the strategy, with which the hook is logged.
+            callback (Hook): Called with the open and close times of the session.
+            interval (timedelta): Interval at which the hook is called.
+            after_open (timedelta): Duration after the open at which the hook is first called. Defaults to zero.
+            before_close (timedelta): Duration before the close after which the hook is no longer called. Defaults to zero.
+        """
+        log.function_call()
+        if interval <= timedelta(0):
+            raise ValueError("interval must be positive")
+        self._add_hook(
+            strategy,
+            callback,
+            offset=after_open,
+            anchor="open",
+            interval=interval,
+            until=before_close,
+        )
+
+    def at_pre_close(
+        self,
+        strategy: str,
+        callback: Hook,
+        before: timedelta = timedelta(minutes=15),
+    ):
+        """
+        Calls a hook before the market closes.
+
+        Args:
+            strategy (str): The name of the strategy, with which the hook is logged.
+            callback (Hook): Called with the open and close times of the session.
+            before (timedelta): Duration before the close at which the hook is called. Defaults to 15 minutes.
+        """
+        log.function_call()
+        self._add_hook(strategy, callback, offset=-before, anchor="close")
+
+    async def _now(self) -> datetime:
+        return (await to_thread(get_clock, self.broker_client)).timestamp
+
+    async def _wait_until(self, timestamp: datetime):
+        while (remaining := (timestamp - await self._now()).total_seconds()) > 0:
+            await sleep(
+                min(remaining, self.max_sleep.total_seconds()) / self.time_scale
+            )  # the clock is read again in case it has drifted
+
+    async def get_session(self) -> dict[str, datetime]:
+        """
+        Finds the current market session, or the next if the market is closed.
+
+        Returns:
+            dict[str, datetime]: The 'open' and 'close' times of the session, in ET.
+        """
+        log.function_call()
+
+        now = (await self._now()).astimezone(MARKET_TIMEZONE).replace(tzinfo=None)
+        calendar = await to_thread(get_calendar, self.broker_client)
+        if (day := next((e for e in calendar if e.close > now), None)) is None:
+            raise ValueError(f"The calendar does not extend beyond {now}.")
+
+        return {  # calendar times are in ET
+            "open": day.open.replace(tzinfo=MARKET_TIMEZONE),
+            "close": day.close.replace(tzinfo=MARKET_TIMEZONE),
+        }
+
+    def _get_triggers(
+        self,
+        session: dict[str, datetime],
+        now: datetime,
+    ) -> list[tuple[datetime, int]]:
+        triggers = []
+        for index, hook in enumerate(self.hooks):
+            timestamp = session[hook["anchor"]] + hook["offset"]
+            if hook["interval"] is None:
+                triggers.append((max(timestamp, now), index))
+                continue
+            while timestamp < session["close"] - hook["until"]:
+                if timestamp >= now:
+                    triggers.append((timestamp, index))
+                timestamp += hook["interval"]
+        return sorted(triggers, key=lambda e: e[0])
+
+    @staticmethod
+    async def _on_dedicated_thread(
+        hook: dict[str, Any], session: dict[str, datetime]
+    ) -> Any:
+        future: Future = Future()
+
+        def target():
+            try:
+                future.set_result(hook["callback"](session))
+            except BaseException as e:
+                future.set_exception(e)
+
+        Thread(target=target, name=f"{hook['strategy']}-hook", daemon=True).start()
+        return await wrap_future(future)
+
+    async def _call(self, hook: dict[str, Any], session: dict[str, datetime]):
+        try:
+            if iscoroutinefunction(hook["callback"]):
+                await hook["callback"](session)
+            elif hook["dedicated_thread"]:
+                await self._on_dedicated_thread(hook, session)
+            else:
+                await to_thread(hook["callback"], session)
+        except Exception as e:
+            log.error(f"Hook of strategy: {hook['strategy']} failed. Error: {e}")
+
+    async def run_session(self, session: dict[str, datetime]):
+        """
+        Calls the hooks of a session as they fall due, and waits for them to finish and for the market to close.
+
+        Args:
+            session (dict[str, datetime]): The 'open' and 'close' times of the session, as returned by get_session.
+        """
+        log.function_call()
+
+        log.info(
+            f"Scheduling market session from {session['open']} to {session['close']}."
+        )
+
+        for timestamp, index in self._get_triggers(session, await self._now()):
+            await self._wait_until(timestamp)
+
+            hook = self.hooks[index]
+            if (task := self.running.get(index)) is not None and not task.done():
+                log.warning(
+                    f"Hook of strategy: {hook['strategy']} is still running. Skipping."
+                )
+                continue
+            log.info(f"Calling hook of strategy: {hook['strategy']}")
+            self.running[index] = create_task(self._call(hook, session))
+
+        await gather(*self.running.values())
+        self.running.clear()
+        await self._wait_until(session["close"])
+
+        log.info(f"Market session closed at {session['close']}.")
+
+    async def run(self, sessions: int | None = 1):
+        """
+        Runs the hooks of consecutive market sessions.
+
+        Args:
+            sessions (int | None): The number of sessions to run, or None to run indefinitely. Defaults to 1.
+        """
+        log.function_call()
+
+        completed = 0
+        while sessions is None or completed < sessions:
+            await self.run_session(await self.get_session())
+            completed += 1
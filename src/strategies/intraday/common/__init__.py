@@ -3,3 +3,6 @@
 Author: Edmund Bennett
 Copyright 2023
 """
+
+from .close_positions_conditionally import close_positions_conditionally
+from .monitor_positions import monitor_positions
@@ -0,0 +1,175 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import timedelta
+from queue import Queue, Empty
+from threading import Lock, Thread
+from time import monotonic
+from typing import Callable
+from alpaca.trading.client import TradingClient
+from alpaca.trading.models import Position
+from alpaca.broker.client import BrokerClient
+from alpaca.data.live.stock import StockDataStream
+from alpaca.data.models import Trade
+
+from src.brokerage.alpaca.broker.get_clock import get_clock
+from src.brokerage.alpaca.trading.close_position import close_position
+from src.brokerage.alpaca.trading.get_positions import get_positions
+from src.utils import log
+
+
+def monitor_positions(
+    trading_client: TradingClient,
+    broker_client: BrokerClient,
+    live_stock_client: StockDataStream,
+    take_profit_percentage: float,
+    stop_loss_percentage: float,
+    on_close: Callable[[Position, float, float], None] | None = None,
+    within: timedelta = timedelta(seconds=90),
+    reconcile_interval: timedelta = timedelta(seconds=60),
+    time_scale: float = 1.0,
+) -> list[str]:
+    """Closes open positions which reach a take profit or stop loss threshold, until shortly before market close.
+
+    Positions are held in memory and their movement is re-evaluated on every trade received from the live stock data stream, so that a position is closed as soon as a threshold is crossed. Positions are reconciled with the trading API at a fixed interval, which also picks up positions opened or closed elsewhere and checks thresholds against the prices reported by the API in case the stream has stalled. A position which could not be closed is monitored again from the next reconciliation, so that closing it is retried.
+
+    Args:
+        trading_client (TradingClient): An Alpaca trading client.
+        broker_client (BrokerClient): An Alpaca broker client.
+        live_stock_client (StockDataStream): An Alpaca live stock client. It is run on a background thread and stopped before returning.
+        take_profit_percentage (float): Favourable movement, in percent, at which a position is closed.
+        stop_loss_percentage (float): Adverse movement, in percent, at which a position is closed.
+        on_close (Callable[[Position, float, float], None] | None): Called with each closed position, its movement in percent and the price which crossed the threshold. Defaults to None.
+        within (timedelta): Duration before market close at which monitoring stops. Defaults to 90 seconds.
+        reconcile_interval (timedelta): Interval at which positions are reconciled with the trading API. Defaults to 60 seconds.
+        time_scale (float): Simulated seconds per real second of the clock of the broker client, when replaying recorded market data. Defaults to 1.0.
+
+    Returns:
+        list[str]: The symbols of the positions that were closed.
+    """
+    log.function_call()
+
+    clock = get_clock(broker_client)
+    deadline = (
+        monotonic()
+        + (clock.next_close - within - clock.timestamp).total_seconds() / time_scale
+    )
+    reconcile_seconds = reconcile_interval.total_seconds() / time_scale
+
+    positions: dict[str, Position] = {}
+    positions_lock = Lock()
+    triggered: Queue[tuple[str, float, float]] = Queue()
+    triggered_positions: dict[str, Position] = {}
+    closed_symbols: list[str] = []
+    stream_thread: Thread | None = None
+
+    def get_movement_percentage(position: Position, price: float) -> float:
+        return (
+            100
+            * (price - float(position.avg_entry_price))
+            / float(position.avg_entry_price)
+        )  # the sign of a short position's movement is that of its price
+
+    def check(symbol: str, price: float):  # called with positions_lock held
+        position = positions.get(symbol)
+        if position is None:
+            return
+        movement_percentage = get_movement_percentage(position, price)
+        gone_short = str(position.side) == "PositionSide.SHORT"
+        if (
+            (movement_percentage >= take_profit_percentage and not gone_short)
+            or (-movement_percentage >= take_profit_percentage and gone_short)
+            or (movement_percentage >= stop_loss_percentage and gone_short)
+            or (-movement_percentage >= stop_loss_percentage and not gone_short)
+        ):
+            del positions[symbol]  # closed once, however many trades follow
+            triggered.put((symbol, movement_percentage, price))
+            triggered_positions[symbol] = position
+
+    async def on_trade(trade: Trade):
+        with positions_lock:
+            check(trade.symbol, float(trade.price))
+
+    def reconcile():
+        nonlocal stream_thread
+        current_positions = {
+            position.symbol: position
+            for position in get_positions(client=trading_client)
+        }
+        with positions_lock:
+            added = [
+                e
+                for e in current_positions
+                if e not in positions and e not in triggered_positions
+            ]
+            removed = [
+                e
+                for e in positions
+                if e not in current_positions and e not in triggered_positions
+            ]
+            for symbol in removed:
+                del positions[symbol]
+            for symbol, position in current_positions.items():
+                if symbol in triggered_positions:
+                    continue
+                positions[symbol] = position
+                check(symbol, float(position.current_price))
+
+        if removed:
+            live_stock_client.unsubscribe_trades(*removed)
+        if added:
+            log.info(f"Monitoring trades for {len(added)} positions.")
+            live_stock_client.subscribe_trades(on_trade, *added)
+            if stream_thread is None:
+                stream_thread = Thread(target=live_stock_client.run, daemon=True)
+                stream_thread.start()
+
+    try:
+        reconcile()
+        next_reconcile = monotonic() + reconcile_seconds
+        while (now := monotonic()) < deadline:
+            try:
+                symbol, movement_percentage, price = triggered.get(
+                    timeout=max(0.0, min(next_reconcile, deadline) - now)
+                )
+            except Empty:
+                if monotonic() >= next_reconcile:
+                    reconcile()
+                    next_reconcile = monotonic() + reconcile_seconds
+                continue
+
+            position = triggered_positions[symbol]
+            log.error(
+                f"Closing position on symbol: {symbol} with change: {round(abs(movement_percentage), 2)}%"
+            )
+            if not close_position(
+                client=trading_client,
+                symbol=symbol,
+            ):
+                log.warning(f"Could not close position on symbol: {symbol}. Retrying.")
+                # monitored again from the next reconcile, against the latest price
+                with positions_lock:
+                    del triggered_positions[symbol]
+                continue
+            closed_symbols.append(symbol)
+            if on_close is not None:
+                on_close(position, movement_percentage, price)
+            live_stock_client.unsubscribe_trades(symbol)
+    finally:
+        if stream_thread is not None:
+            live_stock_client.stop()
+            with positions_lock:
+                monitored_symbols = list(positions)
+            if monitored_symbols:
+                try:
+                    live_stock_client.unsubscribe_trades(
+                        *monitored_symbols
+                    )  # the reply wakes the stream, which otherwise stops only once it next receives a message
+                except Exception as e:
+                    log.warning(f"Could not unsubscribe from trades. Error: {e}")
+            stream_thread.join(timeout=10)
+
+    return closed_symbols
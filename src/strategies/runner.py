@@ -4,8 +4,8 @@ Author: Edmund Bennett
 Copyright 2023
 """
 
-from datetime import timedelta
-from time import sleep
+from asyncio import run
+from datetime import datetime, timedelta
 from math import floor
 from statistics import median
 from alpaca.trading.enums import OrderType
@@ -34,6 +34,7 @@ from src.strategies.intraday.common.close_positions_conditionally import (
 )
 from src.brokerage.alpaca.trading.close_position import close_position
 from src.strategies.common.calc_kelly_bet import calc_kelly_bet
+from src.strategies.common.market_session_scheduler import MarketSessionScheduler
 from src.utils import log
 
 
@@ -42,14 +43,18 @@ def runner(
     broker_client: BrokerClient,
     live_stock_client: StockDataStream,
     historical_stock_client: StockHistoricalDataClient,
+    scheduler: MarketSessionScheduler | None = None,
 ):
     """A strategy runner
 
+    Liquid symbols are selected before each market open, orders are placed every trading period and positions are closed shortly before market close, as hooks of a market session scheduler.
+
     Args:
         trading_client (TradingClient): An Alpaca trading client
         broker_client (BrokerClient): An Alpaca broker client
         live_stock_client (StockDataStream): An Alpaca live stock client
         historical_stock_client (StockHistoricalDataClient): An Alpaca historical stock client
+        scheduler (MarketSessionScheduler | None): A scheduler shared with other strategies, to which the hooks are added. If None, the hooks are run on a scheduler of their own indefinitely. Defaults to None.
     """
 
     # declare objects
@@ -69,71 +74,63 @@ def runner(
     drawdown_threshold_percentage = 1
     hurst_threshold = 0.6
 
-    log.info("Entering trading loop.")
+    state = {"symbols": [], "liquid_symbols": []}
 
-    first_run = True
+    def select_liquid_symbols(session: dict[str, datetime]):
+        # get data
 
-    while True:
-        if first_run:
-            # get data
+        symbols = get_assets(
+            trading_client,
+            asset_class="us_equity",
+        )
 
-            symbols = get_assets(
-                trading_client,
-                asset_class="us_equity",
-            )
+        # exclude non-tradable stocks
 
-            clock = get_clock(broker_client)
+        filtered_symbols = []
+        for s in symbols:
+            if s.tradable and s.status:
+                filtered_symbols.append(s)
 
-            # exclude non-tradable stocks
+        # get prices and volumes of last trade
 
-            filtered_symbols = []
-            for s in symbols:
-                if s.tradable and s.status:
-                    filtered_symbols.append(s)
+        last_trade = get_latest_stock_data(
+            historical_stock_client,
+            sorted([s.symbol for s in filtered_symbols]),
+        )
 
-            # get prices and volumes of last trade
+        # filter out low price and illiquid stocks
 
-            last_trade = get_latest_stock_data(
-                historical_stock_client,
-                sorted([s.symbol for s in filtered_symbols]),
-            )
+        liquid_symbols = []
+        for s in filtered_symbols:
+            if s.symbol in last_trade.keys():
+                ask_price = last_trade[s.symbol].ask_price
+                bid_price = last_trade[s.symbol].bid_price
+                if ask_price <= 0:
+                    continue
+                bid_ask_spread = ask_price - bid_price
+                bid_ask_spread_percentage = bid_ask_spread / ask_price * 100
+                mid_price = (ask_price + bid_price) / 2
+                if (
+                    bid_ask_spread_percentage > market_lock_threshold
+                    and bid_ask_spread_percentage < market_illiquidity_threshold
+                    and mid_price > low_price_threshold
+                ):
+                    liquid_symbols.append(s)
 
-            # filter out low price and illiquid stocks
-
-            liquid_symbols = []
-            for s in filtered_symbols:
-                if s.symbol in last_trade.keys():
-                    ask_price = last_trade[s.symbol].ask_price
-                    bid_price = last_trade[s.symbol].bid_price
-                    if ask_price <= 0:
-                        continue
-                    bid_ask_spread = ask_price - bid_price
-                    bid_ask_spread_percentage = bid_ask_spread / ask_price * 100
-                    mid_price = (ask_price + bid_price) / 2
-                    if (
-                        bid_ask_spread_percentage > market_lock_threshold
-                        and bid_ask_spread_percentage < market_illiquidity_threshold
-                        and mid_price > low_price_threshold
-                    ):
-                        liquid_symbols.append(s)
-
-            log.info(
-                f"{len(liquid_symbols)} of {len(symbols)} symbols are considered liquid enough for trading."
-            )
+        log.info(
+            f"{len(liquid_symbols)} of {len(symbols)} symbols are considered liquid enough for trading."
+        )
+
+        state["symbols"] = symbols
+        state["liquid_symbols"] = liquid_symbols
 
-            first_run = False
+    def trade_period(session: dict[str, datetime]):
+        symbols = state["symbols"]
+        liquid_symbols = state["liquid_symbols"]
 
         clock = get_clock(broker_client)
         log.info(f"Current market time: {clock.timestamp}")
 
-        if not clock.is_open and clock.timestamp < clock.next_open:
-            log.info(
-                f"Market does not open until {clock.next_open}. Sleeping until then."
-            )
-            sleep((clock.next_open - clock.timestamp).seconds)
-            first_run = True
-            continue
-
         # filter out stocks with low volume of trade the previous trading day
 
         snapshots = get_snapshots(
@@ -292,21 +289,28 @@ def runner(
                     log.error(f"Could not submit order. Error: {e}")
                     continue
 
-        clock = get_clock(broker_client)
+        log.info("Sleeping until next trading period")
 
-        if clock.is_open:
-            log.info("Sleeping until next trading period")
+    def close_positions(session: dict[str, datetime]):
+        log.info("Market closing soon. Closing positions.")
+        close_positions_conditionally(
+            broker_client=broker_client,
+            trading_client=trading_client,
+            within=rest_period,
+        )
 
-            if clock.timestamp + rest_period > clock.next_close:
-                log.info("Market closing soon. Closing positions.")
-                close_positions_conditionally(
-                    broker_client=broker_client,
-                    trading_client=trading_client,
-                    within=timedelta(minutes=rest_period.seconds // 60),
-                )
+    run_indefinitely = scheduler is None
+    scheduler = scheduler or MarketSessionScheduler(broker_client)
+
+    scheduler.at_pre_open("runner", select_liquid_symbols, before=rest_period)
+    scheduler.every(
+        "runner",
+        trade_period,
+        interval=rest_period,
+        before_close=timedelta(minutes=market_close_cutoff_minutes),
+    )
+    scheduler.at_pre_close("runner", close_positions, before=rest_period)
 
-            minutes_until_next_period = (
-                rest_period.seconds // 60
-            ) - clock.timestamp.minute % (rest_period.seconds // 60)
-            sleep(minutes_until_next_period * 60)
-            continue
+    if run_indefinitely:
+        log.info("Entering trading loop.")
+        run(scheduler.run(sessions=None))
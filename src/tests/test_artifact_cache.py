@@ -0,0 +1,92 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from hashlib import md5, sha256
+from types import SimpleNamespace
+
+from src.cache import ArtifactCache
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.headers = {"ETag": f'"{md5(data).hexdigest()}"'}
+
+    def read(self) -> bytes:
+        return self.data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinioClient:
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects = objects
+        self.downloads: list[str] = []
+
+    def get_object(self, bucket_name: str, object_name: str) -> FakeResponse:
+        self.downloads.append(object_name)
+        return FakeResponse(self.objects[object_name])
+
+    def stat_object(self, bucket_name: str, object_name: str) -> SimpleNamespace:
+        return SimpleNamespace(etag=md5(self.objects[object_name]).hexdigest())
+
+
+def content_addressed(data: bytes) -> str:
+    return f"binary_daily_trend_{sha256(data).hexdigest()}.ubj"
+
+
+def test_artifact_cache(tmp_path):
+    artifacts = [b"a" * 100, b"b" * 100, b"c" * 100]
+    client = FakeMinioClient({content_addressed(e): e for e in artifacts})
+    client.objects["manifest.json"] = b"{}"
+
+    cache = ArtifactCache(client, cache_dir=str(tmp_path), max_size_bytes=250)
+    file_paths = cache.prefetch([content_addressed(e) for e in artifacts[:2]])
+    with open(file_paths[content_addressed(artifacts[0])], "rb") as f:
+        assert f.read() == artifacts[0]
+
+    cache = ArtifactCache(client, cache_dir=str(tmp_path), max_size_bytes=250)
+    cache.get(content_addressed(artifacts[0]))  # served from disk by a new process
+    assert len(client.downloads) == 2
+
+    cache.get(content_addressed(artifacts[2]))  # evicts the least recently used
+    assert set(cache.index) == {
+        content_addressed(e) for e in [artifacts[0], artifacts[2]]
+    }
+
+    cache.get("manifest.json")
+    client.objects["manifest.json"] = b'{"version": 2}'  # replaced objects change ETag
+    with open(cache.get("manifest.json"), "rb") as f:
+        assert f.read() == b'{"version": 2}'
+
+    with open(cache.index[content_addressed(artifacts[0])]["file_path"], "wb") as f:
+        f.write(b"x" * 100)  # corrupted files are downloaded again
+    with open(cache.get(content_addressed(artifacts[0])), "rb") as f:
+        assert f.read() == artifacts[0]
+
+
+def test_artifact_cache_shared(tmp_path):
+    artifacts = [b"a" * 100, b"b" * 100, b"c" * 100]
+    client = FakeMinioClient({content_addressed(e): e for e in artifacts})
+
+    caches = [
+        ArtifactCache(client, cache_dir=str(tmp_path), max_size_bytes=250)
+        for _ in range(2)
+    ]  # as opened by two processes
+    caches[0].get(content_addressed(artifacts[0]))
+    caches[1].get(content_addressed(artifacts[1]))
+
+    cache = ArtifactCache(client, cache_dir=str(tmp_path), max_size_bytes=250)
+    assert set(cache.index) == {content_addressed(e) for e in artifacts[:2]}
+
+    caches[0].get(content_addressed(artifacts[2]))  # evicts the least recently used
+    cache = ArtifactCache(client, cache_dir=str(tmp_path), max_size_bytes=250)
+    assert set(cache.index) == {content_addressed(e) for e in artifacts[1:]}
+    assert len(client.downloads) == 3
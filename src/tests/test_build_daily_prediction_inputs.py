@@ -0,0 +1,104 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from os.path import abspath, join, dirname
+from json import load
+from datetime import timedelta
+import pandas as pd
+
+from src.ml.utils import build_daily_prediction_inputs
+from src.univariate.analysis import calc_macd
+
+
+def load_daily_symbol_data(symbol: str) -> pd.DataFrame:
+    with open(abspath(join(dirname(__file__), "assets/json", "daily_data.json"))) as f:
+        daily_data = pd.DataFrame(load(f)[symbol])
+
+    daily_data["timestamp"] = pd.to_datetime(daily_data["timestamp"]).dt.tz_localize(
+        None
+    )
+    daily_data = daily_data.set_index("timestamp").sort_index()
+    daily_data["date"] = daily_data.index.date
+    daily_data["timestamp"] = daily_data.index.date
+    daily_data = daily_data.rename(
+        columns={"open": "daily_open", "close": "daily_close"}
+    )
+    daily_data["target"] = (
+        (daily_data["daily_close"] > daily_data["daily_open"]).astype(int).shift(-1)
+    )
+    daily_data = daily_data.dropna(subset=["target"])
+
+    _, _, daily_macd_histogram, daily_macd_first_derivative = calc_macd(
+        data=daily_data["daily_close"].to_list(),
+    )
+    daily_data["daily_macd_histogram"] = daily_macd_histogram
+    daily_data["daily_macd_first_derivative"] = daily_macd_first_derivative
+
+    return daily_data
+
+
+def build_daily_prediction_inputs_iteratively(
+    daily_symbol_data: pd.DataFrame,
+) -> pd.DataFrame | None:
+    """Reference implementation using the original row-by-row scan."""
+    prediction_inputs: None | pd.DataFrame = None
+    for date, _ in daily_symbol_data.iterrows():
+        if date.weekday() in [5, 6]:
+            continue
+
+        days_prior = 3 if date.weekday() == 0 else 1
+
+        daily_training_data = daily_symbol_data[
+            daily_symbol_data["date"] == date.date() - timedelta(days=days_prior)
+        ].dropna()
+
+        if daily_training_data.empty:
+            continue
+
+        daily_open = daily_symbol_data[daily_symbol_data["date"] == date.date()].copy()
+        daily_open = daily_open.dropna()
+
+        if daily_open.empty:
+            continue
+
+        prediction_input = daily_training_data.copy()
+        prediction_input["target_date_daily_open"] = daily_open["daily_open"].to_list()
+        prediction_input["target_date_daily_close"] = daily_open[
+            "daily_close"
+        ].to_list()
+
+        if prediction_inputs is None:
+            prediction_inputs = prediction_input
+        else:
+            prediction_inputs = pd.concat([prediction_inputs, prediction_input], axis=0)
+
+    return prediction_inputs
+
+
+def test_build_daily_prediction_inputs():
+    for symbol in ["AAPL", "AMZN"]:
+        daily_symbol_data = load_daily_symbol_data(symbol)
+
+        pd.testing.assert_frame_equal(
+            build_daily_prediction_inputs(daily_symbol_data),
+            build_daily_prediction_inputs_iteratively(daily_symbol_data),
+        )
+
+
+def test_build_daily_prediction_inputs_missing_trading_dates():
+    daily_symbol_data = load_daily_symbol_data("AAPL")
+    daily_symbol_data = daily_symbol_data[
+        daily_symbol_data.index.dayofweek != 4
+    ]  # Fridays are treated as market holidays
+    daily_symbol_data.loc[daily_symbol_data.index[5], "vwap"] = None
+
+    prediction_inputs = build_daily_prediction_inputs(daily_symbol_data)
+
+    pd.testing.assert_frame_equal(
+        prediction_inputs,
+        build_daily_prediction_inputs_iteratively(daily_symbol_data),
+    )
+    assert (prediction_inputs.index.dayofweek != 3).all()
@@ -0,0 +1,93 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.ml.utils import build_latest_daily_features
+from src.univariate.analysis import calc_macd
+
+
+def make_historical_data(n_symbols, n_dates, seed=0):
+    rng = np.random.default_rng(seed)
+    historical_data = pd.DataFrame(
+        {
+            "symbol": np.repeat([f"S{i}" for i in range(n_symbols)], n_dates),
+            "timestamp": np.tile(
+                pd.bdate_range("2024-05-01", periods=n_dates), n_symbols
+            ),
+            "open": rng.normal(loc=100, scale=5, size=n_symbols * n_dates),
+            "close": rng.normal(loc=100, scale=5, size=n_symbols * n_dates),
+            "volume": rng.integers(1000, 10000, size=n_symbols * n_dates),
+            "vwap": rng.normal(loc=100, scale=5, size=n_symbols * n_dates),
+        }
+    )
+    return historical_data.sample(frac=1, random_state=0)  # in any order
+
+
+def test_build_latest_daily_features():
+    historical_data = make_historical_data(n_symbols=5, n_dates=28)
+    historical_data = historical_data[
+        ~(
+            (historical_data["symbol"] == "S1")
+            & (historical_data["timestamp"] > "2024-05-20")
+        )
+    ]  # symbols may have different numbers of dates
+    historical_data = pd.concat(
+        [
+            historical_data,
+            pd.DataFrame(
+                [
+                    {
+                        "symbol": "S5",
+                        "timestamp": pd.Timestamp("2024-06-07"),
+                        "open": 10.0,
+                        "close": 11.0,
+                        "volume": 100,
+                        "vwap": 10.5,
+                    }
+                ]
+            ),
+        ]
+    )
+
+    latest_daily_features = build_latest_daily_features(historical_data)
+
+    assert list(latest_daily_features.index) == [f"S{i}" for i in range(6)]
+    for symbol, symbol_data in historical_data.groupby("symbol"):
+        symbol_data = symbol_data.sort_values("timestamp")
+        _, _, daily_macd_histogram, daily_macd_first_derivative = calc_macd(
+            data=symbol_data["close"].to_list(),
+        )
+        expected = pd.Series(
+            {
+                "daily_open": symbol_data["open"].iloc[-1],
+                "daily_close": symbol_data["close"].iloc[-1],
+                "daily_volume": symbol_data["volume"].iloc[-1],
+                "daily_vwap": symbol_data["vwap"].iloc[-1],
+                "daily_macd_histogram": daily_macd_histogram[-1],
+                "daily_macd_first_derivative": daily_macd_first_derivative[-1],
+            },
+            name=symbol,
+        )
+        pd.testing.assert_series_equal(
+            latest_daily_features.loc[symbol].astype(float), expected.astype(float)
+        )
+
+
+def test_build_latest_daily_features_many_symbols():
+    historical_data = make_historical_data(n_symbols=5000, n_dates=28)
+
+    latest_daily_features = build_latest_daily_features(historical_data)
+
+    assert len(latest_daily_features) == 5000
+
+
+def test_build_latest_daily_features_empty():
+    latest_daily_features = build_latest_daily_features(pd.DataFrame())
+
+    assert latest_daily_features.empty
+    assert "daily_macd_histogram" in latest_daily_features.columns
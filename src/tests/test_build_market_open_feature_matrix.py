@@ -0,0 +1,61 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import date
+import numpy as np
+import pandas as pd
+
+from src.ml.utils import (
+    build_market_open_feature_matrix,
+    build_pooled_features,
+    set_market_open_prices,
+)
+
+
+def test_build_market_open_feature_matrix():
+    daily_features = pd.DataFrame(
+        {
+            "daily_open": [10.0, 20.0, 30.0],
+            "daily_close": [11.0, 19.0, 30.0],
+            "daily_volume": [1_000.0, 500.0, 2_000.0],
+            "daily_vwap": [10.5, 19.5, 30.0],
+            "daily_macd_histogram": [0.1, -0.2, 0.0],
+        },
+        index=["AAA", "BBB", "CCC"],
+    )
+    feature_names = [
+        "daily_open",
+        "daily_close",
+        "daily_macd_histogram",
+        "weekday_tuesday",
+        "target_date_daily_open",
+        "overnight_gap",
+        "liquidity_bucket",
+    ]
+    target_date_daily_open = np.array([11.5, np.nan, 29.0], dtype=np.float32)
+
+    feature_matrix = build_market_open_feature_matrix(
+        daily_features,
+        feature_names=feature_names,
+        target_date=date(2024, 1, 2),
+    )
+
+    assert feature_matrix.dtype == np.float32
+    assert np.isnan(feature_matrix[:, feature_names.index("overnight_gap")]).all()
+
+    set_market_open_prices(
+        feature_matrix,
+        feature_names=feature_names,
+        daily_close=daily_features["daily_close"].to_numpy(dtype=np.float32),
+        target_date_daily_open=target_date_daily_open,
+    )
+
+    expected = build_pooled_features(
+        daily_features.assign(
+            weekday_tuesday=True, target_date_daily_open=target_date_daily_open
+        )
+    )[feature_names].to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(feature_matrix, expected, rtol=1e-6)
@@ -0,0 +1,59 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import pandas as pd
+
+from src.ml.utils import build_pooled_features
+
+
+def test_build_pooled_features():
+    prediction_inputs = pd.DataFrame(
+        {
+            "symbol": ["AAA", "BBB", "CCC", "AAA", "BBB"],
+            "daily_open": [10.0, 100.0, 5.0, 11.0, 110.0],
+            "daily_close": [11.0, 90.0, 5.0, 12.1, 99.0],
+            "daily_volume": [1000, 10, 100, 1000, 10],
+            "daily_vwap": [10.5, 95.0, 5.0, 11.5, 105.0],
+            "daily_macd_histogram": [0.11, -9.0, 0.0, 0.121, -9.9],
+            "target_date_daily_open": [12.1, 81.0, 5.5, 12.1, 99.0],
+        },
+        index=pd.to_datetime(
+            [
+                "2024-08-19 04:00",
+                "2024-08-19 04:00",
+                "2024-08-19 04:00",
+                "2024-08-20 04:00",
+                "2024-08-20 04:00",
+            ]
+        ),
+    )
+
+    pooled_features = build_pooled_features(prediction_inputs, liquidity_buckets=3)
+
+    assert [round(e, 4) for e in pooled_features["daily_return"]] == [
+        0.1,
+        -0.1,
+        0.0,
+        0.1,
+        -0.1,
+    ]
+    assert [round(e, 4) for e in pooled_features["overnight_gap"]] == [
+        0.1,
+        -0.1,
+        0.1,
+        0.0,
+        0.0,
+    ]
+    assert [
+        round(e, 4) for e in pooled_features["normalised_daily_macd_histogram"]
+    ] == [
+        0.01,
+        -0.1,
+        0.0,
+        0.01,
+        -0.1,
+    ]
+    assert pooled_features["liquidity_bucket"].to_list() == [2.0, 1.0, 0.0, 2.0, 1.0]
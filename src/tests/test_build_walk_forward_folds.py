@@ -0,0 +1,34 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.ml.utils import build_walk_forward_folds
+
+
+def test_build_walk_forward_folds():
+    timestamps = pd.DatetimeIndex(
+        np.repeat(pd.bdate_range("2023-01-02", periods=60), 2)
+    )  # two symbols per date
+
+    folds = build_walk_forward_folds(timestamps, n_splits=5, embargo=2)
+
+    assert len(folds) == 5
+    for train_index, test_index in folds:
+        assert train_index[0] == 0
+        assert len(timestamps[train_index[-1] : test_index[0]].unique()) == 3
+        assert timestamps[train_index].max() < timestamps[test_index].min()
+    assert all(folds[i][1][-1] + 1 == folds[i + 1][1][0] for i in range(len(folds) - 1))
+    assert folds[-1][1][-1] == len(timestamps) - 1
+
+
+def test_build_walk_forward_folds_rolling_window():
+    timestamps = pd.bdate_range("2023-01-02", periods=60)
+
+    folds = build_walk_forward_folds(timestamps, n_splits=4, embargo=1, window_size=10)
+
+    assert [len(train_index) for train_index, _ in folds] == [10] * 4
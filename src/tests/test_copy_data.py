@@ -0,0 +1,195 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pandas as pd
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from src.sql import (
+    Base,
+    DatabaseClient,
+    PolygonMarketDataDay,
+    copy_data,
+    get_data,
+)
+
+
+class FakeCursor:
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.rowcount = -1
+
+    def execute(self, query: str):
+        self.connection.statements.append(query)
+        self.rowcount = self.connection.rowcount
+
+    def copy_expert(self, query: str, buffer):
+        self.connection.statements.append(query)
+        self.connection.copied.extend(buffer.getvalue().decode().splitlines())
+
+
+class FakeConnection:
+    def __init__(self, rowcount: int):
+        self.rowcount = rowcount
+        self.statements: list[str] = []
+        self.copied: list[str] = []
+        self.committed = False
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def create_postgresql_client(connection: FakeConnection):
+    return SimpleNamespace(
+        engine=SimpleNamespace(
+            dialect=postgresql.dialect(), raw_connection=lambda: connection
+        )
+    )
+
+
+def create_database_client():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[PolygonMarketDataDay.__table__])
+    return DatabaseClient(
+        engine=engine,
+        SessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    )
+
+
+def create_bars(n_days, close=100.5):
+    return [
+        {
+            "symbol": "AAA",
+            "open": 100.0,
+            "high": 101.0,
+            "low": 99.0,
+            "close": close,
+            "otc": False,
+            "timestamp": datetime(2024, 1, 1) + timedelta(days=i),
+            "transactions": 10,
+            "volume": 1000,
+            "vwap": 100.25,
+            "data_id": uuid4(),
+        }
+        for i in range(n_days)
+    ]
+
+
+def get_closes(database_client):
+    return sorted(
+        e["close"]
+        for e in get_data(
+            database_client,
+            models=[PolygonMarketDataDay],
+            use_cache=False,
+        )
+    )
+
+
+def test_copy_data():
+    database_client = create_database_client()
+
+    assert copy_data(database_client, PolygonMarketDataDay, create_bars(3)) == 3
+    assert (
+        copy_data(database_client, PolygonMarketDataDay, create_bars(5, close=200.0))
+        is None
+    )  # a conflict fails the load
+    assert get_closes(database_client) == [100.5] * 3
+
+    assert (
+        copy_data(
+            database_client,
+            PolygonMarketDataDay,
+            create_bars(5, close=200.0),
+            on_conflict="nothing",
+        )
+        == 2
+    )
+    assert get_closes(database_client) == [100.5] * 3 + [200.0] * 2
+
+    assert (
+        copy_data(
+            database_client,
+            PolygonMarketDataDay,
+            pd.DataFrame(create_bars(4, close=300.0)),
+            on_conflict="update",
+        )
+        == 4
+    )
+    assert get_closes(database_client) == [200.0] + [300.0] * 4
+
+
+def test_copy_data_postgresql():
+    connection = FakeConnection(rowcount=2)
+    bars = create_bars(2)
+    bars.append({**bars[0], "close": 300.0})
+
+    assert (
+        copy_data(
+            create_postgresql_client(connection),
+            PolygonMarketDataDay,
+            bars,
+            on_conflict="update",
+            batch_size=2,
+        )
+        == 2
+    )
+
+    names = "symbol, otc, timestamp, open, high, low, close, transactions, volume, vwap, data_id"
+    create, alter, *copies, insert = connection.statements
+    staging = create.split()[3]
+    assert staging.startswith("polygon_market_data_day_copy_")
+    assert create == (
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {names} FROM polygon_market_data_day WITH NO DATA"
+    )
+    assert alter == f"ALTER TABLE {staging} ADD COLUMN copy_ordinal BIGSERIAL"
+    assert (
+        copies == [f"COPY {staging} ({names}) FROM STDIN WITH (FORMAT csv)"] * 2
+    )  # one per batch
+    assert [e.split(",")[6] for e in connection.copied] == ["100.5", "100.5", "300"]
+    assert insert.startswith(
+        f"INSERT INTO polygon_market_data_day ({names}) "
+        f"SELECT DISTINCT ON (symbol, timestamp) {names} FROM {staging} "
+        "ORDER BY symbol, timestamp, copy_ordinal DESC "
+        "ON CONFLICT (symbol, timestamp) DO UPDATE SET otc = EXCLUDED.otc, "
+    )  # rows are numbered in the order they are copied, so the last one is kept
+    assert connection.committed and connection.closed
+
+
+def test_write_copy_csv():
+    copy_data_module = sys.modules["src.sql.func.copy_data"]
+    columns = [
+        PolygonMarketDataDay.__table__.columns[name]
+        for name in ["symbol", "otc", "timestamp", "transactions", "volume", "data_id"]
+    ]
+
+    daily_data = pd.DataFrame(create_bars(2))
+    daily_data.loc[1, "symbol"] = ""
+    daily_data.loc[1, "transactions"] = None
+    daily_data.loc[1, "volume"] = 1000.75
+    table = copy_data_module._to_arrow(daily_data, columns)
+    buffer = copy_data_module._write_copy_csv(table.to_batches()[0])
+
+    assert buffer.getvalue().decode().splitlines() == [
+        f'"AAA",false,2024-01-01 00:00:00.000000,10,1000,"{daily_data.loc[0, "data_id"]}"',
+        f'"",false,2024-01-02 00:00:00.000000,,1000,"{daily_data.loc[1, "data_id"]}"',
+    ]  # an empty string is quoted and a null is not
@@ -0,0 +1,32 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from sqlalchemy import text
+
+from src.sql import create_sql_client
+
+
+def test_create_sql_client(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'database.db'}"
+
+    database_client = create_sql_client(database_url=database_url, pool_size=2)
+
+    assert create_sql_client(database_url=database_url) is database_client
+    assert (
+        create_sql_client(database_url=f"sqlite:///{tmp_path / 'other.db'}")
+        is not database_client
+    )
+
+    for _ in range(3):
+        with database_client.get_db() as db:
+            db.execute(text("SELECT 1"))
+
+    status = database_client.get_pool_status()
+
+    assert status["size"] == 2
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 3
+    assert status["max_wait_seconds"] <= status["total_wait_seconds"]
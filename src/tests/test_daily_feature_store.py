@@ -0,0 +1,107 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from os.path import abspath, join, dirname
+from json import load
+import pandas as pd
+
+from src.features import read_daily_feature_store, update_daily_feature_store
+from src.ml.utils import (
+    build_daily_trend_features,
+    build_daily_trend_training_data,
+    prepare_daily_data,
+)
+
+
+def load_daily_data() -> list[dict]:
+    with open(abspath(join(dirname(__file__), "assets/json", "daily_data.json"))) as f:
+        daily_data = load(f)
+
+    return [
+        {
+            **{k: v for k, v in e.items() if k != "trade_count"},
+            "timestamp": pd.Timestamp(e["timestamp"]),
+            "transactions": e["trade_count"],
+            "otc": False,
+            "data_id": None,
+        }
+        for symbol in ["AAPL", "AMZN"]
+        for e in daily_data[symbol]
+    ]
+
+
+def test_update_daily_feature_store(tmp_path, monkeypatch):
+    daily_data = load_daily_data()
+    database = [
+        e for e in daily_data if e["timestamp"] < pd.Timestamp("2023-10-30", tz="UTC")
+    ]
+
+    monkeypatch.setattr(
+        sys.modules["src.features.update_daily_feature_store"],
+        "get_dataframe",
+        lambda *args, **kwargs: pd.DataFrame(database),
+    )
+
+    assert update_daily_feature_store(
+        database_client=None,
+        symbols=["AAPL", "AMZN"],
+        store_path=str(tmp_path),
+    ) == ["AAPL", "AMZN"]
+
+    database = daily_data  # the next trading days arrive
+
+    assert update_daily_feature_store(
+        database_client=None,
+        symbols=["AAPL", "AMZN"],
+        store_path=str(tmp_path),
+    ) == ["AAPL", "AMZN"]
+    assert (
+        update_daily_feature_store(
+            database_client=None,
+            symbols=["AAPL", "AMZN"],
+            store_path=str(tmp_path),
+        )
+        == []
+    )
+
+    stored_features = read_daily_feature_store(
+        symbols=["AAPL", "AMZN"],
+        threshold_percentage=0.5,
+        store_path=str(tmp_path),
+    )
+    prepared_data = prepare_daily_data(pd.DataFrame(daily_data))
+
+    columns = [
+        "daily_open",
+        "daily_close",
+        "daily_volume",
+        "daily_macd_histogram",
+        "daily_macd_first_derivative",
+        "weekday_monday",
+        "weekday_friday",
+        "target",
+        "positive_threshold_target",
+        "negative_threshold_target",
+        "target_date_daily_open",
+        "target_date_daily_close",
+    ]
+    for symbol in ["AAPL", "AMZN"]:
+        pd.testing.assert_frame_equal(
+            build_daily_trend_training_data(
+                stored_features[stored_features["symbol"] == symbol]
+            )[columns],
+            build_daily_trend_training_data(
+                build_daily_trend_features(
+                    prepared_data[prepared_data["symbol"] == symbol],
+                    threshold_percentage=0.5,
+                )
+            )[columns],
+        )
+
+
+def test_read_daily_feature_store_missing(tmp_path):
+    assert read_daily_feature_store(store_path=str(tmp_path / "missing")).empty
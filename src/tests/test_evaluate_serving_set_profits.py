@@ -0,0 +1,106 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from json import dumps, loads
+from time import perf_counter
+import numpy as np
+
+from src.ml.analysis import evaluate_serving_set_profits
+
+
+def make_models(n_symbols, serving_set_size=40, seed=0):
+    rng = np.random.default_rng(seed)
+    models = []
+    for i in range(n_symbols):
+        entry_prices = rng.normal(loc=100, scale=5, size=serving_set_size).round(2)
+        exit_prices = rng.normal(loc=100, scale=5, size=serving_set_size).round(2)
+        for threshold_percentage in [0.0, 0.5, -0.5]:
+            models.append(
+                {
+                    "symbols": dumps([f"S{i}"]),
+                    "threshold_percentage": threshold_percentage,
+                    "y_serve_pred": dumps(
+                        rng.integers(0, 2, size=serving_set_size).tolist()
+                    ),
+                    "serving_set_indicated_entry_prices": dumps(entry_prices.tolist()),
+                    "serving_set_indicated_exit_prices": dumps(exit_prices.tolist()),
+                }
+            )
+    return models
+
+
+def evaluate_model(standard_model, positive_threshold_model, negative_threshold_model):
+    long_positions, long_profits, short_positions, short_profits = [], [], [], []
+    for i, (a, b, go_long) in enumerate(
+        zip(
+            loads(standard_model["serving_set_indicated_exit_prices"]),
+            loads(standard_model["serving_set_indicated_entry_prices"]),
+            loads(standard_model["y_serve_pred"]),
+        )
+    ):
+        if (
+            go_long
+            and positive_threshold_model
+            and loads(positive_threshold_model["y_serve_pred"])[i] == 1
+        ):
+            long_positions.append(b)
+            long_profits.append(a - b)
+        elif (
+            not go_long
+            and negative_threshold_model
+            and loads(negative_threshold_model["y_serve_pred"])[i] == 1
+        ):
+            short_positions.append(b)
+            short_profits.append(b - a)
+    return long_positions, long_profits, short_positions, short_profits
+
+
+def test_evaluate_serving_set_profits():
+    models = make_models(n_symbols=20)
+    models = [
+        e
+        for e in models
+        if not (e["symbols"] == '["S3"]' and e["threshold_percentage"] < 0)
+    ]  # some symbols only have one threshold model
+    models = [
+        e for e in models if e["symbols"] != '["S4"]' or e["threshold_percentage"] == 0
+    ]
+    models[0]["serving_set_indicated_exit_prices"] = "null"
+
+    combined_profits = evaluate_serving_set_profits(models)
+
+    assert [e["symbols"] for e in combined_profits] == [
+        dumps([f"S{i}"]) for i in range(20) if i != 4
+    ]  # symbols without threshold models are not evaluated
+    assert combined_profits[0]["long_positions"] == []
+    assert combined_profits[0]["short_positions"] == []
+
+    by_symbols = {}
+    for model in models:
+        by_symbols.setdefault(model["symbols"], {})[
+            np.sign(model["threshold_percentage"])
+        ] = model
+    for result in combined_profits[1:]:
+        symbol_models = by_symbols[result["symbols"]]
+        long_positions, long_profits, short_positions, short_profits = evaluate_model(
+            symbol_models[0], symbol_models.get(1), symbol_models.get(-1)
+        )
+        assert result["number_long_positions"] == len(long_positions)
+        assert result["number_short_positions"] == len(short_positions)
+        assert result["long_positions"] == long_positions
+        assert np.allclose(result["long_profits"], long_profits)
+        assert result["short_positions"] == short_positions
+        assert np.allclose(result["short_profits"], short_profits)
+
+
+def test_evaluate_serving_set_profits_many_models():
+    models = make_models(n_symbols=10000)
+
+    started = perf_counter()
+    combined_profits = evaluate_serving_set_profits(models)
+
+    assert perf_counter() - started < 1
+    assert len(combined_profits) == 10000
@@ -0,0 +1,147 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from datetime import datetime, timedelta
+from io import BytesIO
+from uuid import uuid4
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.sql import (
+    Base,
+    DatabaseClient,
+    PolygonMarketDataDay,
+    get_data,
+    get_dataframe,
+    insert_data,
+    stream_data,
+)
+
+
+def create_database_client(n_rows):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[PolygonMarketDataDay.__table__])
+    database_client = DatabaseClient(
+        engine=engine,
+        SessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    )
+    insert_data(
+        database_client=database_client,
+        documents=[
+            PolygonMarketDataDay(
+                symbol=["AAA", "BBB"][i % 2],
+                otc=i % 3 == 0,
+                timestamp=datetime(2024, 1, 1) + timedelta(days=i // 2),
+                open=100.0 + i,
+                high=101.0 + i,
+                low=99.0 + i,
+                close=100.5 + i,
+                transactions=i if i % 5 else None,
+                volume=1000 * i,
+                vwap=100.25 + i,
+                data_id=uuid4(),
+            )
+            for i in range(n_rows)
+        ],
+    )
+    return database_client
+
+
+def test_get_dataframe():
+    database_client = create_database_client(n_rows=250)
+
+    daily_data = get_dataframe(
+        database_client,
+        models=[PolygonMarketDataDay],
+        where_clause=PolygonMarketDataDay.symbol.in_(["AAA"]),
+        batch_size=50,
+    )
+    expected = pd.DataFrame(
+        get_data(
+            database_client,
+            models=[PolygonMarketDataDay],
+            where_clause=PolygonMarketDataDay.symbol.in_(["AAA"]),
+            use_cache=False,
+        )
+    )
+
+    assert len(daily_data) == 125
+    assert list(daily_data.columns) == list(expected.columns)
+    daily_data = daily_data.sort_values("timestamp", ignore_index=True)
+    expected = expected.sort_values("timestamp", ignore_index=True)
+    pd.testing.assert_frame_equal(
+        daily_data.drop(columns=["data_id"]),
+        expected.drop(columns=["data_id"]),
+        check_dtype=False,
+    )
+    assert daily_data["data_id"].tolist() == [str(e) for e in expected["data_id"]]
+
+
+def test_stream_data():
+    database_client = create_database_client(n_rows=250)
+
+    batches = list(
+        stream_data(
+            database_client,
+            models=[PolygonMarketDataDay],
+            where_clause=PolygonMarketDataDay.symbol.in_(["AAA", "BBB"]),
+            batch_size=100,
+        )
+    )
+
+    assert [len(e) for e in batches] == [100, 100, 50]
+    assert sorted(e["open"] for batch in batches for e in batch) == [
+        100.0 + i for i in range(250)
+    ]
+
+    batches = list(
+        stream_data(
+            database_client,
+            models=None,
+            entities=[PolygonMarketDataDay.symbol, PolygonMarketDataDay.close],
+            batch_size=200,
+        )
+    )
+
+    assert [len(e) for e in batches] == [200, 50]
+    assert set(batches[0][0]) == {"symbol", "close"}
+
+
+def test_read_copy_csv():
+    read_copy_csv = sys.modules["src.sql.func.get_dataframe"]._read_copy_csv
+
+    table = read_copy_csv(
+        BytesIO(
+            b"symbol,otc,timestamp,open,transactions,data_id\n"
+            b'AAA,t,2024-01-02 00:00:00,1.5,,""\n'
+            b"BBB,f,2024-01-03 00:00:00,2.5,3,7f2c7c6e-0b4f-4bd5-9c2b-2b0c6a8d6f43\n"
+        ),
+        [
+            PolygonMarketDataDay.__table__.columns[name]
+            for name in [
+                "symbol",
+                "otc",
+                "timestamp",
+                "open",
+                "transactions",
+                "data_id",
+            ]
+        ],
+    )
+    daily_data = table.to_pandas()
+
+    assert daily_data["otc"].tolist() == [True, False]
+    assert daily_data["timestamp"].tolist() == [
+        pd.Timestamp("2024-01-02"),
+        pd.Timestamp("2024-01-03"),
+    ]
+    assert daily_data["transactions"].isna().tolist() == [True, False]
+    assert daily_data["data_id"].tolist() == [
+        "",
+        "7f2c7c6e-0b4f-4bd5-9c2b-2b0c6a8d6f43",
+    ]  # an empty string is quoted and a null is not
@@ -0,0 +1,63 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import run
+from datetime import datetime
+from polygon.rest.models import Agg, TickerSnapshot
+
+from src.brokerage.polygon import get_market_open_bars
+
+
+class FakePolygonClient:
+    def __init__(self):
+        self.attempts: dict[str, int] = {}
+
+    def get_aggs(self, ticker: str, **kwargs) -> list[Agg]:
+        self.attempts[ticker] = self.attempts.get(ticker, 0) + 1
+        if ticker == "FLAKY" and self.attempts[ticker] < 3:
+            raise ConnectionError("Connection reset")
+        if ticker == "QUIET":
+            return []
+        return [
+            Agg(
+                open=10.0,
+                high=11.0,
+                low=9.0,
+                close=10.5,
+                volume=100.0,
+                vwap=10.2,
+                timestamp=1_704_205_800_000,
+                transactions=5,
+                otc=None,
+            )
+        ]
+
+    def get_snapshot_all(self, market_type: str, tickers: list[str]):
+        return [
+            TickerSnapshot(ticker=ticker, day=Agg(open=20.0, close=21.0))
+            for ticker in tickers
+        ]
+
+
+def test_get_market_open_bars():
+    client = FakePolygonClient()
+    market_open_time = datetime(2024, 1, 2, 14, 30)
+
+    market_open_bars = run(
+        get_market_open_bars(
+            client=client,
+            symbols=["AAPL", "FLAKY", "QUIET"],
+            market_open_time=market_open_time,
+            max_concurrency=2,
+            backoff_seconds=0.0,
+        )
+    )
+
+    assert set(market_open_bars) == {"AAPL", "FLAKY", "QUIET"}
+    assert client.attempts["FLAKY"] == 3
+    assert market_open_bars["AAPL"][0]["open"] == 10.0
+    assert market_open_bars["QUIET"][0]["open"] == 20.0
+    assert market_open_bars["QUIET"][0]["timestamp"] == market_open_time
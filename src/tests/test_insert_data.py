@@ -0,0 +1,66 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.sql import (
+    Base,
+    DatabaseClient,
+    PolygonMarketDataDay,
+    get_data,
+)
+
+
+def create_database_client():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[PolygonMarketDataDay.__table__])
+    return DatabaseClient(
+        engine=engine,
+        SessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    )
+
+
+def create_bars(closes):
+    return [
+        PolygonMarketDataDay(
+            symbol="AAA",
+            open=100.0,
+            high=101.0,
+            low=99.0,
+            close=close,
+            otc=False,
+            timestamp=datetime(2024, 1, 1) + timedelta(days=i),
+            transactions=10,
+            volume=1000,
+            vwap=100.25,
+            data_id=uuid4(),
+        )
+        for i, close in enumerate(closes)
+    ]
+
+
+def test_copy_documents_fallback(monkeypatch):
+    insert_data_module = sys.modules["src.sql.func.insert_data"]
+    monkeypatch.setattr(
+        insert_data_module, "copy_data", lambda *args, **kwargs: None
+    )  # as when a row violates a constraint other than the primary key
+    database_client = create_database_client()
+
+    assert not insert_data_module._copy_documents(
+        database_client, create_bars([100.5, None, 101.5]), upsert=False
+    )
+
+    closes = [
+        e["close"]
+        for e in get_data(
+            database_client, models=[PolygonMarketDataDay], use_cache=False
+        )
+    ]
+    assert sorted(closes) == [100.5, 101.5]  # the document which fails is skipped
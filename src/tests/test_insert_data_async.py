@@ -0,0 +1,93 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import gather, run
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.sql import (
+    Base,
+    PolygonMarketDataDay,
+    create_async_sql_client,
+    get_data_async,
+    insert_data_async,
+)
+
+
+def create_bars(symbol, n_days, close=100.5):
+    return [
+        PolygonMarketDataDay(
+            symbol=symbol,
+            open=100.0,
+            high=101.0,
+            low=99.0,
+            close=close,
+            otc=False,
+            timestamp=datetime(2024, 1, 1) + timedelta(days=i),
+            transactions=10,
+            volume=1000,
+            vwap=100.25,
+            data_id=uuid4(),
+        )
+        for i in range(n_days)
+    ]
+
+
+async def insert_and_get(database_url):
+    database_client = create_async_sql_client(database_url=database_url)
+    async with database_client.engine.begin() as connection:
+        await connection.run_sync(
+            Base.metadata.create_all, tables=[PolygonMarketDataDay.__table__]
+        )
+
+    try:
+        assert await gather(
+            insert_data_async(database_client, create_bars("AAA", 3)),
+            insert_data_async(database_client, create_bars("BBB", 2)),
+        ) == [True, True]
+        assert not await insert_data_async(
+            database_client,
+            create_bars("AAA", 5, close=200.0),
+            allow_partial_inserts=True,
+        )  # three of the bars are already stored
+        assert await insert_data_async(
+            database_client,
+            create_bars("BBB", 2, close=300.0),
+            upsert=True,
+        )
+        assert await insert_data_async(
+            database_client,
+            create_bars("CCC", 1, close=400.0) + create_bars("CCC", 1, close=500.0),
+            upsert=True,
+        )  # the last of two documents with one primary key is written
+
+        return await get_data_async(
+            database_client,
+            models=[PolygonMarketDataDay],
+            where_clause=PolygonMarketDataDay.close > 100.5,
+        ), await get_data_async(
+            database_client,
+            models=None,
+            entities=[PolygonMarketDataDay.symbol, PolygonMarketDataDay.close],
+        )
+    finally:
+        await database_client.dispose()
+
+
+def test_insert_data_async(tmp_path):
+    changed_bars, closes = run(
+        insert_and_get(f"sqlite+aiosqlite:///{tmp_path / 'database.db'}")
+    )
+
+    assert sorted((e["symbol"], e["close"]) for e in changed_bars) == [
+        ("AAA", 200.0),
+        ("AAA", 200.0),
+        ("BBB", 300.0),
+        ("BBB", 300.0),
+        ("CCC", 500.0),
+    ]
+    assert len(closes) == 8
+    assert set(closes[0]) == {"symbol", "close"}
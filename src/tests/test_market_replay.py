@@ -0,0 +1,192 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import datetime, timedelta
+from json import dump
+from time import monotonic
+from uuid import uuid4
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from run_binary_models import run_binary_models
+from src.backtesting.replay import MarketReplay
+from src.backtesting.replay.replay_broker_client import MARKET_TIMEZONE
+from src.sql import get_data, Transactions
+
+
+FEATURES = [
+    "daily_open",
+    "daily_close",
+    "daily_macd_histogram",
+    "target_date_daily_open",
+]
+
+
+def write_recording(recording_path):
+    rng = np.random.default_rng(0)
+
+    training_data = pd.DataFrame(
+        rng.normal(loc=100, scale=5, size=(500, len(FEATURES))), columns=FEATURES
+    )
+    targets = (
+        training_data["target_date_daily_open"] > training_data["daily_close"]
+    ).astype(
+        int
+    )  # the models predict a rise on a gap up and a fall on a gap down
+    (recording_path / "artifacts").mkdir(parents=True)
+    xgb.XGBClassifier(n_estimators=10, max_depth=2).fit(
+        training_data, targets
+    ).get_booster().save_model(str(recording_path / "artifacts" / "model.ubj"))
+
+    start = datetime(2024, 6, 4, 9, tzinfo=MARKET_TIMEZONE)
+    market_open = start.replace(hour=9, minute=30)
+    trained = (start - timedelta(hours=12)).replace(tzinfo=None)
+
+    daily_bars = []
+    for symbol in ["AAA", "BBB"]:
+        for timestamp in pd.bdate_range(end="2024-05-31", periods=60):
+            daily_bars.append(
+                {
+                    "symbol": symbol,
+                    "timestamp": (timestamp + timedelta(hours=4)).isoformat(),
+                    "open": 100.0,
+                    "high": 101.0,
+                    "low": 99.0,
+                    "close": 100.0,
+                    "volume": 1000,
+                    "vwap": 100.0,
+                    "data_id": str(uuid4()),
+                }
+            )
+
+    open_prices = {"AAA": 110.0, "BBB": 90.0}
+    trades = [
+        {
+            "timestamp": (market_open + timedelta(minutes=minutes)).isoformat(),
+            "symbol": symbol,
+            "price": (
+                open_prices[symbol] * 1.15
+                if symbol == "AAA" and minutes >= 210
+                else open_prices[symbol]
+            ),  # AAA rises enough to take profit at 13:00
+        }
+        for minutes in range(0, 390, 5)
+        for symbol in open_prices
+    ]
+
+    recording = {
+        "start": start.isoformat(),
+        "calendar": [
+            {"date": "2024-05-31", "open": "09:30", "close": "16:00"},
+            {"date": "2024-06-03", "open": "09:30", "close": "16:00"},
+            {"date": "2024-06-04", "open": "09:30", "close": "16:00"},
+            {"date": "2024-06-05", "open": "09:30", "close": "16:00"},
+        ],
+        "cash": 10000.0,
+        "assets": [{"symbol": "AAA"}, {"symbol": "BBB"}],
+        "models": [
+            {
+                "model_id": str(uuid4()),
+                "model_url": "model.ubj",
+                "booster_url": "model.ubj",
+                "symbols": f'["{symbol}"]',
+                "symbol": symbol,
+                "features": "[]",
+                "confusion_matrix": "",
+                "classification_report": "",
+                "training_set_rows": 500,
+                "training_data_url": "",
+                "training_targets_url": "",
+                "test_set_rows": 100,
+                "test_data_url": "",
+                "test_targets_url": "",
+                "serving_set_rows": 40,
+                "serving_data_url": "",
+                "serving_targets_url": "",
+                "accuracy": 0.9,
+                "balanced_accuracy": 0.9,
+                "precision": 0.9,
+                "y_serve": "[]",
+                "y_serve_pred": "[]",
+                "serving_set_indicated_entry_prices": "[100.0]",
+                "serving_set_indicated_exit_prices": "[100.0]",
+                "first_entry_price": 100.0,
+                "last_modified_at": trained.isoformat(),
+                "created_at": trained.isoformat(),
+                "threshold_percentage": threshold_percentage,
+            }
+            for symbol in ["AAA", "BBB"]
+            for threshold_percentage in [0.0, 1.5, -1.5]
+        ],
+        "daily_bars": daily_bars,
+        "open_bars": {
+            symbol: [
+                {
+                    "open": price,
+                    "high": price,
+                    "low": price,
+                    "close": price,
+                    "volume": 100,
+                    "vwap": price,
+                    "timestamp": int(market_open.timestamp() * 1000),
+                }
+            ]
+            for symbol, price in open_prices.items()
+        },
+        "trades": trades,
+    }
+
+    with open(recording_path / "recording.json", "w") as f:
+        dump(recording, f)
+
+
+def test_market_replay(tmp_path, monkeypatch):
+    monkeypatch.setenv("MODEL_ARTIFACT_CACHE_PATH", str(tmp_path / "cache"))
+    monkeypatch.setenv("TRANSACTION_JOURNAL_PATH", str(tmp_path / "transactions.wal"))
+    monkeypatch.setenv("DAILY_FEATURE_STORE_PATH", str(tmp_path / "features"))
+
+    write_recording(tmp_path / "recording")
+
+    speed = 20000.0
+    replay = MarketReplay(str(tmp_path / "recording"), speed=speed)
+    replay.start()
+
+    started = monotonic()
+    try:
+        run_binary_models(
+            alpaca_trading_client=replay.trading_client,
+            alpaca_broker_client=replay.broker_client,
+            database_client=replay.database_client,
+            minio_client=replay.minio_client,
+            polygon_client=replay.polygon_client,
+            live_stock_client=replay.live_stock_client,
+            now=replay.clock.now().astimezone(MARKET_TIMEZONE).replace(tzinfo=None),
+            sleep=replay.clock.sleep,
+            current_time=replay.clock.now,
+            time_scale=speed,
+        )
+    finally:
+        replay.stop()
+
+    assert monotonic() - started < 10  # a full trading day takes seven hours live
+
+    transactions = {
+        e["ticker"]: e
+        for e in get_data(
+            database_client=replay.database_client,
+            models=[Transactions],
+            use_cache=False,
+        )
+    }
+    assert sorted(transactions) == ["AAA", "BBB"]
+    assert transactions["AAA"]["side"] == "long"
+    assert transactions["BBB"]["side"] == "short"
+    assert transactions["AAA"]["accepted_timestamp"] < datetime(
+        2024, 6, 4, 15
+    )  # the take profit is triggered by the trade stream, not at the close
+    assert replay.trading_client.positions == {}
+    assert replay.trading_client.cash > 10000.0
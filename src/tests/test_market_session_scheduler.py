@@ -0,0 +1,150 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from asyncio import run
+from datetime import datetime, timedelta
+from threading import current_thread
+from alpaca.trading.models import Calendar
+
+from src.backtesting.replay import ReplayBrokerClient, SimulatedClock
+from src.backtesting.replay.replay_broker_client import MARKET_TIMEZONE
+from src.brokerage.alpaca.broker import CachedBrokerClient
+from src.strategies.common import MarketSessionScheduler
+
+
+SPEED = 36000.0
+
+CALENDAR = [
+    Calendar(date="2024-06-03", open="09:30", close="16:00"),
+    Calendar(date="2024-06-04", open="09:30", close="16:00"),
+]
+
+
+class CountingBrokerClient(ReplayBrokerClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.clock_requests = 0
+
+    def get_clock(self):
+        self.clock_requests += 1
+        return super().get_clock()
+
+
+def create_clients(start: datetime):
+    clock = SimulatedClock(start=start, speed=SPEED)
+    replay_broker_client = CountingBrokerClient(clock=clock, calendar=CALENDAR)
+    broker_client = CachedBrokerClient(
+        replay_broker_client, clock_ttl=timedelta(hours=1), time_scale=SPEED
+    )
+    return replay_broker_client, broker_client
+
+
+def test_market_session_scheduler():
+    replay_broker_client, broker_client = create_clients(
+        datetime(2024, 6, 3, 9, tzinfo=MARKET_TIMEZONE)
+    )
+    calls = []
+
+    def record(name):
+        def hook(session):
+            calls.append((name, broker_client.get_clock().timestamp))
+            if name == "failing":
+                raise ValueError("hooks may fail")
+
+        return hook
+
+    async def async_hook(session):
+        calls.append(("async", broker_client.get_clock().timestamp))
+
+    scheduler = MarketSessionScheduler(broker_client, time_scale=SPEED)
+    scheduler.at_pre_open("first", record("pre_open"), before=timedelta(minutes=15))
+    scheduler.at_open("first", record("failing"), after=timedelta(minutes=15))
+    scheduler.every(
+        "second",
+        record("interval"),
+        interval=timedelta(hours=2),
+        before_close=timedelta(minutes=30),
+    )
+    scheduler.at_pre_close("second", async_hook, before=timedelta(minutes=15))
+
+    run(scheduler.run(sessions=1))
+
+    tolerance = timedelta(minutes=5)
+    expected = [
+        ("pre_open", datetime(2024, 6, 3, 9, 15, tzinfo=MARKET_TIMEZONE)),
+        ("interval", datetime(2024, 6, 3, 9, 30, tzinfo=MARKET_TIMEZONE)),
+        ("failing", datetime(2024, 6, 3, 9, 45, tzinfo=MARKET_TIMEZONE)),
+        ("interval", datetime(2024, 6, 3, 11, 30, tzinfo=MARKET_TIMEZONE)),
+        ("interval", datetime(2024, 6, 3, 13, 30, tzinfo=MARKET_TIMEZONE)),
+        ("async", datetime(2024, 6, 3, 15, 45, tzinfo=MARKET_TIMEZONE)),
+    ]  # an interval hook is not called within 30 minutes of the close
+    assert [name for name, _ in calls] == [name for name, _ in expected]
+    for (_, timestamp), (_, expected_timestamp) in zip(calls, expected):
+        assert expected_timestamp <= timestamp < expected_timestamp + tolerance
+
+    assert broker_client.get_clock().timestamp >= datetime(
+        2024, 6, 3, 16, tzinfo=MARKET_TIMEZONE
+    )  # the session is run until the close
+    assert replay_broker_client.clock_requests < 10  # the clock is shared
+
+
+def test_market_session_scheduler_during_session():
+    _, broker_client = create_clients(datetime(2024, 6, 3, 12, tzinfo=MARKET_TIMEZONE))
+    calls = []
+
+    scheduler = MarketSessionScheduler(broker_client, time_scale=SPEED)
+    scheduler.at_pre_open("first", lambda session: calls.append("pre_open"))
+    scheduler.every(
+        "first",
+        lambda session: calls.append("interval"),
+        interval=timedelta(hours=1),
+    )
+
+    run(scheduler.run_session(run(scheduler.get_session())))
+
+    assert calls == [
+        "pre_open",
+        "interval",
+        "interval",
+        "interval",
+        "interval",
+    ]  # interval hooks which were missed are not caught up on
+
+
+def test_market_session_scheduler_dedicated_thread():
+    _, broker_client = create_clients(datetime(2024, 6, 3, 12, tzinfo=MARKET_TIMEZONE))
+    threads = []
+
+    scheduler = MarketSessionScheduler(broker_client, time_scale=SPEED)
+    scheduler.at_open(
+        "first",
+        lambda session: threads.append(current_thread().name),
+        dedicated_thread=True,
+    )
+    scheduler.at_pre_close(
+        "second", lambda session: threads.append(current_thread().name)
+    )
+
+    run(scheduler.run_session(run(scheduler.get_session())))
+
+    assert threads[0] == "first-hook"
+    assert threads[1].startswith("asyncio")  # the worker threads of the event loop
+
+
+def test_cached_broker_client():
+    replay_broker_client, broker_client = create_clients(
+        datetime(2024, 6, 3, 9, 29, tzinfo=MARKET_TIMEZONE)
+    )
+
+    assert not broker_client.get_clock().is_open
+    assert not broker_client.get_clock().is_open
+    assert replay_broker_client.clock_requests == 1
+
+    replay_broker_client.clock.sleep(120)  # past the open
+
+    assert broker_client.get_clock().is_open
+    assert replay_broker_client.clock_requests == 2
+    assert broker_client.get_calendar() is broker_client.get_calendar()
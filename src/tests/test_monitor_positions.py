@@ -0,0 +1,134 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from datetime import datetime, timedelta, timezone
+from threading import Thread
+from time import monotonic
+from types import SimpleNamespace
+from alpaca.data.live.stock import StockDataStream
+
+from src.brokerage.alpaca.utils import FakeStockDataStream
+from src.strategies.intraday.common import monitor_positions
+
+
+class FakeTradingClient:
+    def __init__(self, positions: list[SimpleNamespace], failures: int = 0):
+        self.positions = {e.symbol: e for e in positions}
+        self.closed: dict[str, float] = {}
+        self.failures = failures
+        self.close_requests = 0
+
+    def get_all_positions(self) -> list[SimpleNamespace]:
+        return list(self.positions.values())
+
+    def close_position(self, symbol_or_asset_id: str):
+        self.close_requests += 1
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("position not closed")
+        self.closed[symbol_or_asset_id] = monotonic()
+        del self.positions[symbol_or_asset_id]
+
+
+class FakeBrokerClient:
+    def __init__(self, duration: timedelta):
+        self.timestamp = datetime.now(tz=timezone.utc)
+        self.duration = duration
+
+    def get_clock(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            timestamp=self.timestamp,
+            next_close=self.timestamp + self.duration,
+            is_open=True,
+        )
+
+
+def test_monitor_positions():
+    server = FakeStockDataStream()
+    url = server.start()
+
+    trading_client = FakeTradingClient(
+        [
+            SimpleNamespace(
+                symbol=symbol,
+                side=side,
+                avg_entry_price="100.0",
+                current_price="100.0",
+            )
+            for symbol, side in [
+                ("LONG", "PositionSide.LONG"),
+                ("SHORT", "PositionSide.SHORT"),
+                ("FLAT", "PositionSide.LONG"),
+            ]
+        ]
+    )
+    closed: list[tuple[str, float, float]] = []
+
+    monitor = Thread(
+        target=monitor_positions,
+        kwargs={
+            "trading_client": trading_client,
+            "broker_client": FakeBrokerClient(duration=timedelta(seconds=1)),
+            "live_stock_client": StockDataStream("key", "secret", url_override=url),
+            "take_profit_percentage": 12.0,
+            "stop_loss_percentage": 6.0,
+            "on_close": lambda position, movement_percentage, price: closed.append(
+                (position.symbol, movement_percentage, price)
+            ),
+            "within": timedelta(seconds=0),
+        },
+    )
+    monitor.start()
+    assert server.subscribed.wait(timeout=5)
+
+    published_at = monotonic()
+    server.publish_trade("LONG", 113.0)  # take profit
+    server.publish_trade("SHORT", 107.0)  # stop loss
+    server.publish_trade("FLAT", 101.0)
+
+    monitor.join(timeout=10)
+    server.stop()
+
+    assert sorted(closed) == [("LONG", 13.0, 113.0), ("SHORT", 7.0, 107.0)]
+    assert set(trading_client.positions) == {"FLAT"}
+    assert max(trading_client.closed.values()) - published_at < 1.0
+
+
+def test_monitor_positions_failed_close():
+    server = FakeStockDataStream()
+    url = server.start()
+
+    trading_client = FakeTradingClient(
+        [
+            SimpleNamespace(
+                symbol=symbol,
+                side="PositionSide.LONG",
+                avg_entry_price="100.0",
+                current_price=current_price,
+            )
+            for symbol, current_price in [("LONG", "113.0"), ("FLAT", "101.0")]
+        ],
+        failures=1,
+    )
+    closed: list[tuple[str, float, float]] = []
+
+    monitor_positions(
+        trading_client=trading_client,
+        broker_client=FakeBrokerClient(duration=timedelta(seconds=1)),
+        live_stock_client=StockDataStream("key", "secret", url_override=url),
+        take_profit_percentage=12.0,
+        stop_loss_percentage=6.0,
+        on_close=lambda position, movement_percentage, price: closed.append(
+            (position.symbol, movement_percentage, price)
+        ),
+        within=timedelta(seconds=0),
+        reconcile_interval=timedelta(seconds=0.1),
+    )
+    server.stop()
+
+    assert trading_client.close_requests == 2  # retried once the first fails
+    assert closed == [("LONG", 13.0, 113.0)]  # and recorded only once closed
+    assert set(trading_client.positions) == {"FLAT"}
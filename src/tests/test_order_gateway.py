@@ -0,0 +1,81 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from threading import Barrier, Lock
+from types import SimpleNamespace
+from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
+import pytest
+
+from src.brokerage.alpaca.trading import OrderGateway
+from src.brokerage.alpaca.utils import RateLimiter
+
+
+class FakeTradingClient:
+    def __init__(self, concurrency: int):
+        self.barrier = Barrier(concurrency, timeout=10)
+        self.orders: list[SimpleNamespace] = []
+        self.closed: list[str] = []
+        self.lock = Lock()
+
+    def submit_order(self, order_data) -> SimpleNamespace:
+        self.barrier.wait()  # broken unless concurrency orders are in flight at once
+        order = SimpleNamespace(symbol=order_data.symbol, status="accepted")
+        with self.lock:
+            self.orders.append(order)
+        return order
+
+    def close_position(self, symbol_or_asset_id: str):
+        with self.lock:
+            self.closed.append(symbol_or_asset_id)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def test_order_gateway():
+    client = FakeTradingClient(concurrency=8)
+    symbols = [f"S{i}" for i in range(200)]
+
+    with OrderGateway(client, max_requests_per_minute=200) as gateway:
+        futures = {
+            symbol: gateway.submit_order(
+                symbol=symbol,
+                quantity=1,
+                side=OrderSide.BUY,
+                order_type=OrderType.LIMIT,
+                time_in_force=TimeInForce.DAY,
+                limit_price=10.0,
+            )
+            for symbol in symbols
+        }
+        orders = {symbol: future.result() for symbol, future in futures.items()}
+
+    assert [orders[symbol].symbol for symbol in symbols] == symbols
+    assert len(client.orders) == len(symbols)
+
+
+def test_rate_limiter():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        rate_per_second=20, capacity=5, clock=clock, sleep=clock.sleep
+    )
+
+    acquired_at = []
+    for _ in range(10):
+        limiter.acquire()
+        acquired_at.append(clock())
+
+    assert acquired_at == pytest.approx(
+        [0.0] * 5 + [0.05, 0.1, 0.15, 0.2, 0.25]
+    )  # a burst of 5, then 5 at 20 per second
@@ -0,0 +1,43 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+import pandas as pd
+
+from src.ml.models import predict_binary_daily_trend
+
+
+def train_symbol(symbol, **kwargs):
+    if symbol == "BAD":
+        raise ValueError("training failed")
+    return symbol
+
+
+def test_predict_binary_daily_trend_failed_symbol(monkeypatch):
+    predict_module = sys.modules["src.ml.models.predict_binary_daily_trend"]
+    monkeypatch.setattr(
+        predict_module, "_train_symbol_binary_daily_trend_models", train_symbol
+    )
+    monkeypatch.setattr(
+        predict_module,
+        "record_binary_daily_trend_models",
+        lambda name, **kwargs: [f"{name}_model"],
+    )
+
+    for workers in [1, 2]:
+        model_ids = predict_binary_daily_trend(
+            minio_client=None,
+            database_client=None,
+            daily_data=pd.DataFrame({"symbol": ["AAA", "BAD", "CCC"]}),
+            serving_set_size=10,
+            workers=workers,
+            daily_features=True,
+        )
+
+        assert sorted(model_ids) == [
+            "AAA_model",
+            "CCC_model",
+        ]  # the models of the other symbols are recorded
@@ -0,0 +1,57 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from uuid import uuid4
+import pandas as pd
+import xgboost as xgb
+
+from src.ml.models import record_binary_daily_trend_models
+
+
+def test_record_binary_daily_trend_models_failed_upload(monkeypatch):
+    record_module = sys.modules["src.ml.models.record_binary_daily_trend_models"]
+    uploads = []
+
+    def upload_objects(minio_client, bucket_name, objects):
+        uploads.append(set(objects))
+        return sorted(objects)[1:]  # one artifact always fails
+
+    def insert_data(**kwargs):
+        raise AssertionError("no metadata is inserted")
+
+    monkeypatch.setattr(record_module, "upload_objects", upload_objects)
+    monkeypatch.setattr(record_module, "insert_data", insert_data)
+
+    data = pd.DataFrame({"x": [0.0, 1.0, 2.0, 3.0]})
+    targets = pd.Series([0, 1, 0, 1])
+    model = xgb.XGBClassifier(n_estimators=2).fit(data, targets)
+    payloads = tuple(
+        {
+            "model_id": str(uuid4()),
+            "model": model,
+            "training_data": data,
+            "training_targets": targets,
+            "test_data": data,
+            "test_targets": targets,
+            "serving_data": data,
+            "serving_targets": targets,
+            "threshold_percentage": threshold_percentage,
+        }
+        for threshold_percentage in [0.0, 1.5, -1.5]
+    )
+
+    assert (
+        record_binary_daily_trend_models(
+            minio_client=None,
+            database_client=None,
+            name="AAA",
+            payloads=payloads,
+        )
+        == []
+    )
+    assert len(uploads) == 2
+    assert len(uploads[1]) == 1  # only the missing artifact is retried
@@ -0,0 +1,81 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from src.ml.models import (
+    compile_binary_daily_trend_models,
+    score_compiled_binary_daily_trend_models,
+)
+
+
+def test_score_compiled_binary_daily_trend_models():
+    rng = np.random.default_rng(1729)
+    X = pd.DataFrame(rng.normal(size=(400, 4)), columns=["a", "b", "c", "d"])
+    X.loc[::7, "b"] = np.nan
+    y = pd.DataFrame(
+        {
+            "target": (X["a"] + X["b"].fillna(0.0) > 0).astype(int),
+            "positive_threshold_target": (X["c"] > 0.5).astype(int),
+            "negative_threshold_target": (X["d"] < -0.5).astype(int),
+        }
+    )
+
+    model = xgb.XGBClassifier(n_estimators=30, max_depth=4).fit(
+        X[["a", "b", "c"]], y["target"]
+    )
+    model_positive_threshold = xgb.XGBClassifier(n_estimators=10, max_depth=6).fit(
+        X[["d", "c"]], y["positive_threshold_target"]
+    )
+    multi_output_model = xgb.XGBClassifier(
+        n_estimators=20,
+        max_depth=3,
+        tree_method="hist",
+        multi_strategy="multi_output_tree",
+    ).fit(X, y)
+    models = [model, model_positive_threshold, multi_output_model]
+
+    boosters = []
+    for e in models:  # boosters are exported and loaded in the UBJSON format
+        booster = xgb.Booster()
+        booster.load_model(bytearray(e.get_booster().save_raw(raw_format="ubj")))
+        boosters.append(booster)
+
+    model_indices = rng.integers(0, len(models), size=len(X))
+    probabilities = score_compiled_binary_daily_trend_models(
+        compile_binary_daily_trend_models(boosters),
+        X=X,
+        model_indices=model_indices,
+    )
+
+    for model_index, e in enumerate(models):
+        rows = model_indices == model_index
+        expected = e.predict_proba(X.loc[rows, e.get_booster().feature_names])
+        if model_index < 2:
+            np.testing.assert_allclose(
+                probabilities[rows, 0], expected[:, 1], atol=1e-6
+            )
+        else:
+            np.testing.assert_allclose(probabilities[rows], expected, atol=1e-6)
+
+
+def test_get_base_margins():
+    get_base_margins = sys.modules[
+        "src.ml.models.compile_binary_daily_trend_models"
+    ]._get_base_margins
+
+    np.testing.assert_allclose(get_base_margins("5E-1", 3), [0.0, 0.0, 0.0])
+    np.testing.assert_allclose(
+        get_base_margins("[5E-1,2E-1,8E-1]", 3),
+        np.log([1.0, 0.25, 4.0]),
+        rtol=1e-6,
+    )  # multi-output models saved by newer versions of XGBoost have one per target
+    with pytest.raises(ValueError):
+        get_base_margins("[5E-1,2E-1]", 3)
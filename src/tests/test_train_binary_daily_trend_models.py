@@ -0,0 +1,65 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+from src.ml.models import train_binary_daily_trend_models
+
+
+TARGETS = ["target", "positive_threshold_target", "negative_threshold_target"]
+
+
+def create_prediction_inputs(n_days):
+    rng = np.random.default_rng(1729)
+    prediction_inputs = pd.DataFrame(
+        {"a": rng.normal(size=n_days), "b": rng.normal(size=n_days)},
+        index=pd.bdate_range("2023-01-02", periods=n_days),
+    )
+    noise = rng.normal(scale=0.5, size=n_days)
+    prediction_inputs["target"] = (prediction_inputs["a"] + noise > 0).astype(int)
+    prediction_inputs["positive_threshold_target"] = (
+        prediction_inputs["a"] > 0.5
+    ).astype(int)
+    prediction_inputs["negative_threshold_target"] = (
+        prediction_inputs["a"] < -0.5
+    ).astype(int)
+    prediction_inputs["target_date_daily_open"] = 100.0
+    prediction_inputs["target_date_daily_close"] = 101.0
+    return prediction_inputs
+
+
+def test_tuning_precedes_every_test_window(monkeypatch):
+    tuned_on: list[pd.Index] = []
+
+    def tune(X, y, **kwargs):
+        tuned_on.append(X.index)
+        return {"max_depth": 2}
+
+    monkeypatch.setattr(
+        sys.modules["src.ml.models.train_binary_daily_trend_models"],
+        "tune_binary_daily_trend_model",
+        tune,
+    )
+
+    payloads = train_binary_daily_trend_models(
+        symbols=["AAA"],
+        prediction_inputs=create_prediction_inputs(240),
+        features=["a", "b"],
+        targets=TARGETS,
+        serving_set_size=20,
+        threshold_percentage=1.5,
+        n_jobs=1,
+        tune=True,
+    )
+
+    first_test_start = min(e["test_start"] for e in payloads[0]["fold_metrics"])
+
+    assert len(tuned_on) == len(TARGETS)
+    assert all(index.max() < first_test_start for index in tuned_on)
+    assert payloads[0]["hyperparameters"] == {"max_depth": 2}
+    assert payloads[0]["model"].get_params()["max_depth"] == 2
@@ -0,0 +1,172 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from json import loads
+from os.path import isfile
+from types import SimpleNamespace
+from uuid import uuid4
+from sqlalchemy.exc import IntegrityError
+
+from src.sql import TransactionJournal
+
+
+class FakeSession:
+    def __init__(self, database: "FakeDatabaseClient"):
+        self.database = database
+        self.pending = []
+
+    def bulk_save_objects(self, documents):
+        self.pending.extend(documents)
+
+    def merge(self, document):
+        self.pending.append(document)
+
+    def add(self, document):
+        self.pending.append(document)
+
+    def execute(self, statement):
+        if not self.database.available:
+            raise ConnectionError("database unavailable")
+
+    def commit(self):
+        if not self.database.available:
+            raise ConnectionError("database unavailable")
+        if any(e.ticker in self.database.rejected_tickers for e in self.pending):
+            raise IntegrityError("INSERT", {}, Exception("rejected"))
+        for document in self.pending:
+            self.database.rows[document.transaction_id] = document
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+class FakeDatabaseClient:
+    def __init__(
+        self, available: bool = True, rejected_tickers: frozenset[str] = frozenset()
+    ):
+        self.engine = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+        self.available = available
+        self.rejected_tickers = rejected_tickers
+        self.rows = {}  # merged by primary key
+
+    @contextmanager
+    def get_db(self):
+        yield FakeSession(self)
+
+
+def append_transaction(journal: TransactionJournal, symbol: str):
+    timestamp = datetime.now(tz=timezone.utc)
+    journal.append(
+        transaction_id=str(uuid4()),
+        description=f"Limit: for 1 shares at 1.0 in {symbol}",
+        ticker=symbol,
+        placed_timestamp=timestamp.date(),
+        accepted_timestamp=timestamp,
+        order_type="Limit",
+        side="long",
+        entry_price="100.0",
+        exit_price="101.0",
+        currency="USD",
+        quantity="1",
+        exchange="NASDAQ",
+        broker="Alpaca",
+        paper=True,
+        backtest=False,
+        live=False,
+        created_at=timestamp,
+        last_modified_at=timestamp,
+        model_id=uuid4(),
+    )
+
+
+def test_transaction_journal(tmp_path):
+    wal_path = str(tmp_path / "transactions.wal")
+
+    database_client = FakeDatabaseClient()
+    journal = TransactionJournal(
+        database_client, wal_path=wal_path, flush_interval=timedelta(hours=1)
+    )
+    for symbol in ["AAPL", "MSFT", "NVDA"]:
+        append_transaction(journal, symbol)
+
+    assert database_client.rows == {}
+    with open(wal_path) as f:
+        assert len(f.readlines()) == 3
+
+    assert journal.close()
+    rows = list(database_client.rows.values())
+    assert [e.ticker for e in rows] == ["AAPL", "MSFT", "NVDA"]
+    assert isinstance(rows[0].accepted_timestamp, datetime)
+    with open(wal_path) as f:
+        assert f.read() == ""
+
+
+def test_transaction_journal_recovery(tmp_path):
+    wal_path = str(tmp_path / "transactions.wal")
+
+    unavailable_database_client = FakeDatabaseClient(available=False)
+    journal = TransactionJournal(
+        unavailable_database_client,
+        wal_path=wal_path,
+        flush_interval=timedelta(hours=1),
+    )
+    append_transaction(journal, "AAPL")
+    assert not journal.close()
+
+    database_client = FakeDatabaseClient()
+    TransactionJournal(
+        database_client, wal_path=wal_path, flush_interval=timedelta(hours=1)
+    ).close()
+
+    assert [e.ticker for e in database_client.rows.values()] == ["AAPL"]
+    with open(wal_path) as f:
+        assert f.read() == ""
+
+
+def test_transaction_journal_dead_letter(tmp_path):
+    wal_path = str(tmp_path / "transactions.wal")
+
+    database_client = FakeDatabaseClient(rejected_tickers={"BAD"})
+    journal = TransactionJournal(
+        database_client,
+        wal_path=wal_path,
+        flush_interval=timedelta(hours=1),
+        max_batch_size=4,
+    )
+    symbols = ["AAPL", "MSFT", "BAD", "NVDA", "AMZN", "META"]
+    for symbol in symbols:
+        append_transaction(journal, symbol)
+
+    assert not journal.close()  # the bad record is moved aside, not retried
+    assert [e.ticker for e in database_client.rows.values()] == [
+        e for e in symbols if e != "BAD"
+    ]
+    with open(wal_path) as f:
+        assert f.read() == ""
+    with open(journal.dead_letter_path) as f:
+        assert [loads(line)["ticker"] for line in f] == ["BAD"]
+
+
+def test_transaction_journal_unavailable(tmp_path):
+    wal_path = str(tmp_path / "transactions.wal")
+
+    database_client = FakeDatabaseClient(available=False)
+    journal = TransactionJournal(
+        database_client, wal_path=wal_path, flush_interval=timedelta(hours=1)
+    )
+    for symbol in ["AAPL", "MSFT"]:
+        append_transaction(journal, symbol)
+
+    assert not journal.close()
+    with open(wal_path) as f:
+        assert len(f.readlines()) == 2  # kept for the next run rather than moved aside
+    assert not isfile(journal.dead_letter_path)
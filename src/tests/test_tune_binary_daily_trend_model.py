@@ -0,0 +1,71 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.ml.models import tune_binary_daily_trend_model
+
+
+def test_tune_binary_daily_trend_model():
+    rng = np.random.default_rng(1729)
+    X = pd.DataFrame(
+        rng.normal(size=(300, 2)),
+        columns=["a", "b"],
+        index=pd.bdate_range("2023-01-02", periods=300),
+    ).sample(frac=1.0, random_state=1729)
+    y = (X["a"] + 0.1 * rng.normal(size=300) > 0).astype(int)
+
+    hyperparameters = tune_binary_daily_trend_model(
+        X,
+        y,
+        max_depths=[1, 3],
+        learning_rates=[0.1, 0.3],
+        max_boosting_rounds=50,
+    )
+
+    assert set(hyperparameters) == {"max_depth", "learning_rate", "n_estimators"}
+    assert hyperparameters["max_depth"] in [1, 3]
+    assert hyperparameters["learning_rate"] in [0.1, 0.3]
+    assert 1 <= hyperparameters["n_estimators"] <= 50
+
+
+def test_tune_binary_daily_trend_model_single_class():
+    X = pd.DataFrame(
+        {"a": np.arange(50.0)},
+        index=pd.bdate_range("2023-01-02", periods=50),
+    )
+
+    assert tune_binary_daily_trend_model(X, pd.Series(0, index=X.index)) == {}
+
+
+def test_tune_binary_daily_trend_model_pooled(monkeypatch):
+    rng = np.random.default_rng(1729)
+    dates = pd.bdate_range("2023-01-02", periods=61)
+    X = pd.DataFrame(
+        rng.normal(size=(len(dates) * 5, 2)),
+        columns=["a", "b"],
+        index=dates.repeat(5),
+    )  # the rows of five symbols per date
+    y = (X["a"] > 0).astype(int)
+    splits = []
+    fit = xgb.XGBClassifier.fit
+
+    def record_fit(self, X, y, eval_set, **kwargs):
+        splits.append((X.index.max(), eval_set[0][0].index.min()))
+        return fit(self, X, y, eval_set=eval_set, **kwargs)
+
+    monkeypatch.setattr(xgb.XGBClassifier, "fit", record_fit)
+
+    tune_binary_daily_trend_model(
+        X, y, max_depths=[1], learning_rates=[0.3], max_boosting_rounds=25
+    )
+
+    assert splits
+    assert all(
+        train_end < validation_start for train_end, validation_start in splits
+    )  # no date is on both sides of a split
@@ -0,0 +1,137 @@
+#!/usr/local/bin/python
+"""
+Author: Edmund Bennett
+Copyright 2024
+"""
+
+import sys
+from json import dumps
+from uuid import uuid4
+import numpy as np
+import pandas as pd
+
+from src.ml.utils import (
+    build_daily_trend_features,
+    build_daily_trend_training_data,
+    prepare_daily_data,
+)
+
+
+TARGETS = ["target", "positive_threshold_target", "negative_threshold_target"]
+
+FEATURES = [
+    "daily_open",
+    "daily_close",
+    "daily_macd_histogram",
+    "target_date_daily_open",
+]
+
+
+def create_daily_data(n_days):
+    rng = np.random.default_rng(7)
+    timestamps = pd.bdate_range("2023-01-02", periods=n_days)
+    close = 100.0 + np.cumsum(rng.normal(size=n_days))
+    return prepare_daily_data(
+        pd.DataFrame(
+            {
+                "timestamp": timestamps,
+                "symbol": "AAA",
+                "open": close + rng.normal(scale=0.5, size=n_days),
+                "close": close,
+                "high": close + 1.0,
+                "low": close - 1.0,
+                "volume": 1000,
+                "vwap": close,
+                "transactions": 10,
+                "otc": False,
+                "data_id": [uuid4() for _ in range(n_days)],
+            }
+        )
+    )
+
+
+def to_previous_models(payloads):
+    return tuple(
+        (
+            {
+                "model_id": payload["model_id"],
+                "threshold_percentage": payload["threshold_percentage"],
+                "created_at": payload.get("created_at", payload["timestamp"]),
+                "symbols": dumps(payload["symbols"]),
+                "features": dumps(payload["features"]),
+                "accuracy": payload["accuracy"],
+                "balanced_accuracy": payload["balanced_accuracy"],
+                "precision": payload["precision"],
+                "f1": payload["f1"],
+                "confusion_matrix": str(payload["confusion_matrix"]),
+                "classification_report": str(payload["classification_report"]),
+                "training_set_rows": payload["training_set_rows"],
+                "test_set_rows": payload["test_set_rows"],
+                "serving_set_rows": payload["serving_set_rows"],
+                "training_data_url": "training_data",
+                "training_targets_url": "training_targets",
+                "test_data_url": "test_data",
+                "test_targets_url": "test_targets",
+                "serving_data_url": "serving_data",
+                "serving_targets_url": "serving_targets",
+                "y_serve": dumps(payload["y_serve"]),
+                "y_serve_pred": dumps(payload["y_serve_pred"]),
+                "serving_set_indicated_entry_prices": dumps(
+                    payload["serving_set_indicated_entry_prices"]
+                ),
+                "serving_set_indicated_exit_prices": dumps(
+                    payload["serving_set_indicated_exit_prices"]
+                ),
+            },
+            payload["model"],
+        )
+        for payload in payloads
+    )
+
+
+def test_consecutive_daily_updates():
+    train_symbol = sys.modules[
+        "src.ml.models.predict_binary_daily_trend"
+    ]._train_symbol_binary_daily_trend_models
+    n_days = 120
+
+    def train(daily_data, previous_models=None):
+        return train_symbol(
+            symbol="AAA",
+            daily_symbol_data=daily_data,
+            features=FEATURES,
+            targets=TARGETS,
+            serving_set_size=10,
+            threshold_percentage=1.5,
+            n_jobs=1,
+            previous_models=previous_models,
+            trained_until=(
+                None
+                if previous_models is None
+                else pd.Timestamp(
+                    previous_models[0][1].get_booster().attr("trained_until_input")
+                )
+            ),
+        )
+
+    daily_data = create_daily_data(n_days + 2)
+    payloads = train(daily_data.iloc[:n_days])
+    seen = list(
+        build_daily_trend_training_data(
+            build_daily_trend_features(daily_data.iloc[:n_days], 1.5)
+        ).index
+    )  # the full models are trained on every prediction input
+
+    for day in [n_days + 1, n_days + 2]:
+        payloads = train(daily_data.iloc[:day], to_previous_models(payloads))
+
+        assert payloads is not None
+        assert len(payloads[0]["update_data"]) > 0
+        seen.extend(payloads[0]["update_data"].index)
+
+    prediction_inputs = build_daily_trend_training_data(
+        build_daily_trend_features(daily_data, 1.5)
+    )
+
+    assert len(seen) == len(set(seen))  # no row is trained on twice
+    assert sorted(seen) == sorted(prediction_inputs.index)  # and none is missed
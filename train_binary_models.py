@@ -37,6 +37,11 @@ if __name__ == "__main__":
         end_timestamp=None,
         symbols=symbols,
         diagnostic_plots_flag=False,
+        workers=int(getenv("TRAINING_WORKERS", "1")),
+        incremental=getenv("INCREMENTAL_TRAINING", "false").lower() == "true",
+        full_retrain_days=int(getenv("FULL_RETRAIN_DAYS", "7")),
+        use_feature_store=getenv("USE_FEATURE_STORE", "false").lower() == "true",
+        tune=getenv("TUNE_HYPERPARAMETERS", "false").lower() == "true",
     )
     
     cash = 40000.0
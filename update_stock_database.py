@@ -6,11 +6,13 @@ Copyright 2024
 
 from os import getenv
 from sqlalchemy import func
-from datetime import timedelta
+from asyncio import run
 import sentry_sdk
 from dotenv import load_dotenv
 
-from src.etl import populate_database_latest_market_data
+from src.brokerage.polygon import create_polygon_client
+from src.etl import populate_database_latest_market_data_async
+from src.features import update_daily_feature_store
 from src.sql import (
     create_sql_client,
     get_data,
@@ -32,6 +34,7 @@ if __name__ == "__main__":
     log.info("Starting database update.")
 
     database_client = create_sql_client()
+    polygon_client = create_polygon_client()
 
     timespans = [
         "day",
@@ -57,12 +60,25 @@ if __name__ == "__main__":
             group_by=[collection.symbol],
         )
 
-        for latest_market_data_timestamp in latest_market_data_timestamps:
-            populate_database_latest_market_data(
+        if collection == PolygonMarketDataDay:
+            daily_symbols = [e["symbol"] for e in latest_market_data_timestamps]
+
+        run(
+            populate_database_latest_market_data_async(
                 timespan=timespan,
                 collection=collection,
-                ticker=latest_market_data_timestamp["symbol"],
-                from_=latest_market_data_timestamp["timestamp"] + timedelta(days=1),
+                latest_market_data_timestamps=latest_market_data_timestamps,
+                polygon_client=polygon_client,
             )
+        )  # market data is fetched for some tickers while written for others
+
+        database_client.get_pool_status()
+
+    log.info("Updating daily feature store.")
+
+    update_daily_feature_store(
+        database_client=database_client,
+        symbols=daily_symbols,
+    )
 
     log.info("Completed database update.")